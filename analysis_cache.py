@@ -0,0 +1,331 @@
+"""Cache d'analyse des vidéos sources, indexé par empreinte de contenu."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+
+# Taille des échantillons lus en début et fin de fichier pour l'empreinte
+FINGERPRINT_SAMPLE_SIZE = 4 * 1024 * 1024
+
+# Taille des blocs copiés lors de l'import d'une source
+INGEST_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def fingerprint_file(path: str) -> str:
+    """Calcule l'empreinte d'un fichier vidéo.
+    
+    L'empreinte combine la taille et un échantillon du début et de la fin du
+    fichier : elle reste rapide sur des sources de plusieurs Go.
+    
+    Args:
+        path: Chemin vers le fichier
+    
+    Returns:
+        Empreinte hexadécimale (sha256)
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(f"{size}:".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+        tail_start = max(FINGERPRINT_SAMPLE_SIZE, size - FINGERPRINT_SAMPLE_SIZE)
+        if tail_start < size:
+            f.seek(tail_start)
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class StreamingFingerprint:
+    """Empreinte calculée au fil d'un flux, identique à `fingerprint_file`.
+    
+    La taille totale étant connue d'avance, les octets du début et de la fin
+    du fichier sont hachés au passage, dans l'ordre du flux, sans relire le
+    fichier ni garder plus d'un bloc en mémoire.
+    """
+    
+    def __init__(self, size: int):
+        """Initialise l'empreinte pour un flux de `size` octets."""
+        self.size = size
+        self.offset = 0
+        self.tail_start = max(FINGERPRINT_SAMPLE_SIZE, size - FINGERPRINT_SAMPLE_SIZE)
+        self._digest = hashlib.sha256(f"{size}:".encode())
+    
+    def update(self, chunk: bytes):
+        """Ajoute le bloc suivant du flux."""
+        start = self.offset
+        end = start + len(chunk)
+        if start < FINGERPRINT_SAMPLE_SIZE:
+            self._digest.update(chunk[:FINGERPRINT_SAMPLE_SIZE - start])
+        if end > self.tail_start:
+            self._digest.update(chunk[max(0, self.tail_start - start):])
+        self.offset = end
+    
+    def hexdigest(self) -> str:
+        """Empreinte hexadécimale (sha256)."""
+        return self._digest.hexdigest()
+
+
+def fingerprint_stream(stream: BinaryIO, size: int) -> str:
+    """Empreinte d'un flux positionnable, sans le lire en entier."""
+    position = stream.tell()
+    fingerprint = StreamingFingerprint(size)
+    stream.seek(0)
+    fingerprint.update(stream.read(FINGERPRINT_SAMPLE_SIZE))
+    if fingerprint.tail_start < size:
+        stream.seek(fingerprint.tail_start)
+        fingerprint.offset = fingerprint.tail_start
+        fingerprint.update(stream.read())
+    stream.seek(position)
+    return fingerprint.hexdigest()
+
+
+def cache_key(*parts: Any) -> str:
+    """Calcule une clé de cache stable à partir de valeurs sérialisables en JSON."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def evict_lru(directory: Path, budget_bytes: int, pattern: str = "*"):
+    """Supprime les fichiers les moins récemment utilisés au-delà d'un budget disque.
+    
+    L'ordre d'utilisation est donné par la date de modification, mise à jour
+    (`os.utime`) à chaque accès au fichier. Les fichiers et répertoires cachés
+    (écritures en cours) ne sont jamais comptés ni supprimés.
+    
+    Args:
+        directory: Répertoire à nettoyer
+        budget_bytes: Taille totale maximale en octets
+        pattern: Motif des fichiers concernés (`**/*` pour les sous-répertoires)
+    """
+    directory = Path(directory)
+    entries = []
+    for path in directory.glob(pattern):
+        if any(part.startswith(".") for part in path.relative_to(directory).parts):
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file():
+            entries.append((stat.st_mtime, stat.st_size, path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= budget_bytes:
+            break
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            continue
+
+
+class AnalysisCache:
+    """Stockage sur disque des résultats d'analyse par source.
+    
+    Chaque source a son propre répertoire `<root>/<empreinte>/` qui contient
+    les fichiers dérivés (proxy, analyses JSON, ...).
+    """
+    
+    # Nom des répertoires de sources (empreinte ou hachage complet, sha256)
+    SOURCE_DIR_PATTERN = re.compile(r"[0-9a-f]{64}")
+    
+    def __init__(self, root: str = "cache"):
+        """Initialise le cache.
+        
+        Args:
+            root: Répertoire racine du cache
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+    
+    def fingerprint(self, video_path: str) -> str:
+        """Retourne l'empreinte d'une source (mémorisée par chemin, taille et date)."""
+        path = os.path.abspath(video_path)
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        
+        # Source importée : son répertoire porte déjà son empreinte (`ingest`)
+        directory = os.path.dirname(path)
+        if (
+            os.path.basename(path).startswith("source.")
+            and os.path.dirname(directory) == os.path.abspath(self.root)
+            and self.SOURCE_DIR_PATTERN.fullmatch(os.path.basename(directory))
+        ):
+            return os.path.basename(directory)
+        
+        with self._lock:
+            cached = self._fingerprints.get(key)
+        if cached:
+            return cached
+        
+        fingerprint = fingerprint_file(path)
+        with self._lock:
+            self._fingerprints[key] = fingerprint
+        return fingerprint
+    
+    def ingest(
+        self,
+        stream: BinaryIO,
+        size: int,
+        suffix: str,
+        workspace: Path,
+    ) -> Tuple[str, Path]:
+        """Importe une source depuis un flux, dédupliquée par contenu.
+        
+        Le flux est copié par blocs dans `workspace` pendant que l'empreinte
+        et le hachage de tout le contenu sont calculés, puis déplacé dans
+        `<root>/<empreinte>/source<suffix>`. L'empreinte (taille, début et fin
+        du fichier) n'est qu'un pré-filtre : une source existante n'est
+        réutilisée, avec ses analyses en cache, que si le hachage complet de
+        son contenu est identique (vérifié avant toute copie pour un flux
+        positionnable). Un contenu différent de même empreinte est rangé sous
+        son hachage complet.
+        
+        Args:
+            stream: Flux binaire de la source (fichier importé)
+            size: Taille totale du flux en octets
+            suffix: Extension de la source (".mp4", ...)
+            workspace: Répertoire de travail de la session
+        
+        Returns:
+            Tuple (empreinte, chemin de la source importée)
+        """
+        seekable = getattr(stream, "seekable", lambda: False)()
+        if seekable:
+            fingerprint = fingerprint_stream(stream, size)
+            existing = self._ingested_path(fingerprint, suffix)
+            if existing.exists():
+                stream.seek(0)
+                content = hashlib.sha256()
+                for chunk in iter(lambda: stream.read(INGEST_CHUNK_SIZE), b""):
+                    content.update(chunk)
+                if self._content_hash(existing) == content.hexdigest():
+                    os.utime(existing)
+                    self._remember(existing, fingerprint)
+                    return fingerprint, existing
+            stream.seek(0)
+        
+        workspace = Path(workspace)
+        workspace.mkdir(parents=True, exist_ok=True)
+        tmp_path = workspace / f".upload.{os.getpid()}.{threading.get_ident()}{suffix}"
+        streaming = StreamingFingerprint(size)
+        content = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    chunk = stream.read(INGEST_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    streaming.update(chunk)
+                    content.update(chunk)
+                    f.write(chunk)
+            
+            fingerprint = streaming.hexdigest()
+            content_hash = content.hexdigest()
+            path = self._ingested_path(fingerprint, suffix)
+            if path.exists() and self._content_hash(path) != content_hash:
+                # Même empreinte, autre contenu : rangée sous son hachage complet
+                fingerprint = content_hash
+                path = self._ingested_path(fingerprint, suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                os.utime(path)
+            else:
+                self._write_text(self._content_hash_path(path), content_hash)
+                os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        self._remember(path, fingerprint)
+        return fingerprint, path
+    
+    def _remember(self, path: Path, fingerprint: str):
+        """Mémorise l'empreinte d'un fichier déjà connue (évite de le relire)."""
+        stat = os.stat(path)
+        with self._lock:
+            self._fingerprints[(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)] = fingerprint
+    
+    def _ingested_path(self, fingerprint: str, suffix: str) -> Path:
+        """Emplacement d'une source importée dans le cache."""
+        return self.root / fingerprint / f"source{suffix.lower()}"
+    
+    @staticmethod
+    def _content_hash_path(source_path: Path) -> Path:
+        """Fichier du hachage complet d'une source importée (`source.sha256`)."""
+        return source_path.with_suffix(".sha256")
+    
+    def _content_hash(self, source_path: Path) -> str:
+        """Hachage sha256 de tout le contenu d'une source importée.
+        
+        Lu à côté de la source ; calculé puis enregistré pour les sources
+        importées avant son introduction.
+        """
+        hash_path = self._content_hash_path(source_path)
+        try:
+            return hash_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+        content = hashlib.sha256()
+        with open(source_path, "rb") as f:
+            for chunk in iter(lambda: f.read(INGEST_CHUNK_SIZE), b""):
+                content.update(chunk)
+        self._write_text(hash_path, content.hexdigest())
+        return content.hexdigest()
+    
+    @staticmethod
+    def _write_text(path: Path, text: str):
+        """Écrit un petit fichier texte (écriture atomique)."""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def source_dir(self, video_path: str) -> Path:
+        """Répertoire de cache d'une source (créé si nécessaire).
+        
+        Chaque accès le date : le nettoyage (`workspace.Janitor`) supprime
+        les répertoires de sources les moins récemment utilisés.
+        """
+        directory = self.root / self.fingerprint(video_path)
+        directory.mkdir(parents=True, exist_ok=True)
+        try:
+            os.utime(directory)
+        except OSError:
+            pass
+        return directory
+    
+    def shared_dir(self, name: str) -> Path:
+        """Répertoire partagé entre toutes les sources (créé si nécessaire)."""
+        directory = self.root / name
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+    
+    def path_for(self, video_path: str, name: str) -> Path:
+        """Chemin d'un fichier dérivé d'une source."""
+        return self.source_dir(video_path) / name
+    
+    def load_json(self, video_path: str, name: str) -> Optional[Any]:
+        """Charge un résultat JSON du cache (None si absent ou illisible)."""
+        path = self.path_for(video_path, f"{name}.json")
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def save_json(self, video_path: str, name: str, data: Any):
+        """Enregistre un résultat JSON dans le cache (écriture atomique)."""
+        path = self.path_for(video_path, f"{name}.json")
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -2,11 +2,13 @@
 
 import streamlit as st
 from pathlib import Path
-import tempfile
-import os
+import time
+import uuid
 
+from jobs import JobRunner, report_stage
 from video_processor import VideoProcessor
 from video_effects import TransitionType
+from workspace import Janitor, session_output_dir
 
 # Configuration de la page
 st.set_page_config(
@@ -68,9 +70,24 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🎬 Clipp</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Créez des clips pour TikTok, YouTube Shorts et Instagram Reels avec sous-titres animés et transitions</p>', unsafe_allow_html=True)
 
-# Initialisation du processeur
+@st.cache_resource
+def start_janitor() -> Janitor:
+    """Nettoyage périodique des sorties et fichiers temporaires (un seul par serveur)."""
+    janitor = Janitor(output_root="output", cache_root="cache")
+    janitor.start()
+    return janitor
+
+
+janitor = start_janitor()
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# Initialisation du processeur (sorties isolées par session)
 if 'processor' not in st.session_state:
-    st.session_state.processor = VideoProcessor()
+    st.session_state.processor = VideoProcessor(
+        output_dir=str(session_output_dir("output", st.session_state.session_id)),
+    )
 
 if 'video_info' not in st.session_state:
     st.session_state.video_info = None
@@ -90,6 +107,194 @@ if 'preview_path' not in st.session_state:
 if 'created_clips' not in st.session_state:
     st.session_state.created_clips = []
 
+if 'thumbnail_index' not in st.session_state:
+    st.session_state.thumbnail_index = None
+
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = []  # [{"id", "kind", "collected"}]
+
+if 'last_clip_path' not in st.session_state:
+    st.session_state.last_clip_path = None
+
+if 'auto_results' not in st.session_state:
+    st.session_state.auto_results = None
+
+if 'batch_results' not in st.session_state:
+    st.session_state.batch_results = None
+
+# Source supprimée du cache entre-temps (session inactive) : réimportée
+# depuis le fichier encore présent dans l'uploader
+if st.session_state.uploaded_file_path and not Path(st.session_state.uploaded_file_path).exists():
+    st.session_state.uploaded_file_path = None
+    st.session_state.video_info = None
+    st.session_state.thumbnail_index = None
+    st.warning("⚠️ La vidéo importée n'était plus en cache : elle va être réimportée.")
+
+# Répertoires de la session protégés du nettoyage tant qu'elle est active
+janitor.keep(st.session_state.processor.output_dir)
+if st.session_state.uploaded_file_path:
+    janitor.keep(Path(st.session_state.uploaded_file_path).parent)
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    """Pool de rendus partagé, qui survit aux réexécutions du script."""
+    return JobRunner(max_workers=2)
+
+
+def submit_job(kind: str, name: str, fn, *args, **kwargs):
+    """Lance un traitement en arrière-plan et le rattache à la session."""
+    job_id = get_job_runner().submit(name, fn, *args, **kwargs)
+    st.session_state.jobs.append({"id": job_id, "kind": kind, "collected": False})
+
+
+def job_running(kind: str) -> bool:
+    """Indique si un job de ce type est en cours pour la session."""
+    runner = get_job_runner()
+    for entry in st.session_state.jobs:
+        job = runner.get(entry["id"])
+        if entry["kind"] == kind and job is not None and not job.finished:
+            return True
+    return False
+
+
+def collect_jobs():
+    """Reporte dans la session les résultats des jobs terminés."""
+    runner = get_job_runner()
+    for entry in st.session_state.jobs:
+        job = runner.get(entry["id"])
+        if entry["collected"] or job is None or job.state != "done":
+            continue
+        entry["collected"] = True
+        kind, result = entry["kind"], job.result
+        if kind == "subtitles":
+            st.session_state.subtitles = result
+        elif kind == "scenes":
+            st.session_state.scene_changes = result
+        elif kind == "thumbnails":
+            st.session_state.thumbnail_index = result
+        elif kind == "clip":
+            st.session_state.last_clip_path = result
+            st.session_state.created_clips.append(result)
+        elif kind == "auto":
+            st.session_state.auto_results = result
+            if result.get("success"):
+                st.session_state.created_clips.extend(c["path"] for c in result["clips"])
+        elif kind == "batch":
+            st.session_state.batch_results = result
+            st.session_state.created_clips.extend(result["paths"])
+
+
+def render_jobs():
+    """Affiche l'état des jobs de la session (en cours et en échec)."""
+    runner = get_job_runner()
+    for entry in st.session_state.jobs:
+        job = runner.get(entry["id"])
+        if job is None:
+            continue
+        state = job.snapshot()
+        if state["state"] in ("pending", "running"):
+            label = " — ".join(x for x in (state["name"], state["stage"], state["detail"]) if x)
+            st.progress(state["progress"], text=f"⏳ {label}")
+        elif state["state"] == "failed" and not entry.get("dismissed"):
+            st.error(f"❌ {state['name']}: {state['error'].splitlines()[0]}")
+            with st.expander("Détails de l'erreur"):
+                st.code(state["error"])
+
+
+def prepare_thumbnails(processor, video_path):
+    """Construit l'index de miniatures à partir du proxy, dès qu'il est prêt (exécuté dans un job)."""
+    report_stage("⏳ Attente du proxy")
+    processor.wait_for_proxy(video_path)
+    report_stage("🖼️ Planche de miniatures")
+    return processor.get_thumbnail_index(video_path)
+
+
+def extract_features(processor, video_path):
+    """Extrait les séries d'analyse (frames, audio) puis détecte les scènes (exécuté dans un job).
+    
+    Une fois les séries en cache, le réglage des seuils dans l'interface ne
+    redécode plus la vidéo.
+    """
+    report_stage("🎬 Différences entre frames")
+    processor.frame_differences(video_path)
+    report_stage("🔊 Enveloppe audio")
+    processor.audio_envelope(video_path)
+    return processor.detect_scene_changes(video_path)
+
+
+def run_batch(processor, video_path, clip_duration, num_clips, detection_method, min_gap,
+              format_type, zoom_mode, enable_subtitles, subtitle_animation, subtitles):
+    """Détection puis création des clips du mode avancé (exécuté dans un job)."""
+    # Étape 1: Détection des moments
+    report_stage("🔍 Détection des moments intéressants")
+    time_ranges = processor.auto_detect_moments(
+        video_path,
+        clip_duration=clip_duration,
+        num_clips=num_clips,
+        detection_method=detection_method,
+        min_gap=min_gap,
+        subtitles=subtitles,
+    )
+    
+    # Étape 2: Génération des clips
+    # Utiliser les sous-titres animés si activé
+    if enable_subtitles and subtitle_animation != "none":
+        output_paths = []
+        for i, (start, end) in enumerate(time_ranges):
+            report_stage(f"🎬 Clip {i+1}/{len(time_ranges)}")
+            segment_subs = None
+            if subtitles:
+                segment_subs = processor.segment_subtitles(subtitles, start, end)
+            
+            path = processor.create_clip_with_animated_subtitles(
+                video_path=video_path,
+                start_time=start,
+                end_time=end,
+                output_name=f"clip_{i+1:03d}_animated.mp4",
+                format_type=format_type,
+                zoom_mode=zoom_mode,
+                subtitles_list=segment_subs,
+                subtitle_animation=subtitle_animation,
+            )
+            output_paths.append(path)
+    else:
+        report_stage(f"🎬 Création de {len(time_ranges)} clips")
+        output_paths = processor.create_multiple_clips(
+            video_path=video_path,
+            time_ranges=time_ranges,
+            format_type=format_type,
+            zoom_mode=zoom_mode,
+            add_subtitles=enable_subtitles,
+            subtitles_list=[dict(s) for s in subtitles] if subtitles else None,
+        )
+    
+    return {"paths": output_paths, "time_ranges": time_ranges}
+
+
+collect_jobs()
+
+
+@st.cache_resource
+def load_sprite(sprite_path: str):
+    """Charge une planche de miniatures (gardée en mémoire entre les reruns)."""
+    from PIL import Image
+    
+    sprite = Image.open(sprite_path)
+    sprite.load()
+    return sprite
+
+
+def get_thumbnail(index: dict, t: float):
+    """Extrait la miniature la plus proche du temps t depuis la planche."""
+    i = min(len(index["times"]) - 1, max(0, int(round(t / index["interval"]))))
+    x = (i % index["columns"]) * index["thumb_width"]
+    y = (i // index["columns"]) * index["thumb_height"]
+    return load_sprite(index["sprite"]).crop(
+        (x, y, x + index["thumb_width"], y + index["thumb_height"])
+    )
+
+
 # Sidebar pour les options
 with st.sidebar:
     st.header("⚙️ Configuration")
@@ -204,6 +409,9 @@ with st.sidebar:
     st.divider()
     st.info("💡 **Astuce**: Le style 'TikTok Classique' avec la police Impact est le plus utilisé pour les clips viraux!")
 
+# Traitements en arrière-plan
+render_jobs()
+
 # Zone principale
 tab1, tab2, tab3, tab4 = st.tabs(["📁 Importer", "✂️ Clip Manuel", "🎯 Auto-Détection", "🔗 Assemblage"])
 
@@ -217,35 +425,56 @@ with tab1:
     )
     
     if uploaded_file is not None:
-        # Sauvegarder le fichier temporairement
+        # Importer la source par blocs (dédupliquée par empreinte de contenu)
         if st.session_state.uploaded_file_path is None:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                st.session_state.uploaded_file_path = tmp_file.name
-                
+            cache = st.session_state.processor.cache
+            with st.spinner("📥 Import de la vidéo..."):
+                _, source_path = cache.ingest(
+                    uploaded_file,
+                    uploaded_file.size,
+                    Path(uploaded_file.name).suffix,
+                    cache.shared_dir("sessions") / st.session_state.session_id,
+                )
+            st.session_state.uploaded_file_path = str(source_path)
+            
             # Récupérer les infos
             try:
                 st.session_state.video_info = st.session_state.processor.get_video_info(
                     st.session_state.uploaded_file_path
                 )
                 
-                # Générer les sous-titres si activé
-                if enable_subtitles:
-                    with st.spinner("🎙️ Génération des sous-titres..."):
-                        st.session_state.subtitles = st.session_state.processor.generate_subtitles(
-                            st.session_state.uploaded_file_path,
-                            language=subtitle_lang,
-                        )
-                        if st.session_state.subtitles:
-                            st.success(f"✅ {len(st.session_state.subtitles)} segments de sous-titres générés")
+                # Proxy basse résolution en arrière-plan (analyse et prévisualisation)
+                st.session_state.processor.start_proxy_generation(
+                    st.session_state.uploaded_file_path
+                )
+                
+                # Miniatures décodées depuis le proxy (en arrière-plan)
+                submit_job(
+                    "thumbnails",
+                    "🖼️ Préparation des miniatures",
+                    prepare_thumbnails,
+                    st.session_state.processor,
+                    st.session_state.uploaded_file_path,
+                )
                 
-                # Détecter les changements de scène
-                with st.spinner("🎬 Détection des changements de scène..."):
-                    st.session_state.scene_changes = st.session_state.processor.detect_scene_changes(
-                        st.session_state.uploaded_file_path
+                # Générer les sous-titres si activé (en arrière-plan)
+                if enable_subtitles:
+                    submit_job(
+                        "subtitles",
+                        "🎙️ Génération des sous-titres",
+                        st.session_state.processor.generate_subtitles,
+                        st.session_state.uploaded_file_path,
+                        language=subtitle_lang,
                     )
-                    if st.session_state.scene_changes:
-                        st.success(f"✅ {len(st.session_state.scene_changes)} changements de scène détectés")
+                
+                # Extraire les séries d'analyse et détecter les scènes (en arrière-plan)
+                submit_job(
+                    "scenes",
+                    "🎬 Détection des changements de scène",
+                    extract_features,
+                    st.session_state.processor,
+                    st.session_state.uploaded_file_path,
+                )
                         
             except Exception as e:
                 st.error(f"Erreur lors de la lecture de la vidéo: {e}")
@@ -274,16 +503,60 @@ with tab1:
                     ratio_str = "4:3"
                 st.metric("Format", ratio_str)
             
+            # Détails des flux (ffprobe)
+            details = [str(info.get("video_codec") or "?").upper()]
+            if info.get("keyframe_interval"):
+                details.append(f"image clé toutes les {info['keyframe_interval']:.1f}s")
+            if info.get("bit_rate"):
+                details.append(f"{info['bit_rate'] / 1e6:.1f} Mb/s")
+            if info.get("has_audio"):
+                details.append(f"audio {info.get('audio_codec') or '?'} {(info.get('audio_sample_rate') or 0) / 1000:g} kHz")
+            else:
+                details.append("sans audio")
+            st.caption(" · ".join(details))
+            
             # Afficher les sous-titres si générés
             if st.session_state.subtitles:
+                st.success(f"✅ {len(st.session_state.subtitles)} segments de sous-titres générés")
                 with st.expander("📝 Voir les sous-titres générés"):
                     for i, sub in enumerate(st.session_state.subtitles[:10]):
                         st.text(f"[{sub['start']:.1f}s - {sub['end']:.1f}s]: {sub['text']}")
                     if len(st.session_state.subtitles) > 10:
                         st.info(f"... et {len(st.session_state.subtitles) - 10} segments supplémentaires")
             
+            # Réglage en direct : seuils réévalués sur les séries en cache, sans décodage
+            if st.session_state.scene_changes is not None:
+                with st.expander("🎚️ Régler la détection"):
+                    processor = st.session_state.processor
+                    video_path = st.session_state.uploaded_file_path
+                    
+                    cols = st.columns(2)
+                    with cols[0]:
+                        scene_threshold = st.slider("Seuil de changement de scène", 5.0, 80.0, 30.0, 1.0)
+                        min_scene_duration = st.slider("Durée minimale d'une scène (s)", 0.5, 10.0, 2.0, 0.5)
+                    with cols[1]:
+                        prominence = st.slider("Prominence des pics audio", 0.01, 0.5, 0.1, 0.01)
+                        peak_duration = st.slider("Durée des clips audio (s)", 15, 60, 30, 5)
+                    
+                    st.session_state.scene_changes = processor.detect_scene_changes(
+                        video_path,
+                        threshold=scene_threshold,
+                        min_scene_duration=min_scene_duration,
+                    )
+                    st.line_chart(processor.frame_differences(video_path), height=150)
+                    
+                    peaks = processor.analyze_audio_peaks(
+                        video_path,
+                        min_clip_duration=peak_duration * 0.5,
+                        max_clip_duration=peak_duration,
+                        prominence=prominence,
+                    ) if info.get("has_audio") else []
+                    if peaks:
+                        st.write("Pics audio: " + ", ".join(f"{start:.1f}s–{end:.1f}s" for start, end in peaks))
+            
             # Afficher les changements de scène
             if st.session_state.scene_changes:
+                st.success(f"✅ {len(st.session_state.scene_changes)} changements de scène détectés")
                 with st.expander("🎬 Voir les changements de scène"):
                     st.write(f"Timestamps: {', '.join([f'{t:.1f}s' for t in st.session_state.scene_changes[:20]])}")
 
@@ -294,6 +567,10 @@ with tab2:
         info = st.session_state.video_info
         max_duration = info['duration']
         
+        # Index de miniatures préparé en arrière-plan (un seul décodage du proxy)
+        if st.session_state.thumbnail_index is None and job_running("thumbnails"):
+            st.info("🖼️ Miniatures en préparation...")
+        
         col_left, col_right = st.columns(2)
         
         with col_left:
@@ -315,11 +592,30 @@ with tab2:
                 step=1.0,
                 format="%.1fs",
             )
+            
+            # Pellicule du segment sélectionné
+            if st.session_state.thumbnail_index:
+                thumbs = st.session_state.thumbnail_index
+                strip_times = [start_time + (end_time - start_time) * k / 7 for k in range(8)]
+                st.image(
+                    [get_thumbnail(thumbs, t) for t in strip_times],
+                    caption=[f"{t:.0f}s" for t in strip_times],
+                    width=thumbs["thumb_width"] // 2,
+                )
         
         with col_right:
             clip_duration = end_time - start_time
             st.info(f"⏱️ Durée du clip: **{clip_duration:.1f}s**")
             
+            # Miniatures du début et de la fin
+            if st.session_state.thumbnail_index:
+                thumbs = st.session_state.thumbnail_index
+                col_thumb_start, col_thumb_end = st.columns(2)
+                with col_thumb_start:
+                    st.image(get_thumbnail(thumbs, start_time), caption=f"Début {start_time:.1f}s")
+                with col_thumb_end:
+                    st.image(get_thumbnail(thumbs, end_time), caption=f"Fin {end_time:.1f}s")
+            
             # Afficher les sous-titres dans cette plage
             if st.session_state.subtitles:
                 segment_subs = [
@@ -344,6 +640,13 @@ with tab2:
                             end_time=end_time,
                             quality="low",
                             max_duration=10.0,
+                            format_type=format_type,
+                            zoom_mode=zoom_mode,
+                            subtitles_list=st.session_state.subtitles if enable_subtitles else None,
+                            subtitle_font=subtitle_font,
+                            subtitle_position=subtitle_position,
+                            subtitle_size=subtitle_size,
+                            subtitle_color=subtitle_color,
                         )
                         st.session_state.preview_path = preview_path
                         st.success("✅ Prévisualisation créée!")
@@ -351,60 +654,56 @@ with tab2:
                         st.error(f"❌ Erreur: {e}")
         
         with col_create:
-            if st.button("🚀 Créer le clip final", use_container_width=True, type="primary"):
-                with st.spinner("Création du clip en cours..."):
-                    try:
-                        # Filtrer les sous-titres pour ce segment
-                        segment_subs = None
-                        if enable_subtitles and st.session_state.subtitles:
-                            segment_subs = [
-                                s for s in st.session_state.subtitles
-                                if s['start'] >= start_time and s['end'] <= end_time
-                            ]
-                            for s in segment_subs:
-                                s['start'] -= start_time
-                                s['end'] -= start_time
-                        
-                        # Créer avec sous-titres animés si activé
-                        if enable_subtitles and subtitle_animation != "none":
-                            output_path = st.session_state.processor.create_clip_with_animated_subtitles(
-                                video_path=str(st.session_state.uploaded_file_path),
-                                start_time=start_time,
-                                end_time=end_time,
-                                format_type=format_type,
-                                zoom_mode=zoom_mode,
-                                subtitles_list=segment_subs,
-                                subtitle_animation=subtitle_animation,
-                            )
-                        else:
-                            output_path = st.session_state.processor.create_clip(
-                                video_path=str(st.session_state.uploaded_file_path),
-                                start_time=start_time,
-                                end_time=end_time,
-                                format_type=format_type,
-                                zoom_mode=zoom_mode,
-                                add_subtitles=enable_subtitles,
-                                subtitles_list=segment_subs,
-                            )
-                        
-                        st.success(f"✅ Clip créé: {Path(output_path).name}")
-                        
-                        # Ajouter à la liste des clips créés
-                        st.session_state.created_clips.append(output_path)
-                        
-                        # Bouton de téléchargement
-                        with open(output_path, "rb") as f:
-                            st.download_button(
-                                label="📥 Télécharger le clip",
-                                data=f,
-                                file_name=Path(output_path).name,
-                                mime="video/mp4",
-                                use_container_width=True,
-                            )
-                            
-                    except Exception as e:
-                        st.error(f"❌ Erreur: {e}")
-                        st.exception(e)
+            creating = job_running("clip")
+            if st.button("🚀 Créer le clip final", use_container_width=True, type="primary", disabled=creating):
+                # Filtrer les sous-titres pour ce segment (copies : le job tourne en parallèle)
+                segment_subs = None
+                if enable_subtitles and st.session_state.subtitles:
+                    segment_subs = st.session_state.processor.segment_subtitles(
+                        st.session_state.subtitles, start_time, end_time,
+                    )
+                
+                # Créer avec sous-titres animés si activé
+                if enable_subtitles and subtitle_animation != "none":
+                    submit_job(
+                        "clip",
+                        "🚀 Création du clip",
+                        st.session_state.processor.create_clip_with_animated_subtitles,
+                        video_path=str(st.session_state.uploaded_file_path),
+                        start_time=start_time,
+                        end_time=end_time,
+                        format_type=format_type,
+                        zoom_mode=zoom_mode,
+                        subtitles_list=segment_subs,
+                        subtitle_animation=subtitle_animation,
+                    )
+                else:
+                    submit_job(
+                        "clip",
+                        "🚀 Création du clip",
+                        st.session_state.processor.create_clip,
+                        video_path=str(st.session_state.uploaded_file_path),
+                        start_time=start_time,
+                        end_time=end_time,
+                        format_type=format_type,
+                        zoom_mode=zoom_mode,
+                        add_subtitles=enable_subtitles,
+                        subtitles_list=segment_subs,
+                    )
+                st.rerun()
+            
+            # Dernier clip créé
+            last_clip = st.session_state.last_clip_path
+            if last_clip and Path(last_clip).exists():
+                st.success(f"✅ Clip créé: {Path(last_clip).name}")
+                with open(last_clip, "rb") as f:
+                    st.download_button(
+                        label="📥 Télécharger le clip",
+                        data=f,
+                        file_name=Path(last_clip).name,
+                        mime="video/mp4",
+                        use_container_width=True,
+                    )
         
         # Afficher la prévisualisation
         if st.session_state.preview_path and Path(st.session_state.preview_path).exists():
@@ -432,82 +731,75 @@ with tab3:
         with col_auto3:
             auto_assemble = st.checkbox("Assembler automatiquement", value=True, help="Crée une vidéo finale avec toutes les transitions")
         
-        if st.button("🚀 GÉNÉRATION AUTO COMPLÈTE", use_container_width=True, type="primary"):
-            with st.spinner("🎬 Analyse intelligente et génération automatique en cours..."):
-                try:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    # Utiliser la nouvelle méthode automatique
-                    status_text.text("🧠 Analyse multi-critères de la vidéo...")
-                    
-                    results = st.session_state.processor.generate_clips_auto(
-                        video_path=str(st.session_state.uploaded_file_path),
-                        output_prefix="auto_clip",
-                        num_clips=int(auto_num_clips),
-                        clip_duration=auto_duration,
-                        format_type=format_type,
-                        zoom_mode="fill",  # Toujours fill pour l'auto
-                        enable_subtitles=enable_subtitles,
-                        subtitle_animation=subtitle_animation if enable_subtitles else "none",
-                        detection_method="smart",
-                        add_transitions=auto_assemble,
-                        transition_type="fade",
-                    )
-                    
-                    progress_bar.progress(100)
-                    status_text.text("✅ Génération terminée!")
-                    
-                    if results["success"]:
-                        st.success(f"✅ {len(results['clips'])} clips générés automatiquement!")
-                        
-                        # Afficher les clips créés
-                        st.subheader("📥 Clips générés")
-                        for i, clip_info in enumerate(results["clips"]):
-                            col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
-                            with col_dl1:
-                                st.write(f"**Clip {i+1}**")
-                            with col_dl2:
-                                st.caption(f"{clip_info['start']:.1f}s - {clip_info['end']:.1f}s")
-                            with col_dl3:
-                                with open(clip_info["path"], "rb") as f:
-                                    st.download_button(
-                                        label="📥",
-                                        data=f,
-                                        file_name=Path(clip_info["path"]).name,
-                                        mime="video/mp4",
-                                        key=f"auto_dl_{i}",
-                                    )
-                            
-                            # Ajouter à la liste
-                            st.session_state.created_clips.append(clip_info["path"])
-                        
-                        # Afficher la vidéo assemblée si créée
-                        if results.get("assembled"):
-                            st.subheader("🎬 Vidéo finale assemblée")
-                            st.video(results["assembled"])
-                            with open(results["assembled"], "rb") as f:
-                                st.download_button(
-                                    label="📥 Télécharger la vidéo complète",
-                                    data=f,
-                                    file_name="auto_clip_assembled.mp4",
-                                    mime="video/mp4",
-                                    use_container_width=True,
-                                )
-                        
-                        # Résumé
-                        with st.expander("📊 Détails de la génération"):
-                            st.write(f"**Méthode utilisée:** {results['method_used']}")
-                            st.write(f"**Sous-titres générés:** {'Oui' if results['subtitles'] else 'Non'}")
-                            st.write(f"**Moments détectés:** {len(results['detected_moments'])}")
-                            for i, (start, end) in enumerate(results['detected_moments']):
-                                st.write(f"  • Clip {i+1}: {start:.1f}s - {end:.1f}s")
-                    else:
-                        st.error(f"❌ Erreur: {results.get('error', 'Inconnue')}")
-                        
-                except Exception as e:
-                    st.error(f"❌ Erreur: {e}")
-                    st.exception(e)
+        if st.button("🚀 GÉNÉRATION AUTO COMPLÈTE", use_container_width=True, type="primary", disabled=job_running("auto")):
+            st.session_state.auto_results = None
+            submit_job(
+                "auto",
+                "🤖 Génération automatique",
+                st.session_state.processor.generate_clips_auto,
+                video_path=str(st.session_state.uploaded_file_path),
+                output_prefix="auto_clip",
+                num_clips=int(auto_num_clips),
+                clip_duration=auto_duration,
+                format_type=format_type,
+                zoom_mode="fill",  # Toujours fill pour l'auto
+                enable_subtitles=enable_subtitles,
+                subtitle_style=subtitle_style,
+                subtitle_font=subtitle_font,
+                subtitle_position=subtitle_position,
+                subtitle_size=subtitle_size,
+                subtitle_color=subtitle_color,
+                detection_method="smart",
+                add_transitions=auto_assemble,
+                transition_type="fade",
+            )
+            st.rerun()
+        
+        results = st.session_state.auto_results
+        if results:
+            if results["success"]:
+                st.success(f"✅ {len(results['clips'])} clips générés automatiquement!")
+                
+                # Afficher les clips créés
+                st.subheader("📥 Clips générés")
+                for i, clip_info in enumerate(results["clips"]):
+                    col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+                    with col_dl1:
+                        st.write(f"**Clip {i+1}**")
+                    with col_dl2:
+                        st.caption(f"{clip_info['start']:.1f}s - {clip_info['end']:.1f}s")
+                    with col_dl3:
+                        with open(clip_info["path"], "rb") as f:
+                            st.download_button(
+                                label="📥",
+                                data=f,
+                                file_name=Path(clip_info["path"]).name,
+                                mime="video/mp4",
+                                key=f"auto_dl_{i}",
+                            )
+                
+                # Afficher la vidéo assemblée si créée
+                if results.get("assembled"):
+                    st.subheader("🎬 Vidéo finale assemblée")
+                    st.video(results["assembled"])
+                    with open(results["assembled"], "rb") as f:
+                        st.download_button(
+                            label="📥 Télécharger la vidéo complète",
+                            data=f,
+                            file_name="auto_clip_assembled.mp4",
+                            mime="video/mp4",
+                            use_container_width=True,
+                        )
+                
+                # Résumé
+                with st.expander("📊 Détails de la génération"):
+                    st.write(f"**Méthode utilisée:** {results['method_used']}")
+                    st.write(f"**Sous-titres générés:** {'Oui' if results['subtitles'] else 'Non'}")
+                    st.write(f"**Moments détectés:** {len(results['detected_moments'])}")
+                    for i, (start, end) in enumerate(results['detected_moments']):
+                        st.write(f"  • Clip {i+1}: {start:.1f}s - {end:.1f}s")
+            else:
+                st.error(f"❌ Erreur: {results.get('error', 'Inconnue')}")
         
         st.divider()
         st.markdown("### ⚙️ Mode Avancé (Configuration manuelle)")
@@ -548,97 +840,54 @@ with tab3:
             )
         
         st.write("")
-        if st.button("🎲 Générer avec paramètres", use_container_width=True):
-            with st.spinner("Analyse et génération des clips en cours..."):
-                try:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    # Étape 1: Détection des moments
-                    status_text.text("🔍 Détection des moments intéressants...")
-                    time_ranges = st.session_state.processor.auto_detect_moments(
-                        str(st.session_state.uploaded_file_path),
-                        clip_duration=clip_duration_auto,
-                        num_clips=int(num_clips),
-                        detection_method=detection_method,
-                        min_gap=min_gap,
-                    )
-                    progress_bar.progress(20)
-                    
-                    # Étape 2: Génération des clips
-                    status_text.text(f"🎬 Création de {len(time_ranges)} clips...")
-                    
-                    # Utiliser les sous-titres animés si activé
-                    if enable_subtitles and subtitle_animation != "none":
-                        output_paths = []
-                        for i, (start, end) in enumerate(time_ranges):
-                            segment_subs = None
-                            if st.session_state.subtitles:
-                                segment_subs = [
-                                    s for s in st.session_state.subtitles
-                                    if s['start'] >= start and s['end'] <= end
-                                ]
-                                for s in segment_subs:
-                                    s['start'] -= start
-                                    s['end'] -= start
-                            
-                            path = st.session_state.processor.create_clip_with_animated_subtitles(
-                                video_path=str(st.session_state.uploaded_file_path),
-                                start_time=start,
-                                end_time=end,
-                                output_name=f"clip_{i+1:03d}_animated.mp4",
-                                format_type=format_type,
-                                zoom_mode=zoom_mode,
-                                subtitles_list=segment_subs,
-                                subtitle_animation=subtitle_animation,
-                            )
-                            output_paths.append(path)
-                            progress_bar.progress(20 + int(60 * (i + 1) / len(time_ranges)))
-                    else:
-                        output_paths = st.session_state.processor.create_multiple_clips(
-                            video_path=str(st.session_state.uploaded_file_path),
-                            time_ranges=time_ranges,
-                            format_type=format_type,
-                            zoom_mode=zoom_mode,
-                            add_subtitles=enable_subtitles,
-                            subtitles_list=st.session_state.subtitles,
+        if st.button("🎲 Générer avec paramètres", use_container_width=True, disabled=job_running("batch")):
+            st.session_state.batch_results = None
+            submit_job(
+                "batch",
+                "🎲 Génération avec paramètres",
+                run_batch,
+                st.session_state.processor,
+                str(st.session_state.uploaded_file_path),
+                clip_duration=clip_duration_auto,
+                num_clips=int(num_clips),
+                detection_method=detection_method,
+                min_gap=min_gap,
+                format_type=format_type,
+                zoom_mode=zoom_mode,
+                enable_subtitles=enable_subtitles,
+                subtitle_animation=subtitle_animation if enable_subtitles else "none",
+                subtitles=st.session_state.subtitles,
+            )
+            st.rerun()
+        
+        batch = st.session_state.batch_results
+        if batch:
+            output_paths = batch["paths"]
+            st.success(f"✅ {len(output_paths)} clips créés avec succès!")
+            
+            # Afficher les liens de téléchargement
+            st.subheader("📥 Télécharger les clips")
+            
+            for i, path in enumerate(output_paths):
+                col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+                with col_dl1:
+                    st.write(f"**Clip {i+1}**")
+                with col_dl2:
+                    st.caption(f"{Path(path).name}")
+                with col_dl3:
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            label="📥",
+                            data=f,
+                            file_name=Path(path).name,
+                            mime="video/mp4",
+                            key=f"dl_{path}",
                         )
-                    
-                    progress_bar.progress(100)
-                    status_text.text("✅ Terminé!")
-                    
-                    st.success(f"✅ {len(output_paths)} clips créés avec succès!")
-                    
-                    # Ajouter à la liste
-                    st.session_state.created_clips.extend(output_paths)
-                    
-                    # Afficher les liens de téléchargement
-                    st.subheader("📥 Télécharger les clips")
-                    
-                    for i, path in enumerate(output_paths):
-                        col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
-                        with col_dl1:
-                            st.write(f"**Clip {i+1}**")
-                        with col_dl2:
-                            st.caption(f"{Path(path).name}")
-                        with col_dl3:
-                            with open(path, "rb") as f:
-                                st.download_button(
-                                    label="📥",
-                                    data=f,
-                                    file_name=Path(path).name,
-                                    mime="video/mp4",
-                                    key=f"dl_{path}",
-                                )
-                    
-                    # Résumé
-                    with st.expander("📊 Résumé des clips"):
-                        for i, (start, end) in enumerate(time_ranges):
-                            st.write(f"**Clip {i+1}:** {start:.1f}s - {end:.1f}s (durée: {end-start:.1f}s)")
-                            
-                except Exception as e:
-                    st.error(f"❌ Erreur: {e}")
-                    st.exception(e)
+            
+            # Résumé
+            with st.expander("📊 Résumé des clips"):
+                for i, (start, end) in enumerate(batch["time_ranges"]):
+                    st.write(f"**Clip {i+1}:** {start:.1f}s - {end:.1f}s (durée: {end-start:.1f}s)")
     else:
         st.info("👆 Importez d'abord une vidéo dans l'onglet 'Importer'")
 
@@ -659,7 +908,10 @@ with tab4:
         with col_trans1:
             transition_type = st.selectbox(
                 "Type de transition",
-                options=["fade", "crossfade", "slide_left", "slide_right", "slide_up", "slide_down"],
+                options=[
+                    "fade", "crossfade", "slide_left", "slide_right", "slide_up", "slide_down",
+                    "zoom_in", "zoom_out", "wipe_left", "wipe_right",
+                ],
                 format_func=lambda x: {
                     "fade": "✨ Fondu",
                     "crossfade": "🔄 Fondu enchaîné",
@@ -667,6 +919,10 @@ with tab4:
                     "slide_right": "➡️ Glissement droite",
                     "slide_up": "⬆️ Glissement haut",
                     "slide_down": "⬇️ Glissement bas",
+                    "zoom_in": "🔍 Zoom avant",
+                    "zoom_out": "🔎 Zoom arrière",
+                    "wipe_left": "◀️ Rideau gauche",
+                    "wipe_right": "▶️ Rideau droite",
                 }[x],
             )
         
@@ -761,15 +1017,20 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Nettoyage
+# Nettoyage (la source importée reste dans le cache pour les prochains imports)
 if st.session_state.uploaded_file_path and not uploaded_file:
-    try:
-        os.unlink(st.session_state.uploaded_file_path)
-    except:
-        pass
     st.session_state.uploaded_file_path = None
     st.session_state.video_info = None
     st.session_state.subtitles = None
     st.session_state.scene_changes = None
     st.session_state.preview_path = None
+    st.session_state.thumbnail_index = None
+    st.rerun()
+
+# Suivi des traitements en arrière-plan : rafraîchir tant qu'un job tourne
+if any(
+    job is not None and not job.finished
+    for job in get_job_runner().jobs([entry["id"] for entry in st.session_state.jobs])
+):
+    time.sleep(1)
     st.rerun()
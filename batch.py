@@ -0,0 +1,209 @@
+"""Génération automatique de clips en lot, sans interface (reprise sur manifeste).
+
+Exemple :
+    python batch.py videos/ --workers 4 --num-clips 5 --assemble
+
+Le manifeste (JSON) enregistre l'état de chaque source. Relancer la même
+commande saute les sources terminées ; pour une source interrompue, les
+étapes déjà calculées (analyse, clips rendus) sont reprises du cache du
+pipeline (`RenderGraph`).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List
+
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+def find_sources(inputs: List[str]) -> List[Path]:
+    """Liste les vidéos à traiter (fichiers donnés ou contenus des répertoires)."""
+    sources = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            sources.extend(
+                p for p in sorted(path.rglob("*"))
+                if p.suffix.lower() in VIDEO_EXTENSIONS and not p.name.startswith(".")
+            )
+        elif path.is_file():
+            sources.append(path)
+        else:
+            print(f"⚠️ Source introuvable: {item}")
+    return [p.resolve() for p in sources]
+
+
+def source_signature(path: Path) -> Dict:
+    """Identité d'une source pour détecter un fichier remplacé entre deux lancements."""
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class Manifest:
+    """Manifeste JSON de progression, écrit uniquement par le processus principal."""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {"sources": {}}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+    
+    def entry(self, source: Path) -> Dict:
+        return self.data["sources"].setdefault(str(source), {"status": "pending"})
+    
+    def is_done(self, source: Path, options: Dict) -> bool:
+        """Source terminée avec les mêmes options, inchangée depuis, sorties présentes."""
+        entry = self.data["sources"].get(str(source))
+        if not entry or entry.get("status") != "done":
+            return False
+        if entry.get("signature") != source_signature(source) or entry.get("options") != options:
+            return False
+        outputs = [c["path"] for c in entry.get("clips", [])]
+        if entry.get("assembled"):
+            outputs.append(entry["assembled"])
+        return all(Path(p).exists() for p in outputs)
+    
+    def update(self, source: Path, **fields):
+        entry = self.entry(source)
+        entry.update(fields, updated_at=time.time())
+        self.save()
+    
+    def save(self):
+        """Écriture atomique (le manifeste reste lisible si le lot est interrompu)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def process_source(source: str, output_dir: str, cache_dir: str, options: Dict) -> Dict:
+    """Traite une source dans un processus du pool (étapes en cache réutilisées)."""
+    from video_processor import VideoProcessor
+    
+    processor = VideoProcessor(output_dir=output_dir, cache_dir=cache_dir)
+    return processor.generate_clips_auto(video_path=source, **options)
+
+
+def output_dir_for(root: Path, source: Path) -> Path:
+    """Répertoire de sortie d'une source (stable d'un lancement à l'autre)."""
+    digest = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:8]
+    return root / f"{source.stem}-{digest}"
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Génération automatique de clips en lot")
+    parser.add_argument("sources", nargs="+", help="Vidéos ou répertoires de vidéos")
+    parser.add_argument("--output-dir", default="output/batch", help="Répertoire des sorties")
+    parser.add_argument("--cache-dir", default="cache", help="Cache d'analyse partagé")
+    parser.add_argument("--manifest", default=None, help="Manifeste (défaut: <output-dir>/manifest.json)")
+    parser.add_argument("--workers", type=int, default=2, help="Nombre de sources traitées en parallèle")
+    parser.add_argument("--num-clips", type=int, default=5)
+    parser.add_argument("--clip-duration", type=float, default=30.0)
+    parser.add_argument("--format", default="tiktok", choices=["tiktok", "youtube_shorts", "instagram_reels"])
+    parser.add_argument("--zoom", default="fill", choices=["fit", "fill", "center"])
+    parser.add_argument("--detection", default="smart", choices=["smart", "audio_peaks", "scene_change", "equal"])
+    parser.add_argument("--no-subtitles", action="store_true", help="Ne pas générer de sous-titres")
+    parser.add_argument("--assemble", action="store_true", help="Assembler les clips avec transitions")
+    parser.add_argument("--transition", default="fade")
+    parser.add_argument("--target-size", type=float, default=None, help="Taille maximale de chaque clip (Mo)")
+    parser.add_argument("--retry-failed", action="store_true", help="Retenter les sources en échec")
+    args = parser.parse_args(argv)
+    
+    output_root = Path(args.output_dir)
+    manifest = Manifest(Path(args.manifest) if args.manifest else output_root / "manifest.json")
+    options = {
+        "num_clips": args.num_clips,
+        "clip_duration": args.clip_duration,
+        "format_type": args.format,
+        "zoom_mode": args.zoom,
+        "enable_subtitles": not args.no_subtitles,
+        "detection_method": args.detection,
+        "add_transitions": args.assemble,
+        "transition_type": args.transition,
+    }
+    if args.target_size:
+        # Absente sinon : les manifestes existants restent valides
+        options["target_size_mb"] = args.target_size
+    
+    pending = []
+    for source in find_sources(args.sources):
+        if manifest.is_done(source, options):
+            continue
+        entry = manifest.entry(source)
+        if entry.get("status") == "failed" and not args.retry_failed:
+            continue
+        pending.append(source)
+    
+    total = len(manifest.data["sources"])
+    print(f"{len(pending)} source(s) à traiter ({total} dans le manifeste)")
+    if not pending:
+        return 0
+    
+    failures = 0
+    workers = max(1, args.workers)
+    queue = list(pending)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        
+        def submit_next():
+            source = queue.pop(0)
+            output_dir = output_dir_for(output_root, source)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            manifest.update(
+                source,
+                status="running",
+                output_dir=str(output_dir),
+                signature=source_signature(source),
+                options=options,
+            )
+            future = executor.submit(process_source, str(source), str(output_dir), args.cache_dir, options)
+            running[future] = source
+        
+        # File bornée : au plus `workers` sources en vol
+        while queue and len(running) < workers:
+            submit_next()
+        
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = running.pop(future)
+                try:
+                    result = future.result()
+                    error = None if result.get("success") else result.get("error", "échec")
+                except Exception as e:
+                    result, error = {}, str(e)
+                
+                if error:
+                    failures += 1
+                    manifest.update(source, status="failed", error=error)
+                    print(f"❌ {source.name}: {error}")
+                else:
+                    manifest.update(
+                        source,
+                        status="done",
+                        error=None,
+                        clips=[
+                            {"path": c["path"], "start": float(c["start"]), "end": float(c["end"])}
+                            for c in result["clips"]
+                        ],
+                        assembled=result.get("assembled"),
+                    )
+                    print(f"✅ {source.name}: {len(result['clips'])} clip(s)")
+                
+                if queue:
+                    submit_next()
+    
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Benchmark des noyaux de transition (coût par frame comparé au fondu enchaîné)."""
+
+import sys
+import time
+
+import numpy as np
+
+from video_effects import TRANSITION_KERNELS, TransitionType
+
+
+def bench_kernel(kernel, frame_a, frame_b, frames: int = 30, repeat: int = 3) -> float:
+    """Temps moyen par frame (en ms) d'un noyau sur une transition complète."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(frames):
+            kernel(frame_a, frame_b, i / (frames - 1))
+        best = min(best, (time.perf_counter() - start) / frames)
+    return best * 1000
+
+
+def main(width: int = 1080, height: int = 1920) -> int:
+    rng = np.random.default_rng(0)
+    frame_a = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame_b = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    
+    # Préchauffage (grilles et masques précalculés)
+    for kernel in TRANSITION_KERNELS.values():
+        kernel(frame_a, frame_b, 0.5)
+    
+    reference = bench_kernel(TRANSITION_KERNELS[TransitionType.CROSSFADE], frame_a, frame_b)
+    print(f"Frames {width}x{height}")
+    print(f"{'transition':<14}{'ms/frame':>10}{'ratio':>8}")
+    
+    worst = 0.0
+    for transition_type, kernel in TRANSITION_KERNELS.items():
+        elapsed = bench_kernel(kernel, frame_a, frame_b)
+        ratio = elapsed / reference
+        worst = max(worst, ratio)
+        print(f"{transition_type.value:<14}{elapsed:>10.2f}{ratio:>8.2f}")
+    
+    # Objectif : aucun noyau au-delà de 2x le fondu enchaîné
+    return 0 if worst <= 2.0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
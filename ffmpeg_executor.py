@@ -0,0 +1,240 @@
+"""Exécution asynchrone des processus ffmpeg/ffprobe, avec limite de concurrence.
+
+Une boucle asyncio tourne dans un thread dédié et lance ffmpeg en
+sous-processus asynchrones. Des sémaphores bornent le nombre de processus
+simultanés pour tout le programme, par voie : les sondes (quelques
+millisecondes), les rendus de clips, et les lectures ou transcodages d'une
+source entière (plusieurs minutes). Les jobs, l'interface et la génération
+de proxys partagent ces limites ; une sonde lancée par l'interface n'attend
+jamais la fin d'un transcodage, et un proxy en cours ne bloque pas les rendus.
+
+Les appelants synchrones passent par la façade (`run_ffmpeg`, `stream_ffmpeg`),
+qui soumet la coroutine à la boucle et attend son résultat.
+"""
+
+import asyncio
+import os
+import subprocess
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+
+# Taille des blocs lus sur la sortie standard (hors frames)
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Voies de concurrence, chacune avec sa propre limite
+LANE_PROBE = "probe"  # ffprobe, en-tête `ffmpeg -i`, liste des paquets (framecrc)
+LANE_RENDER = "render"  # Encodage d'un clip, d'une transition, d'un assemblage
+LANE_LONG = "long"  # Lecture ou transcodage d'une source entière (proxy, analyse)
+
+
+def default_concurrency() -> int:
+    """Nombre de rendus ffmpeg simultanés (variable CLIPP_FFMPEG_JOBS sinon CPU/2)."""
+    value = os.environ.get("CLIPP_FFMPEG_JOBS")
+    if value:
+        return max(2, int(value))
+    return max(2, (os.cpu_count() or 4) // 2)
+
+
+class FFmpegExecutor:
+    """Boucle asyncio partagée qui exécute les commandes ffmpeg.
+    
+    Chaque commande passe par une voie (`LANE_*`) dont la limite est
+    indépendante des autres : un flux en cours de lecture occupe une place de
+    sa voie, et l'appelant peut lancer une sonde pendant qu'il le consomme.
+    La voie des rendus garde une concurrence minimale de 2 pour la même raison.
+    """
+    
+    # Sondes simultanées (courtes, peu coûteuses)
+    PROBE_CONCURRENCY = 4
+    
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Initialise l'exécuteur (la boucle démarre au premier appel).
+        
+        Args:
+            max_concurrency: Nombre maximal de rendus simultanés ; les
+                traitements d'une source entière en utilisent la moitié
+        """
+        self.max_concurrency = max(2, max_concurrency or default_concurrency())
+        self.limits = {
+            LANE_PROBE: self.PROBE_CONCURRENCY,
+            LANE_RENDER: self.max_concurrency,
+            LANE_LONG: max(1, self.max_concurrency // 2),
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+    
+    # --- Boucle ---
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._semaphores = {lane: asyncio.Semaphore(limit) for lane, limit in self.limits.items()}
+                self._thread = threading.Thread(target=loop.run_forever, name="ffmpeg-loop", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+    
+    def submit(self, coro):
+        """Planifie une coroutine sur la boucle et retourne un `concurrent.futures.Future`."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Appel synchrone depuis la boucle ffmpeg (utiliser la coroutine)")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+    
+    # --- API asynchrone ---
+    
+    async def run(
+        self,
+        cmd: List[str],
+        input: Optional[bytes] = None,
+        duration: Optional[float] = None,
+        on_progress: Optional[Callable[[float], None]] = None,
+        lane: str = LANE_RENDER,
+    ) -> bytes:
+        """Exécute une commande jusqu'au bout et retourne sa sortie standard.
+        
+        Args:
+            cmd: Commande (exécutable en premier)
+            input: Données envoyées sur l'entrée standard
+            duration: Durée de la sortie, pour convertir la progression en fraction
+            on_progress: Appelé avec l'avancement (0 à 1) ; la sortie standard
+                sert alors au rapport `-progress` d'ffmpeg
+            lane: Voie de concurrence (`LANE_PROBE`, `LANE_RENDER`, `LANE_LONG`)
+        
+        Raises:
+            subprocess.CalledProcessError: Code de retour non nul
+        """
+        if on_progress is not None:
+            cmd = [cmd[0], "-progress", "pipe:1", "-nostats"] + list(cmd[1:])
+        
+        async with self._semaphores[lane]:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                if on_progress is None:
+                    stdout, stderr = await proc.communicate(input)
+                else:
+                    stderr_task = asyncio.ensure_future(proc.stderr.read())
+                    if input is not None:
+                        proc.stdin.write(input)
+                        await proc.stdin.drain()
+                        proc.stdin.close()
+                    async for line in proc.stdout:
+                        key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+                        # out_time_ms est en microsecondes (nom historique d'ffmpeg)
+                        if key == "out_time_ms" and duration and value.isdigit():
+                            on_progress(min(1.0, int(value) / 1e6 / duration))
+                    stdout, stderr = b"", await stderr_task
+                    await proc.wait()
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+        
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr)
+        return stdout
+    
+    async def stream(
+        self,
+        cmd: List[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        lane: str = LANE_RENDER,
+    ) -> AsyncIterator[bytes]:
+        """Lit la sortie standard d'une commande par blocs de `chunk_size` octets.
+        
+        Chaque bloc est complet (une frame brute si `chunk_size` est la taille
+        d'une frame), sauf éventuellement le dernier. Interrompre la lecture
+        arrête le processus. La place de la voie `lane` est tenue pendant
+        toute la lecture.
+        
+        Raises:
+            subprocess.CalledProcessError: Code de retour non nul
+        """
+        async with self._semaphores[lane]:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=max(chunk_size, DEFAULT_CHUNK_SIZE),
+            )
+            stderr_task = asyncio.ensure_future(proc.stderr.read())
+            try:
+                while True:
+                    try:
+                        chunk = await proc.stdout.readexactly(chunk_size)
+                    except asyncio.IncompleteReadError as e:
+                        if e.partial:
+                            yield e.partial
+                        break
+                    yield chunk
+                await proc.wait()
+                stderr = await stderr_task
+                if proc.returncode != 0:
+                    raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+            finally:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                stderr_task.cancel()
+    
+    # --- Façade synchrone ---
+    
+    def run_sync(self, cmd: List[str], **kwargs) -> bytes:
+        """Version bloquante de `run` (mêmes arguments)."""
+        return self.submit(self.run(cmd, **kwargs)).result()
+    
+    def stream_sync(
+        self,
+        cmd: List[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        lane: str = LANE_RENDER,
+    ) -> Iterator[bytes]:
+        """Version bloquante de `stream` : générateur de blocs."""
+        agen = self.stream(cmd, chunk_size, lane)
+        try:
+            while True:
+                try:
+                    yield self.submit(agen.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Arrêt du processus si le consommateur s'interrompt
+            self.submit(agen.aclose()).result()
+
+
+_executor: Optional[FFmpegExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> FFmpegExecutor:
+    """Retourne l'exécuteur partagé par le processus."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = FFmpegExecutor()
+        return _executor
+
+
+def run_ffmpeg(cmd: List[str], **kwargs) -> bytes:
+    """Exécute une commande ffmpeg/ffprobe via l'exécuteur partagé (bloquant)."""
+    return get_executor().run_sync(cmd, **kwargs)
+
+
+def stream_ffmpeg(
+    cmd: List[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    lane: str = LANE_RENDER,
+) -> Iterator[bytes]:
+    """Lit la sortie d'une commande par blocs via l'exécuteur partagé (bloquant)."""
+    return get_executor().stream_sync(cmd, chunk_size, lane)
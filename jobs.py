@@ -0,0 +1,176 @@
+"""Exécution des rendus en arrière-plan avec suivi de progression."""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from proglog import ProgressBarLogger
+
+
+# Job exécuté par le thread courant (None hors d'un job)
+_local = threading.local()
+
+
+def current_job() -> Optional["Job"]:
+    """Retourne le job exécuté par le thread courant."""
+    return getattr(_local, "job", None)
+
+
+def progress_logger(default: Any = "bar") -> Any:
+    """Logger à passer à `write_videofile` : celui du job courant, sinon `default`."""
+    job = current_job()
+    return job.logger if job is not None else default
+
+
+def report_stage(stage: str):
+    """Indique l'étape en cours du job courant (sans effet hors d'un job)."""
+    job = current_job()
+    if job is not None:
+        job.set_stage(stage)
+
+
+def report_progress(fraction: float):
+    """Indique l'avancement (0 à 1) de l'étape en cours du job courant."""
+    job = current_job()
+    if job is not None:
+        job.set_progress(fraction)
+
+
+class JobProgressLogger(ProgressBarLogger):
+    """Logger proglog qui reporte l'avancement des exports MoviePy sur un job.
+    
+    MoviePy publie l'écriture des frames sur la barre `frame_index` et celle
+    de l'audio sur la barre `chunk` ; les messages (« Writing audio... »)
+    deviennent le détail de l'étape.
+    """
+    
+    def __init__(self, job: "Job"):
+        super().__init__()
+        self.job = job
+    
+    def callback(self, **changes):
+        message = changes.get("message")
+        if message:
+            self.job.set_detail(str(message).strip())
+    
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if attr != "index" or bar not in ("frame_index", "chunk"):
+            return
+        total = self.bars[bar].get("total")
+        if total:
+            self.job.set_progress(value / total)
+
+
+@dataclass
+class Job:
+    """État d'un job, lu par l'interface pendant qu'un worker l'exécute."""
+    id: str
+    name: str
+    state: str = "pending"  # pending, running, done, failed
+    stage: str = ""
+    detail: str = ""
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self.logger = JobProgressLogger(self)
+    
+    def set_stage(self, stage: str):
+        """Passe à une nouvelle étape (l'avancement repart de zéro)."""
+        with self._lock:
+            self.stage = stage
+            self.detail = ""
+            self.progress = 0.0
+    
+    def set_detail(self, detail: str):
+        with self._lock:
+            self.detail = detail
+    
+    def set_progress(self, fraction: float):
+        with self._lock:
+            self.progress = min(1.0, max(0.0, fraction))
+    
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Copie cohérente de l'état pour l'affichage."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "state": self.state,
+                "stage": self.stage,
+                "detail": self.detail,
+                "progress": self.progress,
+                "error": self.error,
+            }
+
+
+class JobRunner:
+    """Pool de threads qui exécute les rendus hors du script Streamlit.
+    
+    Les jobs survivent aux réexécutions du script : l'interface ne garde que
+    leurs identifiants et interroge leur état à chaque passage.
+    """
+    
+    # Durée de conservation des jobs terminés
+    RETENTION_SECONDS = 3600
+    
+    def __init__(self, max_workers: int = 2):
+        """Initialise le pool.
+        
+        Args:
+            max_workers: Nombre de rendus exécutés en parallèle
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> str:
+        """Planifie un job et retourne son identifiant."""
+        job = Job(id=uuid.uuid4().hex, name=name)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne un job par identifiant (None s'il a expiré)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self, job_ids: List[str]) -> List[Job]:
+        """Retourne les jobs encore connus parmi une liste d'identifiants."""
+        with self._lock:
+            return [self._jobs[i] for i in job_ids if i in self._jobs]
+    
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict):
+        _local.job = job
+        job.state = "running"
+        try:
+            job.result = fn(*args, **kwargs)
+            job.state = "done"
+            job.set_progress(1.0)
+        except Exception as e:
+            job.error = f"{e}\n{traceback.format_exc()}"
+            job.state = "failed"
+        finally:
+            job.finished_at = time.time()
+            _local.job = None
+    
+    def _prune(self):
+        """Oublie les jobs terminés depuis longtemps (appelé sous verrou)."""
+        limit = time.time() - self.RETENTION_SECONDS
+        for job_id in [i for i, j in self._jobs.items() if j.finished_at and j.finished_at < limit]:
+            del self._jobs[job_id]
@@ -0,0 +1,92 @@
+"""Test de charge du service de rendu (débit et latence des jobs).
+
+Exemple :
+    python service.py --workers 4 &
+    python load_test.py videos/source.mp4 --jobs 20 --num-clips 1
+
+Avec `--cold`, chaque job reçoit une durée de clip légèrement différente pour
+contourner le cache des étapes et mesurer de vrais rendus.
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+
+def request(url: str, payload: Dict = None) -> Dict:
+    """Appel JSON au service (GET, ou POST si `payload` est donné)."""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge du service de rendu")
+    parser.add_argument("source", help="Vidéo soumise à chaque job")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--jobs", type=int, default=10, help="Nombre de jobs soumis")
+    parser.add_argument("--num-clips", type=int, default=1)
+    parser.add_argument("--clip-duration", type=float, default=15.0)
+    parser.add_argument("--no-subtitles", action="store_true")
+    parser.add_argument("--cold", action="store_true", help="Paramètres distincts par job (pas de cache)")
+    parser.add_argument("--timeout", type=float, default=3600, help="Attente maximale (secondes)")
+    args = parser.parse_args(argv)
+    
+    base = args.url.rstrip("/")
+    source = str(Path(args.source).resolve())
+    
+    def submit(i: int) -> str:
+        payload = {
+            "source": source,
+            "num_clips": args.num_clips,
+            "clip_duration": args.clip_duration + (0.01 * i if args.cold else 0.0),
+            "enable_subtitles": not args.no_subtitles,
+        }
+        return request(f"{base}/jobs", payload)["id"]
+    
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        job_ids = list(executor.map(submit, range(args.jobs)))
+    print(f"{len(job_ids)} job(s) soumis en {time.time() - started:.1f}s")
+    
+    # Attente de la fin de tous les jobs
+    pending = set(job_ids)
+    finished: Dict[str, Dict] = {}
+    while pending and time.time() - started < args.timeout:
+        for job_id in list(pending):
+            job = request(f"{base}/jobs/{job_id}")
+            if job["status"] in ("done", "failed"):
+                finished[job_id] = job
+                pending.discard(job_id)
+        if pending:
+            time.sleep(1)
+    elapsed = time.time() - started
+    
+    done = [j for j in finished.values() if j["status"] == "done"]
+    failed = [j for j in finished.values() if j["status"] == "failed"]
+    print(f"Terminés: {len(done)}  échecs: {len(failed)}  non terminés: {len(pending)}")
+    if done:
+        latencies = [j["finished_at"] - j["created_at"] for j in done]
+        renders = [j["finished_at"] - j["started_at"] for j in done]
+        print(f"Débit: {len(done) / elapsed * 60:.1f} jobs/min")
+        print(f"Latence (file + rendu)  p50 {percentile(latencies, 0.5):.1f}s  p95 {percentile(latencies, 0.95):.1f}s")
+        print(f"Rendu seul              p50 {percentile(renders, 0.5):.1f}s  p95 {percentile(renders, 0.95):.1f}s")
+    for job in failed[:5]:
+        print(f"❌ {job['id']}: {job['error']}")
+    
+    return 1 if failed or pending else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Sélection des moments : détecteurs, courbe d'intérêt et choix des fenêtres de clips.
+
+Fonctions NumPy pures, sans accès aux médias : les séries de caractéristiques
+(enveloppe audio, différences entre frames, débit de parole) sont extraites et
+mises en cache par `VideoProcessor`, puis exploitées ici. Changer un seuil ou
+une durée ne demande donc que quelques millisecondes, sans nouveau décodage.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.signal import find_peaks
+
+
+# Pas de la courbe d'intérêt, en secondes
+CURVE_STEP = 1.0
+
+# Poids des caractéristiques (renormalisés sur celles disponibles)
+FEATURE_WEIGHTS = {"audio": 0.5, "scenes": 0.3, "speech": 0.2}
+
+
+def scene_changes_from_diffs(
+    diffs: Sequence[float],
+    step: float,
+    threshold: float = 30.0,
+    min_scene_duration: float = 2.0,
+) -> List[float]:
+    """Changements de scène à partir des différences entre frames échantillonnées.
+    
+    Args:
+        diffs: Différence moyenne de chaque frame avec la précédente (pas `step`)
+        step: Intervalle entre deux frames, en secondes
+        threshold: Seuil de détection (différence entre frames)
+        min_scene_duration: Durée minimale entre deux scènes (et depuis le début)
+        
+    Returns:
+        Liste des timestamps des changements de scène
+    """
+    candidates = np.flatnonzero(np.asarray(diffs, dtype=np.float64) > threshold) * step
+    
+    # Espacement minimal : parcours des seuls candidats, peu nombreux
+    scene_changes, last_scene_time = [], 0.0
+    for t in candidates:
+        if t - last_scene_time >= min_scene_duration:
+            scene_changes.append(float(t))
+            last_scene_time = t
+    return scene_changes
+
+
+def audio_peak_ranges(
+    envelope: Sequence[float],
+    step: float,
+    duration: float,
+    min_clip_duration: float = 15.0,
+    max_clip_duration: float = 60.0,
+    num_clips: int = 5,
+    prominence: float = 0.1,
+) -> List[Tuple[float, float]]:
+    """Fenêtres centrées sur les pics les plus marqués de l'enveloppe audio.
+    
+    Args:
+        envelope: Volume par fenêtre de `step` secondes
+        step: Pas de l'enveloppe, en secondes
+        duration: Durée de la source
+        min_clip_duration: Durée minimale d'un clip (et distance entre pics)
+        max_clip_duration: Durée maximale d'un clip
+        num_clips: Nombre de clips à détecter
+        prominence: Seuil de détection des pics (0-1, volume normalisé)
+        
+    Returns:
+        Liste de tuples (start_time, end_time) triée, vide si aucun pic
+    """
+    volumes = np.asarray(envelope, dtype=np.float64)
+    if volumes.size == 0:
+        return []
+    if volumes.max() > 0:
+        volumes = volumes / volumes.max()
+    
+    peaks, properties = find_peaks(
+        volumes,
+        prominence=prominence,
+        distance=max(1, int(min_clip_duration / step)),  # Distance minimale entre pics
+    )
+    
+    # Trier par prominence et prendre les meilleurs
+    top_peaks = peaks[np.argsort(properties["prominences"])[::-1][:num_clips]]
+    
+    time_ranges = []
+    for peak in top_peaks:
+        start = max(0.0, peak * step - max_clip_duration / 2)
+        end = min(duration, start + max_clip_duration)
+        
+        # Ajuster si on dépasse
+        if end - start < min_clip_duration:
+            start = max(0.0, end - min_clip_duration)
+        
+        time_ranges.append((float(start), float(end)))
+    
+    return sorted(time_ranges)
+
+
+def curve_length(duration: float, step: float = CURVE_STEP) -> int:
+    """Nombre de points de la courbe pour une durée donnée."""
+    return max(1, int(np.ceil(duration / step)))
+
+
+def resample_series(values: Sequence[float], series_step: float, duration: float, step: float = CURVE_STEP) -> np.ndarray:
+    """Ramène une série régulière (pas `series_step`) au pas de la courbe (moyenne par case)."""
+    values = np.asarray(values, dtype=np.float64)
+    n = curve_length(duration, step)
+    if values.size == 0:
+        return np.zeros(n)
+    bins = np.minimum((np.arange(values.size) * series_step / step).astype(int), n - 1)
+    sums = np.bincount(bins, weights=values, minlength=n)
+    counts = np.bincount(bins, minlength=n)
+    return np.divide(sums, counts, out=np.zeros(n), where=counts > 0)
+
+
+def event_density(times: Sequence[float], duration: float, step: float = CURVE_STEP) -> np.ndarray:
+    """Nombre d'événements (changements de scène) par case de la courbe."""
+    n = curve_length(duration, step)
+    times = np.asarray(times, dtype=np.float64)
+    bins = np.clip((times / step).astype(int), 0, n - 1)
+    return np.bincount(bins, minlength=n).astype(np.float64)
+
+
+def speech_rate(subtitles: Sequence[dict], duration: float, step: float = CURVE_STEP) -> np.ndarray:
+    """Mots prononcés par case, chaque segment répartissant ses mots sur sa durée (à la case près)."""
+    n = curve_length(duration, step)
+    rate = np.zeros(n + 1)
+    for sub in subtitles:
+        start, end = max(0.0, sub["start"]), min(duration, sub["end"])
+        words = len(sub["text"].split())
+        if end <= start or not words:
+            continue
+        # Densité constante sur le segment, accumulée par différences
+        density = words / (end - start) * step
+        rate[int(start / step)] += density
+        rate[min(n, int(np.ceil(end / step)))] -= density
+    return np.cumsum(rate)[:n]
+
+
+def fuse_features(
+    features: Dict[str, Optional[np.ndarray]],
+    weights: Dict[str, float] = FEATURE_WEIGHTS,
+) -> np.ndarray:
+    """Combine des séries de même longueur en une courbe d'intérêt dans [0, 1].
+    
+    Chaque série est normalisée par son maximum ; les séries absentes ou
+    nulles sont ignorées et les poids restants renormalisés.
+    """
+    curves, total = [], 0.0
+    length = next(len(v) for v in features.values() if v is not None)
+    for name, values in features.items():
+        if values is None or weights.get(name, 0.0) <= 0:
+            continue
+        peak = float(np.max(values)) if len(values) else 0.0
+        if peak <= 0:
+            continue
+        curves.append(weights[name] * np.asarray(values, dtype=np.float64) / peak)
+        total += weights[name]
+    if not curves:
+        return np.zeros(length)
+    return np.sum(curves, axis=0) / total
+
+
+def window_scores(curve: np.ndarray, width: int) -> np.ndarray:
+    """Somme de la courbe sur chaque fenêtre de `width` cases (une par début possible)."""
+    width = min(width, len(curve))
+    cumulative = np.concatenate(([0.0], np.cumsum(curve)))
+    return cumulative[width:] - cumulative[:-width]
+
+
+def select_windows(scores: np.ndarray, width: int, count: int, gap: int = 0) -> List[int]:
+    """Choisit `count` débuts de fenêtre maximisant la somme des scores.
+    
+    Deux fenêtres retenues sont séparées d'au moins `gap` cases. Résolution
+    exacte par programmation dynamique, vectorisée : pour k fenêtres, le
+    meilleur total à partir de la case i est le maximum suffixe de
+    `scores[j] + meilleur(k-1, j + width + gap)`, soit O(count × n).
+    
+    Returns:
+        Débuts retenus, triés (moins de `count` si la durée ne suffit pas)
+    """
+    n = len(scores)
+    stride = width + gap
+    count = min(count, (n - 1) // stride + 1) if n else 0
+    if count <= 0:
+        return []
+    
+    # best[i] : meilleur total avec k fenêtres commençant à i ou après
+    # (-inf au-delà de la dernière case, où aucune fenêtre ne commence)
+    best = np.zeros(n + stride)
+    candidates = []
+    for _ in range(count):
+        shifted = scores + best[stride:]
+        candidates.append(shifted)
+        suffix = np.maximum.accumulate(shifted[::-1])[::-1]
+        best = np.concatenate((suffix, np.full(stride, -np.inf)))
+    
+    # Reconstruction : premier début atteignant le meilleur total restant
+    starts, i = [], 0
+    for shifted in reversed(candidates):
+        j = i + int(np.argmax(shifted[i:]))
+        starts.append(j)
+        i = j + stride
+    return starts
@@ -0,0 +1,258 @@
+"""Pipeline de génération automatique en étapes adressées par contenu.
+
+Chaque étape (analyse, sélection des moments, rendu d'un clip, gravure des
+sous-titres, assemblage) produit un résultat stocké sous une clé calculée à
+partir de ses entrées et de ses paramètres. Relancer le pipeline avec un
+paramètre modifié ne recalcule que les étapes dont la clé change : changer
+de transition, par exemple, ne refait que l'assemblage.
+"""
+
+import copy
+import os
+import shutil
+import threading
+from typing import Callable, Dict, List, Optional
+
+from analysis_cache import cache_key, evict_lru
+from jobs import report_stage
+
+
+class RenderGraph:
+    """Exécute `generate_clips_auto` en réutilisant les étapes déjà calculées."""
+    
+    # Budget disque des rendus intermédiaires (éviction LRU au-delà)
+    RENDER_CACHE_BUDGET = 10 * 1024 ** 3
+    
+    # Version des étapes : à incrémenter si leur implémentation change le résultat
+    VERSION = 1
+    
+    # Version de la sélection des moments (courbe d'intérêt)
+    SELECTION_VERSION = 2
+    
+    def __init__(self, processor):
+        """Initialise le pipeline.
+        
+        Args:
+            processor: VideoProcessor dont on utilise le cache et les réglages
+        """
+        self.processor = processor
+        self.cache = processor.cache
+        self.store = self.cache.shared_dir("renders")
+        
+        # Même processeur, mais écrivant les rendus intermédiaires dans le magasin
+        self.stage_processor = copy.copy(processor)
+        self.stage_processor.output_dir = self.store
+    
+    def _encoding_settings(self) -> tuple:
+        """Réglages d'encodage communs, inclus dans les clés des rendus."""
+        p = self.processor
+        return (
+            self.VERSION, p.EXPORT_FPS, p.EXPORT_PRESET, p.EXPORT_PIXEL_FORMAT,
+            p.EXPORT_CRF, p.EXPORT_PROFILE, p.EXPORT_LEVEL,
+        )
+    
+    def _json_stage(self, video_path: str, name: str, key: str, compute: Callable):
+        """Résultat JSON d'une étape : relu du cache ou calculé puis enregistré."""
+        cache_name = f"{name}_{key}"
+        cached = self.cache.load_json(video_path, cache_name)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.cache.save_json(video_path, cache_name, value)
+        return value
+    
+    def _file_stage(self, key: str, build: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Fichier produit par une étape : réutilisé s'il existe, sinon construit.
+        
+        `build` reçoit le nom du fichier à créer dans le magasin (écriture
+        atomique par le processeur) et retourne None en cas d'échec.
+        """
+        path = self.store / f"{key}.mp4"
+        if path.exists():
+            os.utime(path)
+            return str(path)
+        return build(path.name)
+    
+    def _materialize(self, stage_path: str, output_name: str) -> str:
+        """Publie un résultat du magasin dans output_dir (lien physique si possible)."""
+        output_path = self.processor.output_dir / output_name
+        tmp_path = output_path.with_name(
+            f".{output_path.stem}.{os.getpid()}.{threading.get_ident()}.mp4"
+        )
+        try:
+            try:
+                os.link(stage_path, tmp_path)
+            except OSError:
+                shutil.copy2(stage_path, tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return str(output_path)
+    
+    def run(
+        self,
+        video_path: str,
+        output_prefix: str = "auto_clip",
+        num_clips: int = 5,
+        clip_duration: float = 30.0,
+        format_type: str = "tiktok",
+        zoom_mode: str = "fill",
+        enable_subtitles: bool = True,
+        language: str = "fr",
+        detection_method: str = "smart",
+        min_gap: float = 5.0,
+        add_transitions: bool = False,
+        transition_type: str = "fade",
+        transition_duration: float = 0.5,
+        subtitle_config: Optional[dict] = None,
+        target_size_mb: Optional[float] = None,
+    ) -> Dict:
+        """Exécute le pipeline complet (voir `VideoProcessor.generate_clips_auto`).
+        
+        Args:
+            subtitle_config: Style des sous-titres gravés (voir
+                `subtitle_config.get_subtitle_config`, style par défaut sinon)
+            target_size_mb: Taille maximale de chaque clip publié en Mo,
+                appliquée au dernier encodage du clip (gravure ou rendu)
+        
+        Returns:
+            Dictionnaire avec les résultats et métadonnées (même forme que
+            `generate_clips_auto`)
+        """
+        from subtitle_config import get_subtitle_config
+        
+        processor = self.processor
+        fingerprint = self.cache.fingerprint(video_path)
+        subtitle_config = subtitle_config or get_subtitle_config()
+        
+        results = {
+            "success": True,
+            "clips": [],
+            "assembled": None,
+            "subtitles": None,
+            "method_used": detection_method,
+        }
+        
+        # 1. Analyse : infos et sous-titres de la source
+        results["video_info"] = processor.get_video_info(video_path)
+        subtitles_list = None
+        if enable_subtitles:
+            report_stage("🎙️ Génération des sous-titres")
+            try:
+                subtitles_list = processor.generate_subtitles(video_path, language=language)
+                results["subtitles"] = subtitles_list
+            except Exception as e:
+                print(f"Génération sous-titres échouée: {e}")
+        
+        # 2. Sélection des moments
+        report_stage("🧠 Détection des moments")
+        selection_key = cache_key(
+            self.VERSION, self.SELECTION_VERSION, fingerprint, detection_method,
+            clip_duration, num_clips, min_gap, subtitles_list,
+        )
+        time_ranges = self._json_stage(
+            video_path,
+            "selection",
+            selection_key,
+            lambda: [
+                [float(start), float(end)]
+                for start, end in processor.auto_detect_moments(
+                    video_path,
+                    clip_duration=clip_duration,
+                    num_clips=num_clips,
+                    detection_method=detection_method,
+                    min_gap=min_gap,
+                    subtitles=subtitles_list,
+                )
+            ],
+        )
+        results["detected_moments"] = [tuple(r) for r in time_ranges]
+        
+        # 3-4. Rendu de chaque clip puis gravure des sous-titres
+        final_keys: List[str] = []
+        final_paths: List[str] = []
+        for i, (start, end) in enumerate(time_ranges):
+            output_name = f"{output_prefix}_{i+1:03d}.mp4"
+            
+            # Images clés aux bornes des transitions (assemblage sans réencodage complet)
+            keyframe_times = None
+            if add_transitions:
+                keyframe_times = [transition_duration, (end - start) - transition_duration]
+            
+            # Taille cible au dernier encodage : la gravure réencode le clip
+            segment_subs = processor.segment_subtitles(subtitles_list, start, end)
+            clip_target = None if segment_subs else target_size_mb
+            
+            report_stage(f"🎬 Clip {i+1}/{len(time_ranges)}")
+            clip_key = cache_key(
+                "clip", fingerprint, start, end, format_type, zoom_mode,
+                keyframe_times, clip_target, self._encoding_settings(),
+            )
+            path = self._file_stage(
+                clip_key,
+                lambda name: self.stage_processor.create_clip(
+                    video_path=video_path,
+                    start_time=start,
+                    end_time=end,
+                    output_name=name,
+                    format_type=format_type,
+                    zoom_mode=zoom_mode,
+                    keyframe_times=keyframe_times,
+                    target_size_mb=clip_target,
+                ),
+            )
+            final_key = clip_key
+            
+            if segment_subs:
+                report_stage(f"💬 Sous-titres du clip {i+1}/{len(time_ranges)}")
+                captions_key = cache_key(
+                    "captions", clip_key, segment_subs, subtitle_config, target_size_mb,
+                    self._encoding_settings(),
+                )
+                
+                def burn(name, clip_path=path, subs=segment_subs, times=keyframe_times):
+                    output_path = self.store / name
+                    success = self.stage_processor.burn_subtitles_to_clip(
+                        video_path=clip_path,
+                        output_path=str(output_path),
+                        subtitles=subs,
+                        keyframe_times=times,
+                        target_size_mb=target_size_mb,
+                        **subtitle_config,
+                    )
+                    return str(output_path) if success else None
+                
+                captioned = self._file_stage(captions_key, burn)
+                if captioned:
+                    path, final_key = captioned, captions_key
+            
+            final_keys.append(final_key)
+            final_paths.append(path)
+            results["clips"].append({
+                "path": self._materialize(path, output_name),
+                "start": start,
+                "end": end,
+                "duration": end - start,
+            })
+        
+        # 5. Assemblage avec transitions
+        if add_transitions and len(final_paths) > 1:
+            report_stage("🔗 Assemblage")
+            assembly_key = cache_key(
+                "assembly", final_keys, transition_type, transition_duration, format_type,
+                self._encoding_settings(),
+            )
+            assembled = self._file_stage(
+                assembly_key,
+                lambda name: self.stage_processor.concatenate_clips_with_transitions(
+                    video_paths=final_paths,
+                    output_name=name,
+                    transition_type=transition_type,
+                    transition_duration=transition_duration,
+                    format_type=format_type,
+                ),
+            )
+            results["assembled"] = self._materialize(assembled, f"{output_prefix}_assembled.mp4")
+        
+        evict_lru(self.store, self.RENDER_CACHE_BUDGET, "[!.]*.mp4")
+        return results
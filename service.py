@@ -0,0 +1,336 @@
+"""Service HTTP local de rendu, avec file de jobs SQLite et workers persistants.
+
+Exemple :
+    python service.py --workers 4 --port 8765
+
+API (JSON) :
+    POST /jobs          {"source": "/chemin/video.mp4", "num_clips": 3, ...}
+                        -> 201 {"id": ...}
+    GET  /jobs/<id>     État, résultat ou erreur d'un job
+    GET  /jobs          Derniers jobs (filtre optionnel ?status=queued)
+    GET  /health        Nombre de jobs par état
+
+Les paramètres acceptés sont ceux de `VideoProcessor.generate_clips_auto`.
+Chaque worker est un processus qui garde son VideoProcessor et son modèle
+Whisper chargés d'un job à l'autre.
+"""
+
+import argparse
+import inspect
+import json
+import multiprocessing
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+# Intervalle de vérification des processus workers (secondes)
+WORKER_CHECK_INTERVAL = 2.0
+
+
+class JobQueue:
+    """File de jobs persistante (SQLite), partagée par le serveur et les workers.
+    
+    Chaque processus ouvre sa propre connexion ; la prise d'un job se fait
+    dans une transaction `IMMEDIATE`, si bien que deux workers ne peuvent
+    jamais réserver le même job.
+    """
+    
+    def __init__(self, db_path: str):
+        """Ouvre (et crée si besoin) la base.
+        
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()  # Connexion partagée par les threads du serveur
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+    
+    def submit(self, params: Dict) -> str:
+        """Ajoute un job en attente et retourne son identifiant."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, params, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(params), time.time()),
+            )
+        return job_id
+    
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Réserve le plus ancien job en attente (None si la file est vide)."""
+        conn = self._conn
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, params FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = ? WHERE id = ?",
+                        (worker, time.time(), row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row["id"], "params": json.loads(row["params"])}
+    
+    def finish(self, job_id: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Enregistre le résultat (ou l'erreur) d'un job."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+    
+    def requeue_running(self):
+        """Remet en attente les jobs interrompus par un arrêt du service."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running'")
+    
+    def requeue_worker(self, worker: str) -> int:
+        """Remet en attente les jobs d'un worker mort (manque de mémoire, signal).
+        
+        Un job qui a déjà fait tomber un worker est marqué en échec au lieu
+        d'être relancé, pour ne pas tuer les workers en boucle. Retourne le
+        nombre de jobs remis en attente.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ? "
+                "WHERE status = 'running' AND worker = ? AND error IS NOT NULL",
+                (time.time(), worker),
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, error = ? "
+                "WHERE status = 'running' AND worker = ?",
+                (f"{worker} arrêté pendant le rendu, job relancé", worker),
+            )
+        return cursor.rowcount
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+    
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+    
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def render_parameters() -> List[str]:
+    """Paramètres de `generate_clips_auto` acceptés par l'API."""
+    from video_processor import VideoProcessor
+    
+    signature = inspect.signature(VideoProcessor.generate_clips_auto)
+    return [name for name in signature.parameters if name not in ("self", "video_path", "output_prefix")]
+
+
+def worker_main(db_path: str, output_root: str, cache_dir: str, preload_whisper: bool, poll_interval: float = 0.5):
+    """Boucle d'un worker : un VideoProcessor et un modèle Whisper gardés chauds."""
+    from video_processor import VideoProcessor
+    
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    name = multiprocessing.current_process().name
+    queue = JobQueue(db_path)
+    processor = VideoProcessor(output_dir=output_root, cache_dir=cache_dir)
+    if preload_whisper:
+        try:
+            processor.load_whisper_model("base")
+        except ImportError:
+            pass
+    
+    while True:
+        job = queue.claim(name)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        
+        params = dict(job["params"])
+        source = params.pop("source")
+        
+        # Sorties isolées par job
+        output_dir = Path(output_root) / job["id"]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        processor.output_dir = output_dir
+        
+        try:
+            result = processor.generate_clips_auto(video_path=source, **params)
+            if result.get("success"):
+                queue.finish(job["id"], result=result)
+            else:
+                queue.finish(job["id"], result=result, error=result.get("error", "échec"))
+        except Exception as e:
+            queue.finish(job["id"], error=str(e))
+
+
+def start_worker(name: str, args: argparse.Namespace) -> multiprocessing.Process:
+    """Démarre un processus worker."""
+    process = multiprocessing.Process(
+        target=worker_main,
+        args=(args.db, args.output_dir, args.cache_dir, not args.no_whisper),
+        name=name,
+        daemon=True,
+    )
+    process.start()
+    return process
+
+
+def make_handler(queue: JobQueue, allowed: List[str], defaults: Optional[Dict] = None):
+    """Construit le gestionnaire HTTP lié à une file.
+    
+    `defaults` complète les paramètres absents des jobs soumis (options du
+    service, comme la taille cible).
+    """
+    defaults = defaults or {}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["health"]:
+                return self._send(200, {"jobs": queue.counts()})
+            if parts == ["jobs"]:
+                status = parse_qs(url.query).get("status", [None])[0]
+                return self._send(200, {"jobs": queue.list(status)})
+            if len(parts) == 2 and parts[0] == "jobs":
+                job = queue.get(parts[1])
+                return self._send(200, job) if job else self._send(404, {"error": "job inconnu"})
+            self._send(404, {"error": "route inconnue"})
+        
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip("/") != "/jobs":
+                return self._send(404, {"error": "route inconnue"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                params = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send(400, {"error": "JSON invalide"})
+            if not isinstance(params, dict):
+                return self._send(400, {"error": "objet JSON attendu"})
+            
+            source = params.get("source")
+            if not isinstance(source, str) or not source or not Path(source).is_file():
+                return self._send(400, {"error": "source introuvable"})
+            unknown = sorted(set(params) - set(allowed) - {"source"})
+            if unknown:
+                return self._send(400, {"error": f"paramètres inconnus: {', '.join(unknown)}"})
+            
+            for name, value in defaults.items():
+                params.setdefault(name, value)
+            params["source"] = str(Path(source).resolve())
+            self._send(201, {"id": queue.submit(params)})
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Service HTTP local de rendu Clipp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Nombre de processus de rendu")
+    parser.add_argument("--db", default="cache/service/jobs.sqlite3", help="Base SQLite de la file")
+    parser.add_argument("--output-dir", default="output/service", help="Sorties (un dossier par job)")
+    parser.add_argument("--cache-dir", default="cache", help="Cache d'analyse partagé")
+    parser.add_argument("--no-whisper", action="store_true", help="Ne pas précharger Whisper")
+    parser.add_argument("--target-size", type=float, default=None, help="Taille maximale par défaut de chaque clip (Mo)")
+    args = parser.parse_args(argv)
+    
+    queue = JobQueue(args.db)
+    queue.requeue_running()
+    
+    workers = [start_worker(f"worker-{i+1}", args) for i in range(max(1, args.workers))]
+    
+    defaults = {"target_size_mb": args.target_size} if args.target_size else {}
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(queue, render_parameters(), defaults))
+    print(f"Service prêt sur http://{args.host}:{args.port} ({len(workers)} worker(s))")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # Surveillance des workers : un worker mort est remplacé sous le même
+        # nom, après remise en attente de son job
+        while True:
+            time.sleep(WORKER_CHECK_INTERVAL)
+            for i, process in enumerate(workers):
+                if process.is_alive():
+                    continue
+                requeued = queue.requeue_worker(process.name)
+                print(f"{process.name} arrêté (code {process.exitcode}), redémarrage ({requeued} job(s) relancé(s))")
+                workers[i] = start_worker(process.name, args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join(timeout=5)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Tests des empreintes de sources (fichier et flux)."""
+
+import io
+import random
+
+import pytest
+
+import analysis_cache
+from analysis_cache import StreamingFingerprint, fingerprint_file, fingerprint_stream
+
+
+SAMPLE_SIZE = 64
+
+
+@pytest.fixture(autouse=True)
+def small_sample(monkeypatch):
+    """Échantillon réduit : début et fin se chevauchent ou non selon la taille."""
+    monkeypatch.setattr(analysis_cache, "FINGERPRINT_SAMPLE_SIZE", SAMPLE_SIZE)
+
+
+@pytest.mark.parametrize("size", [0, 1, 63, 64, 65, 100, 127, 128, 129, 1000])
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096])
+def test_streamed_fingerprint_matches_file(tmp_path, size, chunk_size):
+    data = random.Random(size).randbytes(size)
+    path = tmp_path / "source.mp4"
+    path.write_bytes(data)
+    
+    streaming = StreamingFingerprint(size)
+    for i in range(0, size, chunk_size):
+        streaming.update(data[i:i + chunk_size])
+    
+    assert streaming.hexdigest() == fingerprint_file(str(path))
+
+
+@pytest.mark.parametrize("size", [0, 1, 64, 65, 128, 129, 1000])
+def test_seekable_stream_fingerprint_matches_file(tmp_path, size):
+    data = random.Random(size).randbytes(size)
+    path = tmp_path / "source.mp4"
+    path.write_bytes(data)
+    stream = io.BytesIO(data)
+    stream.seek(size // 2)
+    
+    assert fingerprint_stream(stream, size) == fingerprint_file(str(path))
+    assert stream.tell() == size // 2
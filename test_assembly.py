@@ -0,0 +1,69 @@
+"""Tests de l'assemblage rapide (corps des clips copiés, transitions réencodées)."""
+
+import subprocess
+
+import pytest
+
+from video_effects import TransitionType
+from video_processor import VideoProcessor
+from video_reader import get_ffmpeg_binary, probe_streams
+
+
+CLIP_DURATION = 2.0
+TRANSITION_DURATION = 0.5
+
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    return tmp_path_factory.mktemp("assembly")
+
+
+@pytest.fixture(scope="module")
+def processor(workdir):
+    return VideoProcessor(output_dir=str(workdir / "output"), cache_dir=str(workdir / "cache"))
+
+
+@pytest.fixture(scope="module")
+def clips(processor, workdir):
+    """Deux clips exportés par `create_clip`, images clés aux bornes des transitions."""
+    source = workdir / "source.mp4"
+    subprocess.run([
+        get_ffmpeg_binary(), "-y", "-loglevel", "error", "-nostdin",
+        "-f", "lavfi", "-i", "testsrc2=s=540x960:r=30:d=5",
+        "-f", "lavfi", "-i", "sine=frequency=440:duration=5",
+        "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest",
+        str(source),
+    ], check=True)
+    keyframe_times = [TRANSITION_DURATION, CLIP_DURATION - TRANSITION_DURATION]
+    return [
+        processor.create_clip(
+            str(source),
+            start,
+            start + CLIP_DURATION,
+            output_name=f"clip_{i}.mp4",
+            format_type="tiktok",
+            keyframe_times=keyframe_times,
+        )
+        for i, start in enumerate((0.0, 2.5))
+    ]
+
+
+def test_exported_clips_use_the_export_profile(processor, clips):
+    for path in clips:
+        video = probe_streams(path)["video"]
+        assert processor.X264_PROFILES.get(video["profile"]) == processor.EXPORT_PROFILE
+        assert video["pix_fmt"] == processor.EXPORT_PIXEL_FORMAT
+
+
+def test_fade_assembly_takes_the_stream_copy_path(processor, clips, tmp_path):
+    output_path = tmp_path / "assembled.mp4"
+    
+    # None signifierait un repli sur le rendu complet
+    result = processor.concatenate_clips_smart(
+        clips, output_path, TransitionType.FADE, TRANSITION_DURATION, "tiktok",
+    )
+    
+    assert result == str(output_path)
+    probe = probe_streams(result)
+    assert probe["has_audio"]
+    assert probe["duration"] == pytest.approx(2 * CLIP_DURATION, abs=0.1)
@@ -0,0 +1,47 @@
+"""Tests de la sélection des moments (`moments.select_windows`)."""
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from moments import select_windows
+
+
+def brute_force(scores, width, count, gap):
+    """Meilleur total par énumération de tous les ensembles de débuts valides."""
+    n = len(scores)
+    stride = width + gap
+    for k in range(count, 0, -1):
+        totals = [
+            sum(scores[s] for s in starts)
+            for starts in itertools.combinations(range(n), k)
+            if all(b - a >= stride for a, b in zip(starts, starts[1:]))
+        ]
+        if totals:
+            return k, max(totals)
+    return 0, 0.0
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_select_windows_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 12)
+    width = rng.randint(1, 3)
+    gap = rng.randint(0, 2)
+    count = rng.randint(1, 4)
+    # Scores entiers une fois sur deux : beaucoup d'égalités
+    if seed % 2:
+        scores = np.array([float(rng.randint(0, 3)) for _ in range(n)])
+    else:
+        scores = np.array([rng.uniform(-1.0, 5.0) for _ in range(n)])
+    
+    starts = select_windows(scores, width, count, gap)
+    
+    expected_count, expected_total = brute_force(scores, width, count, gap)
+    assert len(starts) == expected_count
+    assert starts == sorted(starts)
+    assert all(0 <= s < n for s in starts)
+    assert all(b - a >= width + gap for a, b in zip(starts, starts[1:]))
+    assert sum(scores[s] for s in starts) == pytest.approx(expected_total)
@@ -1,9 +1,10 @@
 """Module avancé de traitement vidéo avec transitions et animations."""
 
 import os
+import bisect
 import numpy as np
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Literal
+from typing import List, Tuple, Optional, Dict, Literal, Callable
 from dataclasses import dataclass
 from enum import Enum
 
@@ -37,6 +38,346 @@ class SubtitleAnimation:
     delay: float = 0.0     # Délai avant animation
 
 
+def _crossfade_kernel(frame_a: np.ndarray, frame_b: np.ndarray, progress: float) -> np.ndarray:
+    """Fondu enchaîné entre deux frames."""
+    out = frame_a.astype(np.float32)
+    out *= 1.0 - progress
+    out += frame_b.astype(np.float32) * progress
+    return out.astype(np.uint8)
+
+
+def _make_slide_kernel(direction: str) -> Callable:
+    """Crée un noyau de glissement (le second clip pousse le premier).
+    
+    Même convention que les transitions MoviePy d'origine : pour "left", le
+    second clip entre par la gauche et le premier sort par la droite.
+    """
+    def kernel(frame_a: np.ndarray, frame_b: np.ndarray, progress: float) -> np.ndarray:
+        h, w = frame_a.shape[:2]
+        out = np.empty_like(frame_a)
+        if direction in ("left", "right"):
+            offset = int(round(progress * w))
+            if direction == "left":
+                out[:, offset:] = frame_a[:, :w - offset]
+                out[:, :offset] = frame_b[:, w - offset:]
+            else:
+                out[:, :w - offset] = frame_a[:, offset:]
+                out[:, w - offset:] = frame_b[:, :offset]
+        else:
+            offset = int(round(progress * h))
+            if direction == "up":
+                out[offset:] = frame_a[:h - offset]
+                out[:offset] = frame_b[h - offset:]
+            else:
+                out[:h - offset] = frame_a[offset:]
+                out[h - offset:] = frame_b[:offset]
+        return out
+    
+    return kernel
+
+
+class WipeKernel:
+    """Noyau de wipe (rideau) à bord adouci.
+    
+    Le poids des colonnes du bord adouci est précalculé une fois par largeur
+    de frame ; chaque frame ne fait qu'une copie et un mélange sur la bande
+    du bord.
+    """
+    
+    # Largeur du bord adouci (fraction de la largeur de la frame)
+    FEATHER = 0.02
+    
+    def __init__(self, direction: str):
+        """Initialise le noyau.
+        
+        Args:
+            direction: "left" (le second clip apparaît par la droite et le
+                bord avance vers la gauche) ou "right" (sens inverse)
+        """
+        self.direction = direction
+        self._ramps: Dict[int, np.ndarray] = {}
+    
+    def _ramp(self, width: int) -> np.ndarray:
+        """Poids du second clip sur le bord adouci (croissants vers la droite)."""
+        ramp = self._ramps.get(width)
+        if ramp is None:
+            feather = max(1, int(width * self.FEATHER))
+            ramp = np.linspace(0.0, 1.0, feather + 2, dtype=np.float32)[1:-1]
+            ramp = ramp[None, :, None]
+            self._ramps[width] = ramp
+        return ramp
+    
+    def __call__(self, frame_a: np.ndarray, frame_b: np.ndarray, progress: float) -> np.ndarray:
+        w = frame_a.shape[1]
+        ramp = self._ramp(w)
+        feather = ramp.shape[1]
+        
+        # Position du bord : de w (rien de révélé) à -feather (tout révélé)
+        edge = int(round(w - progress * (w + feather)))
+        if self.direction == "left":
+            full = slice(max(0, edge + feather), w)
+            band_start, band_end = max(0, edge), min(w, edge + feather)
+            weights = ramp[:, band_start - edge:band_end - edge]
+        else:
+            full = slice(0, max(0, w - edge - feather))
+            band_start, band_end = max(0, w - edge - feather), min(w, w - edge)
+            weights = ramp[:, ::-1][:, band_start - (w - edge - feather):band_end - (w - edge - feather)]
+        
+        out = frame_a.copy()
+        out[:, full] = frame_b[:, full]
+        if band_end > band_start:
+            band_a = frame_a[:, band_start:band_end].astype(np.float32)
+            band_b = frame_b[:, band_start:band_end].astype(np.float32)
+            out[:, band_start:band_end] = (band_a + (band_b - band_a) * weights).astype(np.uint8)
+        return out
+
+
+class ZoomKernel:
+    """Noyau de zoom avec fondu enchaîné.
+    
+    Le zoom centré est une transformation affine séparable : les grilles
+    d'échantillonnage (indices de lignes et de colonnes) sont précalculées
+    par taille de frame et par pas de progression, puis réutilisées pour
+    toutes les frames et toutes les transitions.
+    """
+    
+    # Nombre de pas de progression précalculés
+    STEPS = 64
+    # Agrandissement maximal (1.5x)
+    MAX_ZOOM = 0.5
+    
+    def __init__(self, zoom_in: bool):
+        """Initialise le noyau.
+        
+        Args:
+            zoom_in: True pour zoomer dans le premier clip en fondu vers le
+                second, False pour faire apparaître le second en dézoomant
+        """
+        self.zoom_in = zoom_in
+        self._grids: Dict[Tuple[int, int, int], Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def _grid(self, height: int, width: int, step: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices de lignes et de colonnes à échantillonner pour un pas donné."""
+        key = (height, width, step)
+        grid = self._grids.get(key)
+        if grid is None:
+            progress = step / self.STEPS
+            scale = 1.0 + self.MAX_ZOOM * (progress if self.zoom_in else 1.0 - progress)
+            rows = (np.arange(height) - (height - 1) / 2) / scale + (height - 1) / 2
+            cols = (np.arange(width) - (width - 1) / 2) / scale + (width - 1) / 2
+            grid = (
+                np.clip(np.rint(rows), 0, height - 1).astype(np.intp),
+                np.clip(np.rint(cols), 0, width - 1).astype(np.intp),
+            )
+            self._grids[key] = grid
+        return grid
+    
+    def __call__(self, frame_a: np.ndarray, frame_b: np.ndarray, progress: float) -> np.ndarray:
+        h, w = frame_a.shape[:2]
+        rows, cols = self._grid(h, w, int(round(progress * self.STEPS)))
+        if self.zoom_in:
+            frame_a = frame_a.take(rows, axis=0).take(cols, axis=1)
+        else:
+            frame_b = frame_b.take(rows, axis=0).take(cols, axis=1)
+        return _crossfade_kernel(frame_a, frame_b, progress)
+
+
+# Transitions avec chevauchement : noyau appliqué pendant la fenêtre commune
+TRANSITION_KERNELS = {
+    TransitionType.CROSSFADE: _crossfade_kernel,
+    TransitionType.SLIDE_LEFT: _make_slide_kernel("left"),
+    TransitionType.SLIDE_RIGHT: _make_slide_kernel("right"),
+    TransitionType.SLIDE_UP: _make_slide_kernel("up"),
+    TransitionType.SLIDE_DOWN: _make_slide_kernel("down"),
+    TransitionType.ZOOM_IN: ZoomKernel(zoom_in=True),
+    TransitionType.ZOOM_OUT: ZoomKernel(zoom_in=False),
+    TransitionType.WIPE_LEFT: WipeKernel("left"),
+    TransitionType.WIPE_RIGHT: WipeKernel("right"),
+}
+
+
+# Équivalents ffmpeg (filtre xfade) pour l'assemblage sans réencodage complet
+XFADE_TRANSITIONS = {
+    TransitionType.CROSSFADE: "fade",
+    TransitionType.SLIDE_LEFT: "slideright",
+    TransitionType.SLIDE_RIGHT: "slideleft",
+    TransitionType.SLIDE_UP: "slidedown",
+    TransitionType.SLIDE_DOWN: "slideup",
+    TransitionType.ZOOM_IN: "zoomin",
+    TransitionType.WIPE_LEFT: "wipeleft",
+    TransitionType.WIPE_RIGHT: "wiperight",
+}
+
+
+def mix_audio_timeline(
+    audio_clips: list,
+    starts: List[float],
+    duration: float,
+    transition_duration: float,
+    overlap: bool,
+    fps: int = 44100,
+) -> np.ndarray:
+    """Mixe les pistes audio d'une timeline dans un seul tampon NumPy.
+    
+    Chaque piste est décodée une fois en bloc contigu puis ajoutée à sa place
+    avec des rampes de gain vectorisées : fondu enchaîné à puissance constante
+    pendant les chevauchements, fondu de sortie/entrée sinon. Aucun calcul
+    n'est fait échantillon par échantillon en Python.
+    
+    Args:
+        audio_clips: Pistes audio (None si le clip n'a pas de son)
+        starts: Début de chaque piste sur la timeline
+        duration: Durée totale de la timeline
+        transition_duration: Durée des fondus en secondes
+        overlap: True si les clips se chevauchent pendant les transitions
+        fps: Fréquence d'échantillonnage
+        
+    Returns:
+        Tableau (échantillons, 2) en float32
+    """
+    total = int(round(duration * fps))
+    mix = np.zeros((total, 2), dtype=np.float32)
+    ramp_length = int(round(transition_duration * fps))
+    
+    # Rampes précalculées (puissance constante pour les chevauchements)
+    if ramp_length > 0:
+        position = (np.arange(ramp_length, dtype=np.float32) + 0.5) / ramp_length
+        if overlap:
+            ramp_in = np.sin(position * np.pi / 2)
+        else:
+            ramp_in = position
+        ramp_in = ramp_in[:, None]
+        ramp_out = ramp_in[::-1]
+    
+    last = len(audio_clips) - 1
+    for i, (audio, start) in enumerate(zip(audio_clips, starts)):
+        if audio is None:
+            continue
+        samples = np.asarray(audio.to_soundarray(fps=fps), dtype=np.float32)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if samples.shape[1] == 1:
+            samples = np.repeat(samples, 2, axis=1)
+        samples = samples[:, :2]
+        
+        offset = int(round(start * fps))
+        samples = samples[:max(0, total - offset)]
+        if samples.size == 0:
+            continue
+        
+        if ramp_length > 0:
+            n = min(ramp_length, len(samples))
+            if i > 0:
+                samples[:n] *= ramp_in[:n]
+            if i < last:
+                samples[-n:] *= ramp_out[-n:]
+        
+        mix[offset:offset + len(samples)] += samples
+    
+    np.clip(mix, -1.0, 1.0, out=mix)
+    return mix
+
+
+class TimelineCompositor:
+    """Compositeur de timeline à plat pour l'assemblage de clips.
+    
+    Tous les clips sont placés sur une seule timeline (index d'intervalles
+    trié). À un instant t, au plus deux clips sont évalués : le clip courant
+    et, pendant une transition, le précédent. Le coût par frame reste
+    constant quel que soit le nombre de clips assemblés.
+    """
+    
+    def __init__(
+        self,
+        clips: list,
+        transition_type: TransitionType = TransitionType.FADE,
+        transition_duration: float = 0.5,
+    ):
+        """Construit la timeline.
+        
+        Args:
+            clips: Clips à assembler (même taille)
+            transition_type: Type de transition entre chaque clip
+            transition_duration: Durée de la transition en secondes
+        """
+        if not clips:
+            raise ValueError("La liste des clips est vide")
+        
+        self.clips = clips
+        self.transition_type = transition_type
+        self.kernel = TRANSITION_KERNELS.get(transition_type)
+        self.fade = transition_type == TransitionType.FADE
+        
+        durations = [clip.duration for clip in clips]
+        shortest = min(durations)
+        self.transition_duration = max(0.0, min(transition_duration, shortest / 2))
+        overlap = self.transition_duration if self.kernel else 0.0
+        
+        # Index d'intervalles : débuts triés de chaque clip
+        self.starts = []
+        t = 0.0
+        for duration in durations:
+            self.starts.append(t)
+            t += duration - overlap
+        self.ends = [start + duration for start, duration in zip(self.starts, durations)]
+        self.duration = self.ends[-1]
+    
+    def get_frame(self, t: float) -> np.ndarray:
+        """Calcule la frame de la timeline au temps t."""
+        i = max(0, bisect.bisect_right(self.starts, t) - 1)
+        clip = self.clips[i]
+        local_t = min(t - self.starts[i], clip.duration)
+        frame = clip.get_frame(local_t)
+        
+        # Fenêtre de transition avec le clip précédent
+        if self.kernel and i > 0 and t < self.ends[i - 1]:
+            previous = self.clips[i - 1]
+            frame_a = previous.get_frame(min(t - self.starts[i - 1], previous.duration))
+            progress = min(1.0, max(0.0, local_t / self.transition_duration))
+            return self.kernel(frame_a, frame, progress)
+        
+        # Fondu au noir en sortie / en entrée de chaque clip
+        if self.fade and self.transition_duration > 0:
+            factor = 1.0
+            if i > 0 and local_t < self.transition_duration:
+                factor = local_t / self.transition_duration
+            remaining = clip.duration - local_t
+            if i < len(self.clips) - 1 and remaining < self.transition_duration:
+                factor = min(factor, remaining / self.transition_duration)
+            if factor < 1.0:
+                return (frame.astype(np.float32) * max(0.0, factor)).astype(np.uint8)
+        
+        return frame
+    
+    def to_clip(self, audio_fps: int = 44100):
+        """Retourne la timeline sous forme de clip MoviePy (vidéo + audio).
+        
+        Args:
+            audio_fps: Fréquence d'échantillonnage de l'audio mixé
+        """
+        from moviepy import VideoClip
+        from moviepy.audio.AudioClip import AudioArrayClip
+        
+        video = VideoClip(frame_function=self.get_frame, duration=self.duration)
+        fps = getattr(self.clips[0], "fps", None)
+        if fps:
+            video = video.with_fps(fps)
+        
+        audio_clips = [clip.audio for clip in self.clips]
+        if any(audio is not None for audio in audio_clips):
+            mix = mix_audio_timeline(
+                audio_clips,
+                self.starts,
+                self.duration,
+                self.transition_duration if (self.kernel or self.fade) else 0.0,
+                overlap=self.kernel is not None,
+                fps=audio_fps,
+            )
+            video = video.with_audio(AudioArrayClip(mix, fps=audio_fps))
+        
+        return video
+
+
 class VideoEffects:
     """Classe pour les effets vidéo avancés."""
     
@@ -58,42 +399,9 @@ class VideoEffects:
         Returns:
             Clip combiné avec transition
         """
-        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
         from moviepy import concatenate_videoclips
-        from moviepy.video.fx.all import fadein, fadeout
-        
-        w, h = clip1.w, clip1.h
         
-        if transition_type == TransitionType.FADE:
-            # Fade out du premier, fade in du second
-            clip1_fade = clip1.fx(fadeout, duration)
-            clip2_fade = clip2.fx(fadein, duration)
-            return concatenate_videoclips([clip1_fade, clip2_fade])
-            
-        elif transition_type == TransitionType.CROSSFADE:
-            # Crossfade (chevauchement)
-            clip1_part = clip1.subclipped(0, clip1.duration - duration)
-            transition_part1 = clip1.subclipped(clip1.duration - duration, clip1.duration).fx(fadeout, duration)
-            transition_part2 = clip2.subclipped(0, duration).fx(fadein, duration)
-            clip2_part = clip2.subclipped(duration, clip2.duration)
-            
-            # Combiner la transition
-            transition = CompositeVideoClip([
-                transition_part1.with_start(0),
-                transition_part2.with_start(0),
-            ])
-            
-            return concatenate_videoclips([clip1_part, transition, clip2_part])
-            
-        elif transition_type == TransitionType.SLIDE_LEFT:
-            return VideoEffects._slide_transition(clip1, clip2, "left", duration)
-        elif transition_type == TransitionType.SLIDE_RIGHT:
-            return VideoEffects._slide_transition(clip1, clip2, "right", duration)
-        elif transition_type == TransitionType.SLIDE_UP:
-            return VideoEffects._slide_transition(clip1, clip2, "up", duration)
-        elif transition_type == TransitionType.SLIDE_DOWN:
-            return VideoEffects._slide_transition(clip1, clip2, "down", duration)
-        elif transition_type == TransitionType.ZOOM_IN:
+        if transition_type == TransitionType.ZOOM_IN:
             return VideoEffects._zoom_transition(clip1, clip2, "in", duration)
         elif transition_type == TransitionType.ZOOM_OUT:
             return VideoEffects._zoom_transition(clip1, clip2, "out", duration)
@@ -101,74 +409,24 @@ class VideoEffects:
             return VideoEffects._wipe_transition(clip1, clip2, "left", duration)
         elif transition_type == TransitionType.WIPE_RIGHT:
             return VideoEffects._wipe_transition(clip1, clip2, "right", duration)
+        elif transition_type == TransitionType.FADE or transition_type in TRANSITION_KERNELS:
+            # Fondu, fondu enchaîné et glissements : timeline à plat
+            return TimelineCompositor([clip1, clip2], transition_type, duration).to_clip()
         else:
             # Par défaut: simple concaténation
             return concatenate_videoclips([clip1, clip2])
     
-    @staticmethod
-    def _slide_transition(clip1, clip2, direction: str, duration: float):
-        """Transition par glissement."""
-        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-        from moviepy.video.fx.all import slide_in, slide_out
-        
-        w, h = clip1.w, clip1.h
-        
-        # Clip 1 sort
-        if direction == "left":
-            clip1_out = clip1.fx(slide_out, duration, side="right")
-            clip2_in = clip2.fx(slide_in, duration, side="left")
-        elif direction == "right":
-            clip1_out = clip1.fx(slide_out, duration, side="left")
-            clip2_in = clip2.fx(slide_in, duration, side="right")
-        elif direction == "up":
-            clip1_out = clip1.fx(slide_out, duration, side="bottom")
-            clip2_in = clip2.fx(slide_in, duration, side="top")
-        else:  # down
-            clip1_out = clip1.fx(slide_out, duration, side="top")
-            clip2_in = clip2.fx(slide_in, duration, side="bottom")
-        
-        # Partie sans transition
-        clip1_part = clip1.subclipped(0, clip1.duration - duration)
-        clip2_part = clip2.subclipped(duration, clip2.duration)
-        
-        # Combiner
-        from moviepy import concatenate_videoclips
-        
-        # Transition
-        transition = CompositeVideoClip([
-            clip1_out.subclipped(clip1.duration - duration, clip1.duration).with_start(0),
-            clip2_in.subclipped(0, duration).with_start(0),
-        ])
-        
-        return concatenate_videoclips([clip1_part, transition, clip2_part])
-    
     @staticmethod
     def _zoom_transition(clip1, clip2, zoom_type: str, duration: float):
         """Transition par zoom."""
-        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-        from moviepy import concatenate_videoclips
-        
-        def make_frame_zoom_out(t):
-            """Zoom out sur clip1."""
-            scale = 1 + (1 - t / duration) * 0.5
-            return clip1.get_frame(clip1.duration - duration + t)
-        
-        def make_frame_zoom_in(t):
-            """Zoom in sur clip2."""
-            scale = 1 + (t / duration) * 0.5
-            return clip2.get_frame(t)
-        
-        # Pour l'instant, utiliser un simple fade
-        return VideoEffects.create_transition(clip1, clip2, TransitionType.FADE, duration)
+        transition_type = TransitionType.ZOOM_IN if zoom_type == "in" else TransitionType.ZOOM_OUT
+        return TimelineCompositor([clip1, clip2], transition_type, duration).to_clip()
     
     @staticmethod
     def _wipe_transition(clip1, clip2, direction: str, duration: float):
         """Transition par effet wipe (rideau)."""
-        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-        from moviepy import concatenate_videoclips
-        
-        # Pour l'instant, utiliser un simple fade
-        return VideoEffects.create_transition(clip1, clip2, TransitionType.FADE, duration)
+        transition_type = TransitionType.WIPE_LEFT if direction == "left" else TransitionType.WIPE_RIGHT
+        return TimelineCompositor([clip1, clip2], transition_type, duration).to_clip()
 
 
 class AnimatedSubtitleGenerator:
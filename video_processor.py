@@ -1,10 +1,37 @@
 """Module de traitement vidéo pour créer des clips TikTok/YouTube Shorts."""
 
 import os
+import subprocess
+import threading
+import time
 import numpy as np
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict
-from scipy.signal import find_peaks
+from typing import Callable, List, Tuple, Optional, Dict, Sequence, Union
+
+
+@dataclass
+class OutputProfile:
+    """Variante d'export d'un clip (plateforme, résolution, débit).
+    
+    Sans `video_bitrate`, l'encodeur travaille à qualité constante (`crf`).
+    Avec `target_size_mb`, le débit est plafonné pour tenir dans la limite de
+    taille de la plateforme.
+    """
+    name: str
+    width: int
+    height: int
+    video_bitrate: Optional[str] = None   # ex. "6M"
+    crf: Optional[int] = None
+    audio_bitrate: str = "192k"
+    target_size_mb: Optional[float] = None
+    
+    @property
+    def aspect_key(self) -> Tuple[int, int]:
+        """Ratio réduit : les profils de même ratio partagent le recadrage."""
+        from math import gcd
+        divisor = gcd(self.width, self.height)
+        return (self.width // divisor, self.height // divisor)
 
 
 class VideoProcessor:
@@ -17,29 +44,464 @@ class VideoProcessor:
         "instagram_reels": {"width": 1080, "height": 1920, "ratio": 9/16},
     }
     
-    def __init__(self, output_dir: str = "output"):
+    # Réglages d'encodage communs à tous les exports : l'assemblage rapide
+    # réencode seulement les transitions et doit rester compatible avec les clips
+    EXPORT_FPS = 30
+    EXPORT_PRESET = "medium"
+    EXPORT_PIXEL_FORMAT = "yuv420p"
+    EXPORT_CRF = 23
+    # Profil et niveau H.264 fixés à l'export (et non choisis par libx264) :
+    # l'assemblage rapide les vérifie et les reproduit dans les transitions
+    EXPORT_PROFILE = "high"
+    EXPORT_LEVEL = "4.1"
+    
+    # Profils H.264 rapportés par ffprobe -> valeurs de `-profile:v` (libx264)
+    X264_PROFILES = {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    }
+    
+    # Hauteur (côté le plus court) des proxys d'analyse et de prévisualisation
+    PROXY_SIZE = 360
+    
+    # Mezzanine à GOP court, préparée pour les sources dont les images clés
+    # sont espacées de plus de MEZZANINE_MIN_KEYFRAME_INTERVAL secondes
+    # (enregistrements d'écran) ; None pour désactiver
+    MEZZANINE_MIN_KEYFRAME_INTERVAL = 4.0
+    MEZZANINE_KEYFRAME_INTERVAL = 0.5
+    MEZZANINE_CRF = 16
+    
+    # Budget disque du cache de prévisualisations (éviction LRU au-delà)
+    PREVIEW_CACHE_BUDGET = 500 * 1024 * 1024
+    
+    # Nombre maximum de miniatures dans la planche d'une source
+    MAX_THUMBNAILS = 600
+    
+    # Encodage à taille cible : CRF de référence de la sonde de complexité,
+    # exposant d'extrapolation du débit avec le nombre de pixels, et part de
+    # la taille réservée au conteneur
+    SIZE_PROBE_CRF = 23
+    SIZE_PROBE_PIXEL_EXPONENT = 0.75
+    SIZE_MUX_OVERHEAD = 0.03
+    
+    # Variantes publiées par défaut (une par plateforme)
+    PLATFORM_PROFILES = [
+        OutputProfile(name, fmt["width"], fmt["height"])
+        for name, fmt in FORMATS.items()
+    ]
+    
+    # Modèles Whisper chargés, partagés par tous les processeurs du processus
+    _whisper_models: Dict[str, object] = {}
+    _whisper_lock = threading.Lock()
+    
+    # Descriptions ffprobe par empreinte de source (`get_video_info`)
+    PROBE_VERSION = 1
+    _probes: Dict[str, dict] = {}
+    _probes_lock = threading.Lock()
+    
+    # Index des images clés par empreinte de source (`get_keyframe_index`)
+    _keyframe_indexes: Dict[str, object] = {}
+    
+    # Séries de caractéristiques par (empreinte, nom) : `audio_envelope`, `frame_differences`
+    _feature_series: Dict[Tuple[str, str], np.ndarray] = {}
+    
+    def __init__(self, output_dir: str = "output", cache_dir: str = "cache"):
         """Initialise le processeur vidéo.
         
         Args:
             output_dir: Répertoire de sortie pour les clips
+            cache_dir: Répertoire du cache d'analyse (proxys, résultats)
         """
+        from analysis_cache import AnalysisCache
+        
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.cache = AnalysisCache(cache_dir)
+        self._proxy_threads: Dict[str, threading.Thread] = {}
+        self._proxy_lock = threading.Lock()
     
     def get_video_info(self, video_path: str) -> dict:
-        """Récupère les informations de la vidéo."""
-        from moviepy.video.io.VideoFileClip import VideoFileClip
+        """Récupère les informations de la vidéo.
         
-        clip = VideoFileClip(video_path)
-        info = {
-            "duration": clip.duration,
-            "fps": clip.fps,
-            "width": clip.w,
-            "height": clip.h,
-            "aspect_ratio": clip.w / clip.h,
+        Un seul appel ffprobe par source (voir `video_reader.probe_media`),
+        mémorisé par empreinte en mémoire et dans le cache d'analyse : les
+        appels suivants ne coûtent qu'un `stat` du fichier.
+        
+        Returns:
+            Dict avec duration, fps, width, height, aspect_ratio et les
+            détails des flux (codec, rotation, intervalle entre images clés,
+            débit, échantillonnage audio)
+        """
+        from video_reader import probe_media
+        
+        fingerprint = self.cache.fingerprint(video_path)
+        with self._probes_lock:
+            info = self._probes.get(fingerprint)
+        
+        if info is None:
+            cache_name = f"probe_v{self.PROBE_VERSION}"
+            info = self.cache.load_json(video_path, cache_name)
+            if info is None:
+                info = probe_media(video_path)
+                self.cache.save_json(video_path, cache_name, info)
+            with self._probes_lock:
+                self._probes[fingerprint] = info
+        
+        return dict(info)
+    
+    def get_keyframe_index(self, video_path: str):
+        """Retourne l'index des images clés d'une vidéo, construit une fois par source.
+        
+        L'index (lecture des paquets par ffprobe, sans décodage) est mémorisé
+        par empreinte en mémoire et dans le cache d'analyse.
+        
+        Returns:
+            KeyframeIndex de la vidéo
+        """
+        from video_reader import KeyframeIndex, probe_keyframes
+        
+        fingerprint = self.cache.fingerprint(video_path)
+        with self._probes_lock:
+            index = self._keyframe_indexes.get(fingerprint)
+        
+        if index is None:
+            times = self.cache.load_json(video_path, "keyframes")
+            if times is None:
+                times = probe_keyframes(video_path)
+                self.cache.save_json(video_path, "keyframes", times)
+            index = KeyframeIndex(times)
+            with self._probes_lock:
+                self._keyframe_indexes[fingerprint] = index
+        
+        return index
+    
+    def _proxy_path(self, video_path: str) -> Path:
+        """Emplacement du proxy d'une source dans le cache d'analyse."""
+        return self.cache.path_for(video_path, f"proxy_{self.PROXY_SIZE}p.mp4")
+    
+    def generate_proxy(self, video_path: str) -> str:
+        """Transcode une source en proxy basse résolution à GOP court.
+        
+        Le proxy (360p, une image clé toutes les 0.5s) sert à l'analyse et aux
+        prévisualisations : il se décode et se parcourt beaucoup plus vite que
+        l'original, souvent en 4K HEVC. Les exports finaux lisent l'original.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            
+        Returns:
+            Chemin du proxy
+        """
+        from ffmpeg_executor import LANE_LONG, run_ffmpeg
+        from jobs import current_job
+        from video_reader import get_ffmpeg_binary
+        
+        proxy_path = self._proxy_path(video_path)
+        if proxy_path.exists():
+            return str(proxy_path)
+        
+        size = self.PROXY_SIZE
+        tmp_path = proxy_path.with_name(f".{proxy_path.stem}.{os.getpid()}.{threading.get_ident()}.mp4")
+        cmd = [
+            get_ffmpeg_binary(), "-y", "-loglevel", "error", "-nostdin",
+            "-i", str(video_path),
+            "-vf", f"scale='if(gt(iw,ih),-2,{size})':'if(gt(iw,ih),{size},-2)'",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-crf", "28",
+            "-g", "15",
+            "-keyint_min", "15",
+            "-sc_threshold", "0",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-b:a", "96k",
+            "-movflags", "+faststart",
+            str(tmp_path),
+        ]
+        
+        # Progression reportée sur le job appelant (le rappel s'exécute dans la boucle ffmpeg)
+        job = current_job()
+        progress = {}
+        if job is not None:
+            progress = {"duration": self.get_video_info(video_path)["duration"], "on_progress": job.set_progress}
+        try:
+            run_ffmpeg(cmd, lane=LANE_LONG, **progress)
+            os.replace(tmp_path, proxy_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        return str(proxy_path)
+    
+    def _mezzanine_path(self, video_path: str) -> Path:
+        """Emplacement de la mezzanine d'une source dans le cache d'analyse."""
+        return self.cache.path_for(video_path, "mezzanine.mp4")
+    
+    def needs_mezzanine(self, video_path: str) -> bool:
+        """Indique si les images clés de la source sont trop espacées pour des coupes rapides."""
+        if self.MEZZANINE_MIN_KEYFRAME_INTERVAL is None:
+            return False
+        info = self.get_video_info(video_path)
+        # Une seule image clé lue par la sonde : le GOP couvre au moins toute la fenêtre
+        interval = info.get("keyframe_interval") or info["duration"]
+        return interval > self.MEZZANINE_MIN_KEYFRAME_INTERVAL
+    
+    def generate_mezzanine(self, video_path: str) -> str:
+        """Transcode une source à GOP long en mezzanine pleine résolution à GOP court.
+        
+        Chaque accès aléatoire dans un enregistrement d'écran (une image clé
+        toutes les 10s ou plus) décode des centaines de frames inutiles. La
+        mezzanine (H.264 quasi sans perte, une image clé toutes les 0.5s) est
+        lue à la place de l'original pour les coupes et les exports.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            
+        Returns:
+            Chemin de la mezzanine
+        """
+        from ffmpeg_executor import LANE_LONG, run_ffmpeg
+        from jobs import current_job
+        from video_reader import get_ffmpeg_binary
+        
+        mezzanine_path = self._mezzanine_path(video_path)
+        if mezzanine_path.exists():
+            return str(mezzanine_path)
+        
+        info = self.get_video_info(video_path)
+        gop = max(1, int(round(info["fps"] * self.MEZZANINE_KEYFRAME_INTERVAL)))
+        tmp_path = mezzanine_path.with_name(f".{mezzanine_path.stem}.{os.getpid()}.{threading.get_ident()}.mp4")
+        cmd = [
+            get_ffmpeg_binary(), "-y", "-loglevel", "error", "-nostdin",
+            "-i", str(video_path),
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-crf", str(self.MEZZANINE_CRF),
+            "-g", str(gop),
+            "-keyint_min", str(gop),
+            "-sc_threshold", "0",
+            "-pix_fmt", "yuv420p",
+        ]
+        # Piste audio copiée si le conteneur MP4 l'accepte telle quelle
+        if info.get("audio_codec") in ("aac", "mp3"):
+            cmd += ["-c:a", "copy"]
+        else:
+            cmd += ["-c:a", "aac", "-b:a", "192k"]
+        cmd += ["-movflags", "+faststart", str(tmp_path)]
+        
+        job = current_job()
+        progress = {}
+        if job is not None:
+            progress = {"duration": info["duration"], "on_progress": job.set_progress}
+        try:
+            run_ffmpeg(cmd, lane=LANE_LONG, **progress)
+            os.replace(tmp_path, mezzanine_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        return str(mezzanine_path)
+    
+    def start_proxy_generation(self, video_path: str) -> None:
+        """Lance la génération du proxy en arrière-plan (sans bloquer l'appelant).
+        
+        Pour une source à GOP long, la mezzanine est préparée dans la foulée.
+        """
+        fingerprint = self.cache.fingerprint(video_path)
+        mezzanine = self.needs_mezzanine(video_path)
+        
+        with self._proxy_lock:
+            thread = self._proxy_threads.get(fingerprint)
+            if (thread and thread.is_alive()) or (
+                self._proxy_path(video_path).exists()
+                and (not mezzanine or self._mezzanine_path(video_path).exists())
+            ):
+                return
+            
+            def run():
+                try:
+                    self.generate_proxy(video_path)
+                except Exception as e:
+                    print(f"Erreur génération proxy: {e}")
+                if mezzanine:
+                    try:
+                        self.generate_mezzanine(video_path)
+                    except Exception as e:
+                        print(f"Erreur génération mezzanine: {e}")
+            
+            thread = threading.Thread(target=run, name=f"proxy-{fingerprint[:8]}", daemon=True)
+            self._proxy_threads[fingerprint] = thread
+            thread.start()
+    
+    def wait_for_proxy(self, video_path: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Attend le proxy lancé par `start_proxy_generation` (sans attendre la mezzanine).
+        
+        Returns:
+            Chemin du proxy, ou None s'il n'a pas pu être généré (ou délai dépassé)
+        """
+        fingerprint = self.cache.fingerprint(video_path)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.get_proxy_path(video_path) is None:
+            with self._proxy_lock:
+                thread = self._proxy_threads.get(fingerprint)
+            if thread is None or not thread.is_alive():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            time.sleep(0.5)
+        return self.get_proxy_path(video_path)
+    
+    def get_proxy_path(self, video_path: str) -> Optional[str]:
+        """Retourne le proxy de la source s'il est prêt, sinon None."""
+        proxy_path = self._proxy_path(video_path)
+        return str(proxy_path) if proxy_path.exists() else None
+    
+    def _analysis_source(self, video_path: str) -> str:
+        """Fichier à lire pour l'analyse : le proxy s'il existe, sinon l'original."""
+        return self.get_proxy_path(video_path) or str(video_path)
+    
+    def _decode_source(self, video_path: str) -> str:
+        """Fichier à lire en pleine résolution : la mezzanine si elle est prête, sinon l'original."""
+        mezzanine_path = self._mezzanine_path(video_path)
+        return str(mezzanine_path) if mezzanine_path.exists() else str(video_path)
+    
+    def get_thumbnail_index(
+        self,
+        video_path: str,
+        interval: float = 2.0,
+        thumb_width: int = 160,
+        columns: int = 10,
+        image_format: str = "jpg",
+    ) -> dict:
+        """Retourne l'index de miniatures (planche + temps), construit si absent.
+        
+        Toutes les miniatures sont extraites en un seul décodage séquentiel
+        (filtres ffmpeg `fps` + `scale` + `tile`) et assemblées dans une seule
+        planche stockée dans le cache d'analyse.
+        
+        Args:
+            video_path: Chemin vers la vidéo
+            interval: Intervalle entre deux miniatures en secondes
+            thumb_width: Largeur d'une miniature
+            columns: Nombre de miniatures par ligne de la planche
+            image_format: Format de la planche (jpg, webp)
+            
+        Returns:
+            Dict avec 'sprite' (chemin), 'times', 'columns', 'thumb_width', 'thumb_height'
+        """
+        from ffmpeg_executor import LANE_LONG, run_ffmpeg
+        from video_reader import get_ffmpeg_binary
+        
+        index_name = f"thumbnails_{thumb_width}_{interval:g}"
+        sprite_path = self.cache.path_for(video_path, f"{index_name}.{image_format}")
+        
+        index = self.cache.load_json(video_path, index_name)
+        if index and sprite_path.exists():
+            index["sprite"] = str(sprite_path)
+            return index
+        
+        info = self.get_video_info(video_path)
+        
+        # Limiter la hauteur de la planche sur les vidéos très longues
+        interval = max(interval, info["duration"] / self.MAX_THUMBNAILS)
+        count = max(1, int(np.ceil(info["duration"] / interval)))
+        rows = int(np.ceil(count / columns))
+        thumb_height = max(2, int(round(thumb_width / info["aspect_ratio"] / 2)) * 2)
+        
+        tmp_path = sprite_path.with_name(f".{sprite_path.stem}.{os.getpid()}.{threading.get_ident()}.{image_format}")
+        cmd = [
+            get_ffmpeg_binary(), "-y", "-loglevel", "error", "-nostdin",
+            "-i", self._analysis_source(video_path),
+            "-an", "-sn",
+            "-vf", f"fps=1/{interval:.6f},scale={thumb_width}:{thumb_height},tile={columns}x{rows}",
+            "-frames:v", "1",
+            "-q:v", "5",
+            str(tmp_path),
+        ]
+        try:
+            run_ffmpeg(cmd, lane=LANE_LONG)
+            os.replace(tmp_path, sprite_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        index = {
+            "interval": interval,
+            "times": [i * interval for i in range(count)],
+            "columns": columns,
+            "rows": rows,
+            "thumb_width": thumb_width,
+            "thumb_height": thumb_height,
         }
-        clip.close()
-        return info
+        self.cache.save_json(video_path, index_name, index)
+        
+        index["sprite"] = str(sprite_path)
+        return index
+    
+    def _feature_series_cached(self, video_path: str, name: str, extract: Callable[[], List[float]]) -> np.ndarray:
+        """Série de caractéristiques mémorisée par empreinte, en mémoire et dans le cache d'analyse.
+        
+        `extract` ne décode la source qu'au premier accès : les détecteurs
+        réévaluent ensuite leurs seuils sur la série en mémoire.
+        """
+        key = (self.cache.fingerprint(video_path), name)
+        with self._probes_lock:
+            series = self._feature_series.get(key)
+        
+        if series is None:
+            values = self.cache.load_json(video_path, name)
+            if values is None:
+                values = [float(v) for v in extract()]
+                self.cache.save_json(video_path, name, values)
+            series = np.asarray(values, dtype=np.float64)
+            series.flags.writeable = False  # Partagée entre processeurs et threads
+            with self._probes_lock:
+                self._feature_series[key] = series
+        
+        return series
+    
+    # Pas de l'enveloppe audio (volume RMS par fenêtre), en secondes
+    AUDIO_ENVELOPE_STEP = 0.5
+    
+    def audio_envelope(self, video_path: str) -> Optional[np.ndarray]:
+        """Volume RMS du premier canal par fenêtre de 0.5s (mis en cache).
+        
+        Returns:
+            Série des volumes, ou None si la source n'a pas d'audio
+        """
+        from ffmpeg_executor import LANE_LONG, stream_ffmpeg
+        from video_reader import get_ffmpeg_binary
+        
+        def extract() -> List[float]:
+            if not self.get_video_info(video_path)["has_audio"]:
+                return []
+            
+            fps = 44100  # Échantillonnage audio
+            window_size = int(fps * self.AUDIO_ENVELOPE_STEP)
+            
+            # PCM du premier canal lu en flux : seul le volume de chaque fenêtre est gardé
+            cmd = [
+                get_ffmpeg_binary(), "-loglevel", "error", "-nostdin",
+                "-i", self._analysis_source(video_path),
+                "-map", "0:a:0", "-vn", "-sn",
+                "-af", "pan=mono|c0=c0",
+                "-ar", str(fps),
+                "-f", "f32le",
+                "-",
+            ]
+            volumes = []
+            for chunk in stream_ffmpeg(cmd, chunk_size=window_size * 4, lane=LANE_LONG):
+                if len(chunk) < window_size * 4:
+                    break
+                window = np.frombuffer(chunk, dtype=np.float32).astype(np.float64)
+                volumes.append(float(np.sqrt(np.mean(window**2))))
+            return volumes
+        
+        envelope = self._feature_series_cached(video_path, f"audio_envelope_{self.AUDIO_ENVELOPE_STEP:g}", extract)
+        return envelope if envelope.size else None
     
     def analyze_audio_peaks(
         self,
@@ -51,6 +513,10 @@ class VideoProcessor:
     ) -> List[Tuple[float, float]]:
         """Détecte les moments intéressants basés sur les pics audio.
         
+        L'enveloppe audio est extraite une fois par source (`audio_envelope`) ;
+        la détection des pics (`moments.audio_peak_ranges`) se recalcule
+        ensuite sans décodage pour d'autres paramètres.
+        
         Args:
             video_path: Chemin vers la vidéo
             min_clip_duration: Durée minimale d'un clip
@@ -61,79 +527,30 @@ class VideoProcessor:
         Returns:
             Liste de tuples (start_time, end_time)
         """
-        from moviepy.video.io.VideoFileClip import VideoFileClip
+        from moments import audio_peak_ranges
         
-        clip = VideoFileClip(video_path)
-        
-        if clip.audio is None:
-            clip.close()
-            # Fallback si pas d'audio
-            return self._divide_equally(video_path, min_clip_duration, num_clips)
-        
-        # Extraire l'audio
-        audio = clip.audio
-        fps = 44100  # Échantillonnage audio
+        duration = self.get_video_info(video_path)["duration"]
         
         try:
-            # Convertir en array numpy
-            audio_array = audio.to_soundarray(fps=fps)
-            
-            # Prendre un seul canal (mono)
-            if len(audio_array.shape) > 1:
-                audio_array = audio_array[:, 0]
-            
-            # Calculer le volume RMS par fenêtre
-            window_size = int(fps * 0.5)  # Fenêtre de 0.5 seconde
-            volumes = []
-            times = []
-            
-            for i in range(0, len(audio_array) - window_size, window_size):
-                window = audio_array[i:i + window_size]
-                rms = np.sqrt(np.mean(window**2))
-                volumes.append(rms)
-                times.append(i / fps)
-            
-            volumes = np.array(volumes)
-            
-            # Normaliser
-            if volumes.max() > 0:
-                volumes = volumes / volumes.max()
-            
-            # Détecter les pics
-            peaks, properties = find_peaks(
+            volumes = self.audio_envelope(video_path)
+        except subprocess.CalledProcessError as e:
+            print(f"Erreur analyse audio: {e}")
+            volumes = None
+        
+        time_ranges = []
+        if volumes is not None:
+            time_ranges = audio_peak_ranges(
                 volumes,
+                self.AUDIO_ENVELOPE_STEP,
+                duration,
+                min_clip_duration=min_clip_duration,
+                max_clip_duration=max_clip_duration,
+                num_clips=num_clips,
                 prominence=prominence,
-                distance=int(min_clip_duration / 0.5),  # Distance minimale entre pics
             )
-            
-            # Trier par prominence et prendre les meilleurs
-            if len(peaks) > 0:
-                prominences = properties['prominences']
-                sorted_indices = np.argsort(prominences)[::-1]
-                top_peaks = peaks[sorted_indices[:num_clips]]
-                
-                time_ranges = []
-                for peak in top_peaks:
-                    center_time = times[peak]
-                    start = max(0, center_time - max_clip_duration / 2)
-                    end = min(clip.duration, start + max_clip_duration)
-                    
-                    # Ajuster si on dépasse
-                    if end - start < min_clip_duration:
-                        start = max(0, end - min_clip_duration)
-                    
-                    time_ranges.append((start, end))
-                
-                clip.close()
-                return sorted(time_ranges, key=lambda x: x[0])
-            else:
-                clip.close()
-                return self._divide_equally(video_path, min_clip_duration, num_clips)
-                
-        except Exception as e:
-            print(f"Erreur analyse audio: {e}")
-            clip.close()
-            return self._divide_equally(video_path, min_clip_duration, num_clips)
+        
+        # Fallback si pas d'audio ou pas de pic
+        return time_ranges or self._divide_equally(video_path, min_clip_duration, num_clips)
     
     def _divide_equally(
         self,
@@ -154,6 +571,150 @@ class VideoProcessor:
             
         return time_ranges
     
+    def _reframe_geometry(
+        self,
+        video_path: str,
+        read_path: str,
+        target_width: int,
+        target_height: int,
+        zoom_mode: str = "fit",
+        scale: float = 1.0,
+    ):
+        """Géométrie de recadrage du fichier lu (source, mezzanine ou proxy) vers le cadre cible.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            read_path: Fichier effectivement décodé
+            target_width: Largeur cible
+            target_height: Hauteur cible
+            zoom_mode: Mode de zoom (fit, fill, center)
+            scale: Facteur d'échelle appliqué à la source (cadre identique à
+                l'export, à une résolution réduite)
+        
+        Returns:
+            ReframeGeometry
+        """
+        from video_reader import compute_reframe_geometry
+        
+        info = self.get_video_info(video_path)
+        
+        # Dimensions de la source rapportées à l'échelle demandée
+        src_width = max(2, int(round(info["width"] * scale / 2)) * 2)
+        src_height = max(2, int(round(info["height"] * scale / 2)) * 2)
+        geometry = compute_reframe_geometry(
+            src_width,
+            src_height,
+            target_width,
+            target_height,
+            zoom_mode,
+        )
+        
+        if geometry.scale is None and (scale != 1.0 or read_path != self._decode_source(video_path)):
+            # Mode center : la source lue n'a pas la taille de référence
+            geometry.scale = (src_width, src_height)
+        return geometry
+    
+    def _open_reframed_segment(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        target_width: int,
+        target_height: int,
+        zoom_mode: str = "fit",
+        fps: float = 30,
+        scale: float = 1.0,
+        use_proxy: bool = False,
+        audio: bool = True,
+    ):
+        """Ouvre un segment de la source directement au format cible.
+        
+        Le redimensionnement, le recadrage et les bandes noires sont appliqués
+        par ffmpeg au décodage (`-vf scale,crop,pad`) : les frames arrivent en
+        NumPy à la taille de sortie au lieu d'être rééchantillonnées en Python.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            start_time: Temps de début
+            end_time: Temps de fin
+            target_width: Largeur cible
+            target_height: Hauteur cible
+            zoom_mode: Mode de zoom (fit, fill, center)
+            fps: Cadence des frames produites
+            scale: Facteur d'échelle appliqué à la source (cadre identique à
+                l'export, à une résolution réduite)
+            use_proxy: Lire le proxy basse résolution s'il est disponible
+            audio: Joindre la piste audio (inutile si l'encodeur la lit lui-même)
+            
+        Returns:
+            ReframedSegment (à fermer après usage), clip disponible via `.clip`
+        """
+        from video_reader import ReframedSegment, get_reader_pool
+        
+        info = self.get_video_info(video_path)
+        end_time = min(end_time, info["duration"])
+        
+        full_path = self._decode_source(video_path)
+        read_path = (self.get_proxy_path(video_path) or full_path) if use_proxy else full_path
+        geometry = self._reframe_geometry(video_path, read_path, target_width, target_height, zoom_mode, scale)
+        
+        # Proxy et mezzanine ont un GOP court : l'index ne sert que pour l'original
+        keyframes = self.get_keyframe_index(video_path) if read_path == str(video_path) else None
+        
+        return ReframedSegment(
+            read_path, start_time, end_time, geometry,
+            fps=fps,
+            keyframes=keyframes,
+            pool=get_reader_pool(),
+            audio=audio,
+        )
+    
+    # Pas d'échantillonnage des frames pour la détection de scènes, en secondes
+    SCENE_SAMPLE_STEP = 0.5
+    
+    def frame_differences(self, video_path: str) -> np.ndarray:
+        """Différence moyenne entre frames successives, une frame toutes les 0.5s (mise en cache).
+        
+        L'élément i compare la frame à `i * SCENE_SAMPLE_STEP` à la précédente
+        (0 pour la première).
+        
+        Raises:
+            subprocess.CalledProcessError: Échec du décodage
+        """
+        from ffmpeg_executor import LANE_LONG, stream_ffmpeg
+        from jobs import report_progress
+        from video_reader import get_ffmpeg_binary, probe_streams
+        
+        def extract() -> List[float]:
+            # ffmpeg ne livre que les frames échantillonnées
+            step = self.SCENE_SAMPLE_STEP
+            read_path = self._analysis_source(video_path)
+            probe = probe_streams(read_path)
+            width, height = probe["video"]["width"], probe["video"]["height"]
+            duration = probe["duration"] or self.get_video_info(video_path)["duration"]
+            cmd = [
+                get_ffmpeg_binary(), "-loglevel", "error", "-nostdin",
+                "-i", read_path,
+                "-an", "-sn",
+                "-vf", f"fps={1 / step:g},scale={width}:{height}",
+                "-f", "rawvideo",
+                "-pix_fmt", "rgb24",
+                "-",
+            ]
+            frame_bytes = width * height * 3
+            diffs, prev_frame = [], None
+            
+            for i, data in enumerate(stream_ffmpeg(cmd, chunk_size=frame_bytes, lane=LANE_LONG)):
+                if len(data) < frame_bytes:
+                    break
+                frame = np.frombuffer(data, dtype=np.uint8).astype(np.int16)
+                report_progress(i * step / duration if duration else 0.0)
+                diffs.append(float(np.mean(np.abs(frame - prev_frame))) if prev_frame is not None else 0.0)
+                prev_frame = frame
+            return diffs
+        
+        return self._feature_series_cached(video_path, f"frame_diffs_{self.SCENE_SAMPLE_STEP:g}", extract)
+    
     def detect_scene_changes(
         self,
         video_path: str,
@@ -162,6 +723,10 @@ class VideoProcessor:
     ) -> List[float]:
         """Détecte les changements de scène dans la vidéo.
         
+        Les différences entre frames sont extraites une fois par source
+        (`frame_differences`) ; changer le seuil ou la durée minimale ne
+        redécode pas la vidéo.
+        
         Args:
             video_path: Chemin vers la vidéo
             threshold: Seuil de détection (différence entre frames)
@@ -170,38 +735,28 @@ class VideoProcessor:
         Returns:
             Liste des timestamps des changements de scène
         """
-        from moviepy.video.io.VideoFileClip import VideoFileClip
-        
-        clip = VideoFileClip(video_path)
-        fps = clip.fps
-        scene_changes = []
-        last_scene_time = 0
+        from moments import scene_changes_from_diffs
         
         try:
-            # Analyser une frame toutes les 0.5 secondes
-            step = 0.5
-            prev_frame = None
-            
-            for t in np.arange(0, clip.duration, step):
-                frame = clip.get_frame(t)
-                
-                if prev_frame is not None:
-                    # Calculer la différence moyenne
-                    diff = np.mean(np.abs(frame.astype(float) - prev_frame.astype(float)))
-                    
-                    if diff > threshold and (t - last_scene_time) >= min_scene_duration:
-                        scene_changes.append(t)
-                        last_scene_time = t
-                
-                prev_frame = frame
-            
-            clip.close()
-            return scene_changes
-            
+            diffs = self.frame_differences(video_path)
         except Exception as e:
             print(f"Erreur détection scènes: {e}")
-            clip.close()
             return []
+        
+        return scene_changes_from_diffs(diffs, self.SCENE_SAMPLE_STEP, threshold, min_scene_duration)
+    
+    @classmethod
+    def load_whisper_model(cls, name: str = "base"):
+        """Retourne le modèle Whisper demandé, chargé une seule fois par processus."""
+        with cls._whisper_lock:
+            model = cls._whisper_models.get(name)
+            if model is None:
+                import whisper
+                
+                # Téléchargement automatique si nécessaire
+                model = whisper.load_model(name)
+                cls._whisper_models[name] = model
+            return model
     
     def generate_subtitles(
         self,
@@ -217,14 +772,17 @@ class VideoProcessor:
         Returns:
             Liste de dicts avec 'start', 'end', 'text'
         """
+        cache_name = f"subtitles_{language}_base"
+        cached = self.cache.load_json(video_path, cache_name)
+        if cached is not None:
+            return cached
+        
         try:
-            import whisper
-            
-            # Charger le modèle (téléchargement automatique si nécessaire)
-            model = whisper.load_model("base")
+            # Modèle gardé en mémoire entre deux transcriptions
+            model = self.load_whisper_model("base")
             
-            # Transcrire
-            result = model.transcribe(video_path, language=language)
+            # Transcrire (le proxy contient la même piste audio, plus rapide à lire)
+            result = model.transcribe(self._analysis_source(video_path), language=language)
             
             subtitles = []
             for segment in result["segments"]:
@@ -234,6 +792,7 @@ class VideoProcessor:
                     "text": segment["text"].strip(),
                 })
             
+            self.cache.save_json(video_path, cache_name, subtitles)
             return subtitles
             
         except ImportError:
@@ -252,6 +811,9 @@ class VideoProcessor:
         font_color: str = "white",
         stroke_color: str = "black",
         stroke_width: int = 2,
+        keyframe_times: Optional[List[float]] = None,
+        size_profile: Optional[OutputProfile] = None,
+        complexity: Optional[Tuple[float, int]] = None,
     ):
         """Ajoute des sous-titres à une vidéo.
         
@@ -263,6 +825,9 @@ class VideoProcessor:
             font_color: Couleur du texte
             stroke_color: Couleur du contour
             stroke_width: Épaisseur du contour
+            keyframe_times: Temps où forcer une image clé (assemblage rapide)
+            size_profile: Profil à taille cible de l'export (voir `_write_export`)
+            complexity: Complexité mesurée du segment (`probe_complexity`)
         """
         from moviepy.video.io.VideoFileClip import VideoFileClip
         from moviepy.video.VideoClip import TextClip
@@ -295,24 +860,145 @@ class VideoProcessor:
                 continue
         
         # Combiner
-        if txt_clips:
-            final = CompositeVideoClip([clip] + txt_clips)
-            final.write_videofile(
-                output_path,
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-            )
-            final.close()
-        else:
-            clip.write_videofile(
-                output_path,
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-            )
+        try:
+            if txt_clips:
+                final = CompositeVideoClip([clip] + txt_clips)
+                self._write_export(final, output_path, keyframe_times, size_profile, complexity)
+                final.close()
+            else:
+                self._write_export(clip, output_path, keyframe_times, size_profile, complexity)
+        finally:
+            clip.close()
+    
+    @staticmethod
+    def _temp_output_path(output_path) -> Path:
+        """Fichier temporaire d'une sortie : caché, unique par processus et thread.
+        
+        Le rendu y est écrit puis renommé (`os.replace`) une fois terminé, pour
+        que deux jobs ne partagent jamais un fichier en cours d'écriture. Le
+        répertoire de sortie est recréé s'il a été nettoyé entre-temps.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path.with_name(
+            f".{output_path.stem}.{os.getpid()}.{threading.get_ident()}{output_path.suffix}"
+        )
+    
+    @staticmethod
+    def segment_subtitles(subtitles: Optional[List[dict]], start: float, end: float) -> List[dict]:
+        """Sous-titres entièrement compris dans [start, end], relatifs à `start`.
+        
+        Sélection commune à la prévisualisation et aux exports : un sous-titre
+        à cheval sur une borne n'apparaît ni dans l'une ni dans les autres.
+        Les sous-titres sont copiés, la liste d'origine reste intacte.
+        """
+        return [
+            dict(s, start=s["start"] - start, end=s["end"] - start)
+            for s in (subtitles or [])
+            if s["start"] >= start and s["end"] <= end
+        ]
+    
+    @staticmethod
+    def _render_logger():
+        """Logger des exports MoviePy : progression du job en cours, sinon barre console."""
+        from jobs import progress_logger
+        return progress_logger()
+    
+    @staticmethod
+    def _keyframe_params(keyframe_times: Optional[List[float]]) -> List[str]:
+        """Paramètres ffmpeg pour forcer des images clés aux temps donnés."""
+        times = sorted(t for t in (keyframe_times or []) if t > 0)
+        if not times:
+            return []
+        return ["-force_key_frames", ",".join(f"{t:.3f}" for t in times)]
+    
+    def _export_params(
+        self,
+        keyframe_times: Optional[List[float]] = None,
+        rate_params: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Paramètres ffmpeg des clips exportés : qualité, profil et niveau H.264
+        fixes (ceux des transitions de l'assemblage rapide) et images clés forcées.
+        
+        `rate_params` (voir `_rate_control_params`) remplace la qualité
+        constante pour un export à taille cible.
+        """
+        if rate_params is None:
+            rate_params = ["-crf", str(self.EXPORT_CRF)]
+        return rate_params + [
+            "-profile:v", self.EXPORT_PROFILE,
+            "-level", self.EXPORT_LEVEL,
+        ] + self._keyframe_params(keyframe_times)
+    
+    def _write_export(
+        self,
+        clip,
+        output_path,
+        keyframe_times: Optional[List[float]] = None,
+        size_profile: Optional[OutputProfile] = None,
+        complexity: Optional[Tuple[float, int]] = None,
+        size_retry: bool = True,
+        **kwargs,
+    ):
+        """Exporte un clip MoviePy (fichier temporaire puis renommage).
         
-        clip.close()
+        Avec un profil à taille cible, le débit vient de `_rate_control_params`
+        et un export qui dépasse malgré tout sa limite est réencodé une seule
+        fois à débit corrigé (`_corrected_bitrate`).
+        """
+        tmp_path = self._temp_output_path(output_path)
+        profile = size_profile if size_profile and size_profile.target_size_mb else None
+        try:
+            while True:
+                rate_params = None
+                if profile is not None:
+                    rate_params = self._rate_control_params(profile, clip.duration, complexity)
+                clip.write_videofile(
+                    str(tmp_path),
+                    codec="libx264",
+                    audio_codec="aac",
+                    audio_bitrate=profile.audio_bitrate if profile is not None else None,
+                    fps=self.EXPORT_FPS,
+                    preset=self.EXPORT_PRESET,
+                    ffmpeg_params=self._export_params(keyframe_times, rate_params),
+                    logger=self._render_logger(),
+                    **kwargs,
+                )
+                if profile is None or not size_retry or profile.video_bitrate:
+                    break
+                bitrate = self._corrected_bitrate(profile, os.path.getsize(tmp_path), clip.duration)
+                if bitrate is None:
+                    break
+                profile = replace(profile, video_bitrate=f"{int(bitrate)}")
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    
+    def _size_profile(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        width: int,
+        height: int,
+        zoom_mode: str,
+        target_size_mb: Optional[float],
+        name: str = "clip",
+    ) -> Tuple[Optional[OutputProfile], Optional[Tuple[float, int]]]:
+        """Profil à taille cible d'un export et complexité mesurée du segment.
+        
+        Retourne (None, None) sans taille cible ; la complexité vaut None si
+        la sonde échoue (l'export se fait alors directement au débit disponible).
+        """
+        if not target_size_mb:
+            return None, None
+        profile = OutputProfile(name, width, height, target_size_mb=target_size_mb)
+        try:
+            complexity = self.probe_complexity(video_path, start_time, end_time, width, height, zoom_mode)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Sonde de complexité indisponible: {e}")
+            complexity = None
+        return profile, complexity
     
     def create_clip(
         self,
@@ -324,6 +1010,8 @@ class VideoProcessor:
         zoom_mode: str = "fit",
         add_subtitles: bool = False,
         subtitles_list: Optional[List[dict]] = None,
+        keyframe_times: Optional[List[float]] = None,
+        target_size_mb: Optional[float] = None,
     ) -> str:
         """Crée un clip à partir d'une vidéo.
         
@@ -336,14 +1024,13 @@ class VideoProcessor:
             zoom_mode: Mode de zoom (fit, fill, center)
             add_subtitles: Ajouter des sous-titres
             subtitles_list: Liste des sous-titres à ajouter
+            keyframe_times: Temps (relatifs au clip) où forcer une image clé
+            target_size_mb: Taille maximale du fichier en Mo (débit estimé par
+                `probe_complexity`, un réencodage au plus)
             
         Returns:
             Chemin du fichier clip créé
         """
-        from moviepy.video.io.VideoFileClip import VideoFileClip
-        from moviepy.video.VideoClip import ColorClip
-        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-        
         video_path_obj = Path(video_path)
         
         if not output_name:
@@ -351,118 +1038,62 @@ class VideoProcessor:
         
         output_path = self.output_dir / output_name
         
-        # Charger la vidéo
-        clip = VideoFileClip(str(video_path))
-        
-        # Extraire le segment
-        subclip = clip.subclipped(start_time, end_time)
-        
-        # Redimensionner selon le format
+        # Charger le segment déjà redimensionné et recadré par ffmpeg
         format_info = self.FORMATS.get(format_type, self.FORMATS["tiktok"])
-        target_width = format_info["width"]
-        target_height = format_info["height"]
-        
-        # Calculer les dimensions
-        video_ratio = subclip.w / subclip.h
-        target_ratio = target_width / target_height
-        
-        if zoom_mode == "fit":
-            # Adapter à l'écran avec bands noires si nécessaire
-            if video_ratio > target_ratio:
-                # Vidéo plus large que haute -> réduire la largeur
-                new_width = target_width
-                new_height = int(target_width / video_ratio)
-            else:
-                # Vidéo plus haute que large -> réduire la hauteur
-                new_height = target_height
-                new_width = int(target_height * video_ratio)
-            
-            resized = subclip.resized(new_size=(new_width, new_height))
-            
-            # Centrer la vidéo sur fond noir
-            x_center = (target_width - new_width) // 2
-            y_center = (target_height - new_height) // 2
-            
-            # Créer un fond noir
-            bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0))
-            bg = bg.with_duration(resized.duration)
+        size_profile, complexity = self._size_profile(
+            video_path,
+            start_time,
+            end_time,
+            format_info["width"],
+            format_info["height"],
+            zoom_mode,
+            target_size_mb,
+            name=format_type,
+        )
+        with self._open_reframed_segment(
+            video_path,
+            start_time,
+            end_time,
+            format_info["width"],
+            format_info["height"],
+            zoom_mode,
+        ) as segment:
+            final = segment.clip
+        
+            # Ajouter sous-titres si demandé
+            if add_subtitles and subtitles_list:
+                temp_path = self._temp_output_path(self.output_dir / f"base_{output_name}")
             
-            # Combiner
-            final = CompositeVideoClip([bg, resized.with_position((x_center, y_center))])
-            final = final.with_duration(resized.duration)
+                try:
+                    # Sauvegarder temporairement
+                    final.write_videofile(
+                        str(temp_path),
+                        codec="libx264",
+                        audio_codec="aac",
+                        fps=self.EXPORT_FPS,
+                        preset=self.EXPORT_PRESET,
+                        threads=4,
+                        ffmpeg_params=self._export_params(keyframe_times),
+                        logger=self._render_logger(),
+                    )
             
-        elif zoom_mode == "fill":
-            # Remplir l'écran en coupant si nécessaire
-            if video_ratio > target_ratio:
-                # Vidéo plus large -> crop horizontal
-                new_height = target_height
-                new_width = int(target_height * video_ratio)
-                resized = subclip.resized(new_size=(new_width, new_height))
-                x_center = (new_width - target_width) // 2
-                final = resized.cropped(
-                    x1=x_center,
-                    y1=0,
-                    x2=x_center + target_width,
-                    y2=target_height,
-                )
+                    # Ajouter les sous-titres
+                    self.add_subtitles_to_clip(
+                        str(temp_path),
+                        str(output_path),
+                        subtitles_list,
+                        keyframe_times=keyframe_times,
+                        size_profile=size_profile,
+                        complexity=complexity,
+                    )
+                finally:
+                    # Nettoyer
+                    temp_path.unlink(missing_ok=True)
             else:
-                # Vidéo plus haute -> crop vertical
-                new_width = target_width
-                new_height = int(target_width / video_ratio)
-                resized = subclip.resized(new_size=(new_width, new_height))
-                y_center = (new_height - target_height) // 2
-                final = resized.cropped(
-                    x1=0,
-                    y1=y_center,
-                    x2=target_width,
-                    y2=y_center + target_height,
+                # Exporter normalement (fichier temporaire puis renommage)
+                self._write_export(
+                    final, output_path, keyframe_times, size_profile, complexity, threads=4,
                 )
-        else:
-            # Mode center - centrer sans redimensionner
-            final = subclip.on_color(
-                size=(target_width, target_height),
-                color=(0, 0, 0),
-                pos=("center", "center"),
-            )
-        
-        # Ajouter sous-titres si demandé
-        if add_subtitles and subtitles_list:
-            temp_path = self.output_dir / f"temp_{output_name}"
-            
-            # Sauvegarder temporairement
-            final.write_videofile(
-                str(temp_path),
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-                preset="medium",
-                threads=4,
-            )
-            
-            # Ajouter les sous-titres
-            self.add_subtitles_to_clip(
-                str(temp_path),
-                str(output_path),
-                subtitles_list,
-            )
-            
-            # Nettoyer
-            temp_path.unlink(missing_ok=True)
-        else:
-            # Exporter normalement
-            final.write_videofile(
-                str(output_path),
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-                preset="medium",
-                threads=4,
-            )
-        
-        # Nettoyer
-        clip.close()
-        subclip.close()
-        final.close()
         
         return str(output_path)
     
@@ -496,14 +1127,7 @@ class VideoProcessor:
                 # Filtrer les sous-titres pour ce segment
                 segment_subs = None
                 if subtitles_list:
-                    segment_subs = [
-                        s for s in subtitles_list
-                        if s["start"] >= start and s["end"] <= end
-                    ]
-                    # Ajuster les timestamps
-                    for s in segment_subs:
-                        s["start"] -= start
-                        s["end"] -= start
+                    segment_subs = self.segment_subtitles(subtitles_list, start, end)
                 
                 path = self.create_clip(
                     video_path=video_path,
@@ -519,7 +1143,383 @@ class VideoProcessor:
             except Exception as e:
                 print(f"Erreur lors de la création du clip {i+1}: {e}")
                 
-        return output_paths
+        return output_paths
+    
+    def _resolve_profiles(
+        self,
+        profiles: Optional[Sequence[Union[OutputProfile, str]]],
+    ) -> List[OutputProfile]:
+        """Convertit une liste de profils ou de noms de formats en profils."""
+        if not profiles:
+            return list(self.PLATFORM_PROFILES)
+        resolved = []
+        for profile in profiles:
+            if isinstance(profile, str):
+                format_info = self.FORMATS[profile]
+                profile = OutputProfile(profile, format_info["width"], format_info["height"])
+            resolved.append(profile)
+        return resolved
+    
+    @staticmethod
+    def _parse_bitrate(value: str) -> float:
+        """Convertit un débit ffmpeg ("192k", "6M") en bits par seconde."""
+        value = value.strip()
+        units = {"k": 1e3, "K": 1e3, "m": 1e6, "M": 1e6}
+        if value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    
+    def probe_complexity(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        target_width: int,
+        target_height: int,
+        zoom_mode: str = "fit",
+    ) -> Tuple[float, int]:
+        """Mesure la complexité d'un segment par un encodage rapide en basse résolution.
+        
+        Le segment (lu sur le proxy s'il existe) est recadré comme l'export,
+        dans un cadre réduit au côté court `PROXY_SIZE`, puis encodé en
+        `ultrafast` à CRF fixe : bandes noires et recadrage comptent comme
+        dans la sortie.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            start_time: Temps de début
+            end_time: Temps de fin
+            target_width: Largeur de la sortie
+            target_height: Hauteur de la sortie
+            zoom_mode: Mode de zoom (fit, fill, center)
+        
+        Returns:
+            Tuple (bits par pixel et par frame au CRF de référence, pixels
+            d'une frame de la sonde)
+        """
+        from analysis_cache import cache_key
+        from ffmpeg_executor import run_ffmpeg
+        from video_reader import get_ffmpeg_binary
+        
+        # Sonde conservée dans le cache : réutilisée par la passe corrigée,
+        # les variantes et les rendus suivants du même segment
+        cache_name = "complexity_" + cache_key(
+            start_time, end_time, target_width, target_height, zoom_mode,
+            self.SIZE_PROBE_CRF, self.PROXY_SIZE, self.EXPORT_FPS,
+        )[:16]
+        cached = self.cache.load_json(video_path, cache_name)
+        if cached is not None:
+            return cached[0], cached[1]
+        
+        duration = max(0.1, end_time - start_time)
+        fps = self.EXPORT_FPS
+        scale = self.PROXY_SIZE / min(target_width, target_height)
+        probe_width = max(2, int(round(target_width * scale / 2)) * 2)
+        probe_height = max(2, int(round(target_height * scale / 2)) * 2)
+        read_path = self._analysis_source(video_path)
+        geometry = self._reframe_geometry(video_path, read_path, probe_width, probe_height, zoom_mode, scale)
+        cmd = [
+            get_ffmpeg_binary(), "-loglevel", "error", "-nostdin",
+            "-ss", f"{start_time:.6f}",
+            "-t", f"{duration:.6f}",
+            "-i", read_path,
+            "-an", "-sn",
+            "-vf", f"{geometry.ffmpeg_filters()},fps={fps}",
+            "-c:v", "libx264",
+            "-preset", "ultrafast",
+            "-crf", str(self.SIZE_PROBE_CRF),
+            "-f", "h264",
+            "-",
+        ]
+        encoded = run_ffmpeg(cmd)
+        
+        probe_pixels = probe_width * probe_height
+        bits_per_pixel = len(encoded) * 8 / (probe_pixels * duration * fps)
+        self.cache.save_json(video_path, cache_name, [bits_per_pixel, probe_pixels])
+        return bits_per_pixel, probe_pixels
+    
+    def _rate_control_params(
+        self,
+        profile: OutputProfile,
+        duration: float,
+        complexity: Optional[Tuple[float, int]] = None,
+    ) -> List[str]:
+        """Paramètres de débit ffmpeg d'un profil.
+        
+        Pour une taille cible, le débit disponible est déduit de la durée et
+        du débit audio. Si la complexité mesurée (`probe_complexity`) annonce
+        un fichier plus petit que la limite, on garde la qualité constante en
+        plafonnant seulement le débit ; sinon on encode directement au débit
+        disponible.
+        """
+        if profile.video_bitrate:
+            bitrate = self._parse_bitrate(profile.video_bitrate)
+            return [
+                "-b:v", profile.video_bitrate,
+                "-maxrate", profile.video_bitrate,
+                "-bufsize", f"{int(bitrate * 2)}",
+            ]
+        
+        crf = profile.crf if profile.crf is not None else self.SIZE_PROBE_CRF
+        if not profile.target_size_mb:
+            return ["-crf", str(profile.crf)] if profile.crf is not None else []
+        
+        target_bits = profile.target_size_mb * 1024 * 1024 * 8 * (1 - self.SIZE_MUX_OVERHEAD)
+        budget = max(100e3, target_bits / duration - self._parse_bitrate(profile.audio_bitrate))
+        
+        if complexity is not None:
+            # Extrapolation du débit à qualité constante vers la résolution de sortie
+            bits_per_pixel, probe_pixels = complexity
+            pixels = profile.width * profile.height
+            estimate = (
+                bits_per_pixel * probe_pixels * self.EXPORT_FPS
+                * (pixels / probe_pixels) ** self.SIZE_PROBE_PIXEL_EXPONENT
+            )
+            if estimate <= budget:
+                return [
+                    "-crf", str(crf),
+                    "-maxrate", f"{int(budget)}",
+                    "-bufsize", f"{int(budget * 2)}",
+                ]
+        
+        return [
+            "-b:v", f"{int(budget)}",
+            "-maxrate", f"{int(budget * 1.5)}",
+            "-bufsize", f"{int(budget * 2)}",
+        ]
+    
+    def _corrected_bitrate(self, profile: OutputProfile, size: int, duration: float) -> Optional[float]:
+        """Débit vidéo corrigé d'un export qui dépasse sa taille cible (None sinon).
+        
+        Le débit disponible est réduit au prorata du dépassement constaté sur
+        la première passe.
+        """
+        target = profile.target_size_mb * 1024 * 1024
+        if size <= target:
+            return None
+        audio_bits = self._parse_bitrate(profile.audio_bitrate) * duration
+        video_bits = max(1.0, size * 8 - audio_bits)
+        budget_bits = target * 8 * (1 - self.SIZE_MUX_OVERHEAD) - audio_bits
+        bitrate = max(100e3, budget_bits / duration * min(1.0, budget_bits / video_bits) * 0.97)
+        print(f"{profile.name}: {size / 1e6:.1f} Mo > {profile.target_size_mb} Mo, réencodage à {bitrate / 1e3:.0f} kb/s")
+        return bitrate
+    
+    def create_clip_variants(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        profiles: Optional[Sequence[Union[OutputProfile, str]]] = None,
+        output_stem: Optional[str] = None,
+        zoom_mode: str = "fit",
+        subtitles_list: Optional[List[dict]] = None,
+        subtitle_style: Optional[dict] = None,
+        keyframe_times: Optional[List[float]] = None,
+        size_retry: bool = True,
+    ) -> Dict[str, str]:
+        """Crée plusieurs variantes d'un clip en un seul décodage.
+        
+        Le segment est décodé, recadré (et sous-titré) une seule fois à la
+        plus grande résolution du groupe, puis envoyé en rawvideo à un unique
+        processus ffmpeg qui le duplique (`split`) vers un encodeur par
+        profil. Les profils de ratios différents forment des groupes séparés,
+        car leur recadrage diffère.
+        
+        Les profils avec `target_size_mb` sont encodés à débit contraint
+        (voir `_rate_control_params`) ; une variante qui dépasse malgré tout
+        sa limite est réencodée une seule fois à débit corrigé.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            start_time: Temps de début en secondes
+            end_time: Temps de fin en secondes
+            profiles: Profils de sortie ou noms de `FORMATS` (défaut : toutes les plateformes)
+            output_stem: Préfixe des fichiers de sortie
+            zoom_mode: Mode de zoom (fit, fill, center)
+            subtitles_list: Sous-titres à graver (temps relatifs au clip)
+            subtitle_style: Paramètres de `_make_subtitle_clips` (font_size, font, position, ...)
+            keyframe_times: Temps (relatifs au clip) où forcer une image clé
+            size_retry: Réencoder les variantes qui dépassent leur taille cible
+            
+        Returns:
+            Dict nom du profil -> chemin du fichier créé
+        """
+        import tempfile
+        
+        from video_reader import get_ffmpeg_binary
+        
+        profiles = self._resolve_profiles(profiles)
+        if not output_stem:
+            output_stem = f"{Path(video_path).stem}_clip_{int(start_time)}-{int(end_time)}"
+        
+        groups: Dict[Tuple[int, int], List[OutputProfile]] = {}
+        for profile in profiles:
+            groups.setdefault(profile.aspect_key, []).append(profile)
+        
+        outputs = {}
+        for group in groups.values():
+            master = max(group, key=lambda p: p.width * p.height)
+            
+            # Une sonde de complexité par recadrage, partagée par les profils du groupe
+            complexity = None
+            if any(p.target_size_mb and not p.video_bitrate for p in group):
+                try:
+                    complexity = self.probe_complexity(
+                        video_path, start_time, end_time, master.width, master.height, zoom_mode,
+                    )
+                except (subprocess.CalledProcessError, OSError) as e:
+                    print(f"Sonde de complexité indisponible: {e}")
+            
+            segment = self._open_reframed_segment(
+                video_path,
+                start_time,
+                end_time,
+                master.width,
+                master.height,
+                zoom_mode,
+                fps=self.EXPORT_FPS,
+                audio=False,  # L'audio est lu sur la source par l'encodeur
+            )
+            clip = segment.clip
+            final = clip
+            duration = clip.duration
+            paths = []
+            
+            try:
+                if subtitles_list:
+                    from moviepy import CompositeVideoClip
+                    
+                    txt_clips = self._make_subtitle_clips(
+                        subtitles_list,
+                        video_width=master.width,
+                        duration=duration,
+                        **(subtitle_style or {}),
+                    )
+                    if txt_clips:
+                        final = CompositeVideoClip([clip] + txt_clips)
+                
+                # Un encodeur par profil, alimenté par le même flux décodé
+                count = len(group)
+                graph = [f"[0:v]split={count}" + "".join(f"[s{i}]" for i in range(count))]
+                for i, profile in enumerate(group):
+                    scale = ""
+                    if (profile.width, profile.height) != (master.width, master.height):
+                        scale = f"scale={profile.width}:{profile.height}:flags=bicubic,"
+                    graph.append(f"[s{i}]{scale}format={self.EXPORT_PIXEL_FORMAT}[v{i}]")
+                
+                cmd = [
+                    get_ffmpeg_binary(), "-y", "-loglevel", "error",
+                    "-f", "rawvideo",
+                    "-pix_fmt", "rgb24",
+                    "-s", f"{master.width}x{master.height}",
+                    "-r", str(self.EXPORT_FPS),
+                    "-i", "-",
+                    "-ss", f"{start_time:.6f}",
+                    "-t", f"{duration:.6f}",
+                    "-i", str(video_path),
+                    "-filter_complex", ";".join(graph),
+                ]
+                
+                for i, profile in enumerate(group):
+                    output_path = self.output_dir / f"{output_stem}_{profile.name}.mp4"
+                    tmp_path = self._temp_output_path(output_path)
+                    paths.append((profile, tmp_path, output_path))
+                    
+                    cmd += ["-map", f"[v{i}]", "-map", "1:a?"]
+                    cmd += ["-c:v", "libx264", "-preset", self.EXPORT_PRESET]
+                    cmd += self._rate_control_params(profile, duration, complexity)
+                    cmd += self._keyframe_params(keyframe_times)
+                    cmd += [
+                        "-c:a", "aac",
+                        "-b:a", profile.audio_bitrate,
+                        "-movflags", "+faststart",
+                        str(tmp_path),
+                    ]
+                
+                # Erreurs de l'encodeur dans un fichier : un pipe non lu pendant
+                # l'écriture des frames pourrait se remplir et bloquer ffmpeg
+                with tempfile.TemporaryFile() as log:
+                    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=log)
+                    try:
+                        for frame in final.iter_frames(fps=self.EXPORT_FPS, dtype="uint8", logger=self._render_logger()):
+                            proc.stdin.write(np.ascontiguousarray(frame[:, :, :3]).tobytes())
+                    except BrokenPipeError:
+                        pass
+                    finally:
+                        proc.stdin.close()
+                        proc.wait()
+                    if proc.returncode != 0:
+                        log.seek(0)
+                        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=log.read())
+                
+                for profile, tmp_path, output_path in paths:
+                    os.replace(tmp_path, output_path)
+                    outputs[profile.name] = str(output_path)
+            finally:
+                for _, tmp_path, _ in paths:
+                    tmp_path.unlink(missing_ok=True)
+                if final is not clip:
+                    final.close()
+                segment.close()
+        
+        # Correction unique des variantes trop lourdes, au prorata du dépassement
+        retries = []
+        for profile in profiles:
+            if not (size_retry and profile.target_size_mb):
+                continue
+            size = os.path.getsize(outputs[profile.name])
+            bitrate = self._corrected_bitrate(profile, size, end_time - start_time)
+            if bitrate is not None:
+                retries.append(replace(profile, video_bitrate=f"{int(bitrate)}"))
+        
+        if retries:
+            outputs.update(self.create_clip_variants(
+                video_path,
+                start_time,
+                end_time,
+                profiles=retries,
+                output_stem=output_stem,
+                zoom_mode=zoom_mode,
+                subtitles_list=subtitles_list,
+                subtitle_style=subtitle_style,
+                keyframe_times=keyframe_times,
+                size_retry=False,
+            ))
+        
+        return outputs
+    
+    def interest_curve(self, video_path: str, subtitles: Optional[List[dict]] = None) -> np.ndarray:
+        """Courbe d'intérêt de la source, une valeur par seconde (`moments.CURVE_STEP`).
+        
+        Fusion de l'énergie audio, de la densité de changements de scène et,
+        si la transcription est fournie, du débit de parole.
+        
+        Args:
+            video_path: Chemin vers la vidéo
+            subtitles: Transcription de la source (optionnelle)
+            
+        Returns:
+            Courbe dans [0, 1] (nulle si aucune caractéristique n'est disponible)
+        """
+        from moments import curve_length, event_density, fuse_features, resample_series, speech_rate
+        
+        duration = self.get_video_info(video_path)["duration"]
+        features = {}
+        
+        try:
+            envelope = self.audio_envelope(video_path)
+            if envelope is not None:
+                features["audio"] = resample_series(envelope, self.AUDIO_ENVELOPE_STEP, duration)
+        except Exception as e:
+            print(f"Détection audio échouée: {e}")
+        
+        scene_changes = self.detect_scene_changes(video_path, threshold=25.0)
+        features["scenes"] = event_density(scene_changes, duration)
+        
+        if subtitles:
+            features["speech"] = speech_rate(subtitles, duration)
+        
+        return fuse_features(features) if features else np.zeros(curve_length(duration))
     
     def auto_detect_moments(
         self,
@@ -528,15 +1528,21 @@ class VideoProcessor:
         num_clips: int = 5,
         detection_method: str = "smart",
         min_gap: float = 5.0,
+        subtitles: Optional[List[dict]] = None,
     ) -> List[Tuple[float, float]]:
         """Détecte automatiquement des moments intéressants avec algorithme intelligent.
         
+        En mode "smart", les fenêtres retenues sont celles qui maximisent
+        ensemble l'intérêt cumulé (`interest_curve`), à `min_gap` l'une de
+        l'autre.
+        
         Args:
             video_path: Chemin vers la vidéo
             clip_duration: Durée de chaque clip en secondes
             num_clips: Nombre de clips à générer
             detection_method: Méthode de détection (smart, audio_peaks, scene_change, equal)
             min_gap: Espace minimum entre deux clips (évite les chevauchements)
+            subtitles: Transcription de la source (débit de parole, mode smart)
             
         Returns:
             Liste de tuples (start_time, end_time)
@@ -544,88 +1550,22 @@ class VideoProcessor:
         info = self.get_video_info(video_path)
         total_duration = info["duration"]
         
-        # Mode "smart" : combine plusieurs méthodes
+        # Mode "smart" : courbe d'intérêt (audio, scènes, parole) et fenêtres optimales
         if detection_method == "smart":
-            candidates = []
-            
-            # Essayer la détection audio
-            try:
-                audio_peaks = self.analyze_audio_peaks(
-                    video_path,
-                    min_clip_duration=clip_duration * 0.5,
-                    max_clip_duration=clip_duration,
-                    num_clips=num_clips * 2,  # Plus de candidats
-                    prominence=0.05,  # Seuil plus bas
-                )
-                for start, end in audio_peaks:
-                    candidates.append({"start": start, "end": end, "score": 1.0, "type": "audio"})
-            except Exception as e:
-                print(f"Détection audio échouée: {e}")
-            
-            # Essayer la détection de scènes
-            try:
-                scene_changes = self.detect_scene_changes(video_path, threshold=25.0)
-                for scene_time in scene_changes:
-                    start = max(0, scene_time - clip_duration / 2)
-                    end = min(total_duration, start + clip_duration)
-                    candidates.append({"start": start, "end": end, "score": 0.8, "type": "scene"})
-            except Exception as e:
-                print(f"Détection scènes échouée: {e}")
-            
-            # Ajouter des points réguliers comme fallback
-            interval = total_duration / (num_clips + 1)
-            for i in range(1, num_clips + 1):
-                center = i * interval
-                start = max(0, center - clip_duration / 2)
-                end = min(total_duration, start + clip_duration)
-                candidates.append({"start": start, "end": end, "score": 0.5, "type": "regular"})
-            
-            # Trier par score décroissant
-            candidates.sort(key=lambda x: x["score"], reverse=True)
-            
-            # Sélectionner les meilleurs candidats sans chevauchement
-            selected = []
-            used_ranges = []
-            
-            for candidate in candidates:
-                if len(selected) >= num_clips:
-                    break
-                
-                # Vérifier le gap minimum avec les clips déjà sélectionnés
-                valid = True
-                for used_start, used_end in used_ranges:
-                    # Vérifier s'il y a chevauchement ou gap insuffisant
-                    if not (candidate["end"] + min_gap <= used_start or candidate["start"] >= used_end + min_gap):
-                        valid = False
-                        break
-                
-                if valid:
-                    selected.append((candidate["start"], candidate["end"]))
-                    used_ranges.append((candidate["start"], candidate["end"]))
-            
-            # Trier par ordre chronologique
-            selected.sort(key=lambda x: x[0])
+            from moments import CURVE_STEP, select_windows, window_scores
             
-            # Compléter si nécessaire
-            while len(selected) < num_clips:
-                remaining = num_clips - len(selected)
-                additional = self._divide_equally(video_path, clip_duration, remaining)
-                
-                for start, end in additional:
-                    # Vérifier qu'il n'y a pas de chevauchement
-                    valid = True
-                    for used_start, used_end in used_ranges:
-                        if not (end + min_gap <= used_start or start >= used_end + min_gap):
-                            valid = False
-                            break
-                    
-                    if valid and len(selected) < num_clips:
-                        selected.append((start, end))
-                        used_ranges.append((start, end))
-                
-                break
+            curve = self.interest_curve(video_path, subtitles)
+            if curve.max() <= 0:
+                # Aucun signal exploitable : répartition régulière
+                return self._divide_equally(video_path, clip_duration, num_clips)
             
-            return selected[:num_clips]
+            width = max(1, int(np.ceil(clip_duration / CURVE_STEP)))
+            gap = int(np.ceil(min_gap / CURVE_STEP))
+            starts = select_windows(window_scores(curve, width), width, num_clips, gap)
+            return [
+                (start * CURVE_STEP, min(total_duration, start * CURVE_STEP + clip_duration))
+                for start in starts
+            ]
         
         elif detection_method == "audio_peaks":
             return self.analyze_audio_peaks(
@@ -661,13 +1601,14 @@ class VideoProcessor:
         zoom_mode: str = "fill",
         enable_subtitles: bool = True,
         subtitle_style: str = "tiktok_classic",
-        subtitle_font: str = "Impact",
-        subtitle_position: str = "bottom_margin",
-        subtitle_size: int = 50,
-        subtitle_color: str = "white",
+        subtitle_font: Optional[str] = None,
+        subtitle_position: Optional[str] = None,
+        subtitle_size: Optional[int] = None,
+        subtitle_color: Optional[str] = None,
         detection_method: str = "smart",
         add_transitions: bool = False,
         transition_type: str = "fade",
+        target_size_mb: Optional[float] = None,
     ) -> Dict:
         """Génère automatiquement des clips avec un seul appel.
         
@@ -677,6 +1618,9 @@ class VideoProcessor:
         3. Création des clips avec options choisies
         4. Assemblage avec transitions si demandé
         
+        Chaque étape est mise en cache selon ses entrées (`RenderGraph`) :
+        relancer avec un paramètre modifié ne refait que les étapes concernées.
+        
         Args:
             video_path: Chemin vers la vidéo source
             output_prefix: Préfixe pour les noms de fichiers
@@ -686,127 +1630,51 @@ class VideoProcessor:
             zoom_mode: Mode de zoom
             enable_subtitles: Activer les sous-titres
             subtitle_style: Style des sous-titres (tiktok_classic, youtube_bold, etc.)
-            subtitle_font: Police des sous-titres
-            subtitle_position: Position des sous-titres
-            subtitle_size: Taille des sous-titres
-            subtitle_color: Couleur des sous-titres
+            subtitle_font: Police des sous-titres (None : celle du style)
+            subtitle_position: Position des sous-titres (None : celle du style)
+            subtitle_size: Taille des sous-titres (None : celle du style)
+            subtitle_color: Couleur des sous-titres (None : celle du style)
             detection_method: Méthode de détection
             add_transitions: Ajouter des transitions entre clips
             transition_type: Type de transition
+            target_size_mb: Taille maximale de chaque clip en Mo (None : qualité constante)
             
         Returns:
             Dictionnaire avec les résultats et métadonnées
         """
-        from video_effects import TransitionType
-        
-        results = {
-            "success": True,
-            "clips": [],
-            "assembled": None,
-            "subtitles": None,
-            "method_used": detection_method,
-        }
+        from render_graph import RenderGraph
+        from subtitle_config import get_subtitle_config
         
         try:
-            # 1. Obtenir les infos
-            info = self.get_video_info(video_path)
-            results["video_info"] = info
-            
-            # 2. Générer les sous-titres si demandé
-            subtitles_list = None
-            if enable_subtitles:
-                try:
-                    subtitles_list = self.generate_subtitles(video_path)
-                    results["subtitles"] = subtitles_list
-                except Exception as e:
-                    print(f"Génération sous-titres échouée: {e}")
-            
-            # 3. Détecter les moments
-            time_ranges = self.auto_detect_moments(
+            return RenderGraph(self).run(
                 video_path,
-                clip_duration=clip_duration,
+                output_prefix=output_prefix,
                 num_clips=num_clips,
+                clip_duration=clip_duration,
+                format_type=format_type,
+                zoom_mode=zoom_mode,
+                enable_subtitles=enable_subtitles,
                 detection_method=detection_method,
+                add_transitions=add_transitions,
+                transition_type=transition_type,
+                target_size_mb=target_size_mb,
+                subtitle_config=get_subtitle_config(
+                    subtitle_style,
+                    custom_font=subtitle_font,
+                    custom_size=subtitle_size,
+                    custom_position=subtitle_position,
+                    custom_color=subtitle_color,
+                ),
             )
-            results["detected_moments"] = time_ranges
-            
-            # 4. Créer les clips
-            clip_paths = []
-            for i, (start, end) in enumerate(time_ranges):
-                output_name = f"{output_prefix}_{i+1:03d}.mp4"
-                
-                # Filtrer les sous-titres pour ce segment
-                segment_subs = None
-                if subtitles_list:
-                    segment_subs = [
-                        s for s in subtitles_list
-                        if s["start"] >= start and s["end"] <= end
-                    ]
-                    for s in segment_subs:
-                        s["start"] -= start
-                        s["end"] -= start
-                
-                # Créer le clip
-                # Étape 1: Créer le clip vidéo de base
-                # Utiliser un nom simple sans chemin (create_clip ajoute output_dir)
-                temp_filename = f"temp_{output_name}"
-                path = self.create_clip(
-                    video_path=video_path,
-                    start_time=start,
-                    end_time=end,
-                    output_name=temp_filename,  # Juste le nom, pas le chemin complet
-                    format_type=format_type,
-                    zoom_mode=zoom_mode,
-                    add_subtitles=False,  # On ajoute les sous-titres après
-                    subtitles_list=None,
-                )
-                
-                # Étape 2: Ajouter les sous-titres si demandé
-                if enable_subtitles and segment_subs:
-                    final_path = self.output_dir / output_name
-                    success = self.burn_subtitles_to_clip(
-                        video_path=path,
-                        output_path=str(final_path),
-                        subtitles=segment_subs,
-                        font_size=40,
-                    )
-                    if success:
-                        # Supprimer le fichier temporaire
-                        try:
-                            os.remove(path)
-                        except:
-                            pass
-                        path = str(final_path)
-                    else:
-                        # Si l'ajout des sous-titres échoue, renommer le fichier temporaire
-                        os.rename(path, str(final_path))
-                        path = str(final_path)
-                
-                clip_paths.append(path)
-                results["clips"].append({
-                    "path": path,
-                    "start": start,
-                    "end": end,
-                    "duration": end - start,
-                })
-            
-            # 5. Assembler avec transitions si demandé
-            if add_transitions and len(clip_paths) > 1:
-                assembled_path = self.concatenate_clips_with_transitions(
-                    video_paths=clip_paths,
-                    output_name=f"{output_prefix}_assembled.mp4",
-                    transition_type=transition_type,
-                    transition_duration=0.5,
-                    format_type=format_type,
-                )
-                results["assembled"] = assembled_path
-            
-            return results
-            
         except Exception as e:
-            results["success"] = False
-            results["error"] = str(e)
-            return results
+            return {
+                "success": False,
+                "error": str(e),
+                "clips": [],
+                "assembled": None,
+                "subtitles": None,
+                "method_used": detection_method,
+            }
     
     def create_clip_with_animated_subtitles(
         self,
@@ -822,6 +1690,7 @@ class VideoProcessor:
         font_color: str = "white",
         stroke_color: str = "black",
         stroke_width: int = 2,
+        keyframe_times: Optional[List[float]] = None,
     ) -> str:
         """Crée un clip avec sous-titres animés.
         
@@ -832,18 +1701,17 @@ class VideoProcessor:
             output_name: Nom du fichier de sortie
             format_type: Type de format
             zoom_mode: Mode de zoom
-            subtitles_list: Liste des sous-titres
+            subtitles_list: Liste des sous-titres (timestamps relatifs au clip)
             subtitle_animation: Type d'animation (fade, slide_up, slide_down, scale, typewriter, bounce)
             font_size: Taille de police
             font_color: Couleur du texte
             stroke_color: Couleur du contour
             stroke_width: Épaisseur du contour
+            keyframe_times: Temps (relatifs au clip) où forcer une image clé
             
         Returns:
             Chemin du fichier créé
         """
-        from moviepy.video.io.VideoFileClip import VideoFileClip
-        from moviepy.video.VideoClip import ColorClip
         from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
         from video_effects import AnimatedSubtitleGenerator, SubtitleAnimation
         
@@ -854,77 +1722,35 @@ class VideoProcessor:
         
         output_path = self.output_dir / output_name
         
-        # Charger et traiter la vidéo
-        clip = VideoFileClip(str(video_path))
-        subclip = clip.subclipped(start_time, end_time)
-        
-        # Redimensionner
+        # Charger le segment redimensionné au décodage
         format_info = self.FORMATS.get(format_type, self.FORMATS["tiktok"])
         target_width = format_info["width"]
         target_height = format_info["height"]
         
-        video_ratio = subclip.w / subclip.h
-        target_ratio = target_width / target_height
-        
-        if zoom_mode == "fit":
-            if video_ratio > target_ratio:
-                new_width = target_width
-                new_height = int(target_width / video_ratio)
-            else:
-                new_height = target_height
-                new_width = int(target_height * video_ratio)
-            
-            resized = subclip.resized(new_size=(new_width, new_height))
-            x_center = (target_width - new_width) // 2
-            y_center = (target_height - new_height) // 2
-            
-            # Créer un fond noir
-            bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0))
-            bg = bg.with_duration(resized.duration)
-            
-            # Combiner
-            final = CompositeVideoClip([bg, resized.with_position((x_center, y_center))])
-            final = final.with_duration(resized.duration)
-        elif zoom_mode == "fill":
-            if video_ratio > target_ratio:
-                new_height = target_height
-                new_width = int(target_height * video_ratio)
-                resized = subclip.resized(new_size=(new_width, new_height))
-                x_center = (new_width - target_width) // 2
-                final = resized.cropped(
-                    x1=x_center, y1=0,
-                    x2=x_center + target_width, y2=target_height,
-                )
-            else:
-                new_width = target_width
-                new_height = int(target_width / video_ratio)
-                resized = subclip.resized(new_size=(new_width, new_height))
-                y_center = (new_height - target_height) // 2
-                final = resized.cropped(
-                    x1=0, y1=y_center,
-                    x2=target_width, y2=y_center + target_height,
+        segment = self._open_reframed_segment(
+            video_path,
+            start_time,
+            end_time,
+            target_width,
+            target_height,
+            zoom_mode,
+        )
+        final = segment.clip
+        tmp_path = self._temp_output_path(output_path)
+        try:
+            # Ajouter sous-titres animés
+            if subtitles_list:
+                animation_config = SubtitleAnimation(
+                    type=subtitle_animation,  # type: ignore
+                    duration=0.3,
                 )
-        else:
-            final = subclip.on_color(
-                size=(target_width, target_height),
-                color=(0, 0, 0),
-                pos=("center", "center"),
-            )
-        
-        # Ajouter sous-titres animés
-        if subtitles_list:
-            animation_config = SubtitleAnimation(
-                type=subtitle_animation,  # type: ignore
-                duration=0.3,
-            )
-            
-            txt_clips = []
-            for sub in subtitles_list:
-                if sub["start"] >= start_time and sub["end"] <= end_time:
+                
+                txt_clips = []
+                for sub in self.segment_subtitles(subtitles_list, 0.0, end_time - start_time):
                     txt_clip = AnimatedSubtitleGenerator.create_animated_subtitle(
                         text=sub["text"],
-                        start_time=sub["start"] - start_time,
-                        end_time=sub["end"] - start_time,
+                        start_time=sub["start"],
+                        end_time=sub["end"],
                         video_width=target_width,
                         video_height=target_height,
                         animation=animation_config,
@@ -934,24 +1760,28 @@ class VideoProcessor:
                         stroke_width=stroke_width,
                     )
                     txt_clips.append(txt_clip)
+                
+                if txt_clips:
+                    final = CompositeVideoClip([final] + txt_clips)
             
-            if txt_clips:
-                final = CompositeVideoClip([final] + txt_clips)
-        
-        # Exporter
-        final.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
-            fps=30,
-            preset="medium",
-            threads=4,
-        )
-        
-        # Nettoyer
-        clip.close()
-        subclip.close()
-        final.close()
+            # Exporter (fichier temporaire puis renommage)
+            final.write_videofile(
+                str(tmp_path),
+                codec="libx264",
+                audio_codec="aac",
+                fps=self.EXPORT_FPS,
+                preset=self.EXPORT_PRESET,
+                threads=4,
+                ffmpeg_params=self._export_params(keyframe_times),
+                logger=self._render_logger(),
+            )
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+            
+            # Nettoyer
+            segment.close()
+            final.close()
         
         return str(output_path)
     
@@ -962,31 +1792,30 @@ class VideoProcessor:
         transition_type: str = "fade",
         transition_duration: float = 0.5,
         format_type: str = "tiktok",
+        smart_render: bool = True,
     ) -> str:
         """Concatène plusieurs clips avec des transitions.
         
         Args:
             video_paths: Liste des chemins des vidéos à concaténer
             output_name: Nom du fichier de sortie
-            transition_type: Type de transition (fade, slide_left, slide_right, slide_up, slide_down, crossfade)
+            transition_type: Type de transition (fade, crossfade, slide_*, zoom_in, zoom_out, wipe_left, wipe_right)
             transition_duration: Durée de la transition en secondes
             format_type: Type de format
+            smart_render: Réencoder seulement les transitions quand les clips le permettent
             
         Returns:
             Chemin du fichier créé
         """
         from moviepy.video.io.VideoFileClip import VideoFileClip
-        from moviepy import concatenate_videoclips
-        from video_effects import VideoEffects, TransitionType
+        from video_effects import TimelineCompositor, TransitionType
+        from video_reader import probe_streams
         
         if not video_paths:
             raise ValueError("La liste des vidéos est vide")
         
         output_path = self.output_dir / output_name
         
-        # Charger tous les clips
-        clips = [VideoFileClip(str(path)) for path in video_paths]
-        
         # Appliquer les transitions
         transition_map = {
             "fade": TransitionType.FADE,
@@ -995,51 +1824,292 @@ class VideoProcessor:
             "slide_up": TransitionType.SLIDE_UP,
             "slide_down": TransitionType.SLIDE_DOWN,
             "crossfade": TransitionType.CROSSFADE,
+            "zoom_in": TransitionType.ZOOM_IN,
+            "zoom_out": TransitionType.ZOOM_OUT,
+            "wipe_left": TransitionType.WIPE_LEFT,
+            "wipe_right": TransitionType.WIPE_RIGHT,
         }
         
         trans_type = transition_map.get(transition_type, TransitionType.FADE)
         
+        # Assemblage rapide : corps des clips copiés, transitions seules réencodées
+        if smart_render and len(video_paths) > 1:
+            try:
+                smart_path = self.concatenate_clips_smart(
+                    video_paths,
+                    output_path,
+                    trans_type,
+                    transition_duration,
+                    format_type,
+                )
+                if smart_path:
+                    return smart_path
+            except Exception as e:
+                print(f"Assemblage rapide impossible, rendu complet: {e}")
+        
+        # Charger tous les clips : une sonde par entrée, seuls les clips qui ne
+        # sont pas déjà au format sont redimensionnés (par ffmpeg, au décodage)
+        format_info = self.FORMATS.get(format_type, self.FORMATS["tiktok"])
+        target_size = (format_info["width"], format_info["height"])
+        clips = []
+        for path in video_paths:
+            video = probe_streams(str(path))["video"]
+            if video and (video["width"], video["height"]) == target_size:
+                clips.append(VideoFileClip(str(path)))
+            else:
+                clips.append(VideoFileClip(str(path), target_resolution=(target_size[1], target_size[0])))
+        
         if len(clips) == 1:
             # Un seul clip, pas besoin de transition
             final = clips[0]
         else:
-            # Appliquer les transitions entre chaque clip
-            result_clips = [clips[0]]
-            
-            for i in range(1, len(clips)):
-                # Combiner avec transition
-                combined = VideoEffects.create_transition(
-                    result_clips[-1],
-                    clips[i],
-                    trans_type,
-                    transition_duration,
-                )
-                result_clips[-1] = combined
+            # Tous les clips sur une seule timeline (pas d'imbrication par paires)
+            final = TimelineCompositor(clips, trans_type, transition_duration).to_clip()
+        
+        # Exporter (fichier temporaire puis renommage)
+        tmp_path = self._temp_output_path(output_path)
+        try:
+            final.write_videofile(
+                str(tmp_path),
+                codec="libx264",
+                audio_codec="aac",
+                fps=self.EXPORT_FPS,
+                preset=self.EXPORT_PRESET,
+                threads=4,
+                logger=self._render_logger(),
+            )
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
             
-            final = result_clips[-1]
+            # Nettoyer
+            for clip in clips:
+                clip.close()
+            final.close()
         
-        # Redimensionner au format cible
+        return str(output_path)
+    
+    def concatenate_clips_smart(
+        self,
+        video_paths: List[str],
+        output_path,
+        transition_type,
+        transition_duration: float = 0.5,
+        format_type: str = "tiktok",
+    ) -> Optional[str]:
+        """Assemble des clips en ne réencodant que les fenêtres de transition.
+        
+        Le corps de chaque clip (entre deux images clés qui encadrent ses
+        transitions) est copié sans réencodage ; seules les fenêtres de
+        transition sont encodées avec les réglages d'export, puis le tout est
+        joint par le démultiplexeur concat de ffmpeg. L'audio est recalculé en
+        une passe (acrossfade), ce qui est négligeable face à la vidéo.
+        
+        Les clips doivent avoir été exportés avec les réglages communs (H.264
+        au profil et au niveau `EXPORT_PROFILE`/`EXPORT_LEVEL`, taille du
+        format, format de pixel et cadence d'export) : les transitions sont
+        encodées avec ces mêmes réglages pour que leurs en-têtes de flux
+        restent compatibles avec les corps copiés. Le niveau n'est vérifié que
+        si la sonde le rapporte (ffprobe) ; sans ffprobe, le profil suffit.
+        `create_clip` force les images clés aux bornes des transitions via
+        `keyframe_times`.
+        
+        Args:
+            video_paths: Liste des chemins des clips
+            output_path: Chemin de sortie
+            transition_type: TransitionType à appliquer
+            transition_duration: Durée de la transition en secondes
+            format_type: Type de format
+            
+        Returns:
+            Chemin du fichier créé, ou None si les clips ne s'y prêtent pas
+        """
+        import shutil
+        import tempfile
+        from concurrent.futures import wait
+        from ffmpeg_executor import get_executor
+        from video_effects import TransitionType, XFADE_TRANSITIONS
+        from video_reader import get_ffmpeg_binary, probe_streams, _parse_rate
+        
+        is_fade = transition_type == TransitionType.FADE
+        xfade = XFADE_TRANSITIONS.get(transition_type)
+        if not is_fade and xfade is None:
+            return None
+        
+        # Vérifier que les clips sont compatibles entre eux et avec le format
         format_info = self.FORMATS.get(format_type, self.FORMATS["tiktok"])
-        final_resized = final.resized(new_size=(format_info["width"], format_info["height"]))
-        
-        # Exporter
-        final_resized.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
-            fps=30,
-            preset="medium",
-            threads=4,
-        )
+        probes = [probe_streams(path) for path in video_paths]
+        reference = probes[0]["video"]
+        if reference is None or (reference["width"], reference["height"]) != (format_info["width"], format_info["height"]):
+            return None
+        compared = ("codec_name", "profile", "level", "width", "height", "pix_fmt", "r_frame_rate")
+        for probe in probes:
+            video = probe["video"]
+            if video is None or any(video.get(k) != reference.get(k) for k in compared):
+                return None
+        if reference["codec_name"] != "h264" or reference.get("pix_fmt") != self.EXPORT_PIXEL_FORMAT:
+            return None
+        rate = _parse_rate(reference.get("r_frame_rate"))
+        if rate is None or abs(rate - self.EXPORT_FPS) > 1e-3:
+            return None
+        # Profil et niveau fixés à l'export (niveau absent de la sonde ffmpeg)
+        if self.X264_PROFILES.get(reference.get("profile")) != self.EXPORT_PROFILE:
+            return None
+        level = reference.get("level")
+        if level is not None and level != round(float(self.EXPORT_LEVEL) * 10):
+            return None
+        has_audio = [probe["has_audio"] for probe in probes]
+        if any(has_audio) and not all(has_audio):
+            return None
+        
+        durations = [probe["duration"] for probe in probes]
+        transition_duration = min(transition_duration, min(durations) / 2)
+        
+        # Bornes des corps copiés : première image clé après la transition
+        # d'entrée, dernière image clé avant la transition de sortie
+        bodies = []
+        for i, path in enumerate(video_paths):
+            keyframes = self.get_keyframe_index(path)
+            if i == 0:
+                body_start = 0.0
+            else:
+                body_start = keyframes.following(transition_duration)
+                if body_start is None:
+                    return None
+            if i == len(video_paths) - 1:
+                body_end = durations[i]
+            else:
+                body_end = keyframes.preceding(durations[i] - transition_duration)
+                if body_end is None:
+                    return None
+            if body_end < body_start:
+                return None
+            bodies.append((body_start, body_end))
+        
+        ffmpeg = get_ffmpeg_binary()
+        fps = str(self.EXPORT_FPS)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix=".assemble_", dir=self.output_dir))
         
-        # Nettoyer
-        for clip in clips:
-            clip.close()
-        final.close()
-        final_resized.close()
+        try:
+            segments = []
+            commands = []  # Indépendantes : exécutées en parallèle
+            for i, path in enumerate(video_paths):
+                body_start, body_end = bodies[i]
+                
+                # Corps du clip : copie du flux vidéo
+                if body_end - body_start > 1e-3:
+                    body_path = work_dir / f"body_{i:03d}.mp4"
+                    commands.append([
+                        ffmpeg, "-y", "-loglevel", "error", "-nostdin",
+                        "-ss", f"{body_start:.6f}",
+                        "-i", str(path),
+                        "-t", f"{body_end - body_start:.6f}",
+                        "-map", "0:v:0", "-c", "copy",
+                        "-avoid_negative_ts", "make_zero",
+                        str(body_path),
+                    ])
+                    segments.append(body_path)
+                
+                if i == len(video_paths) - 1:
+                    break
+                
+                # Fenêtre de transition : fin du clip i + début du clip i+1
+                tail_length = durations[i] - body_end
+                head_length = bodies[i + 1][0]
+                if is_fade:
+                    graph = (
+                        f"[0:v]fade=t=out:st={tail_length - transition_duration:.6f}:d={transition_duration:.6f}[a];"
+                        f"[1:v]fade=t=in:st=0:d={transition_duration:.6f}[b];"
+                        f"[a][b]concat=n=2:v=1:a=0,format={self.EXPORT_PIXEL_FORMAT}[v]"
+                    )
+                else:
+                    graph = (
+                        f"[0:v]settb=AVTB,fps={fps}[a];"
+                        f"[1:v]settb=AVTB,fps={fps}[b];"
+                        f"[a][b]xfade=transition={xfade}:duration={transition_duration:.6f}"
+                        f":offset={tail_length - transition_duration:.6f},format={self.EXPORT_PIXEL_FORMAT}[v]"
+                    )
+                window_path = work_dir / f"transition_{i:03d}.mp4"
+                commands.append([
+                    ffmpeg, "-y", "-loglevel", "error", "-nostdin",
+                    "-ss", f"{body_end:.6f}", "-i", str(path),
+                    "-t", f"{head_length:.6f}", "-i", str(video_paths[i + 1]),
+                    "-filter_complex", graph,
+                    "-map", "[v]", "-an",
+                    "-c:v", "libx264",
+                    "-preset", self.EXPORT_PRESET,
+                    "-pix_fmt", self.EXPORT_PIXEL_FORMAT,
+                    *self._export_params(),
+                    "-r", fps,
+                    str(window_path),
+                ])
+                segments.append(window_path)
+            
+            executor = get_executor()
+            futures = [executor.submit(executor.run(command)) for command in commands]
+            wait(futures)  # Toutes terminées avant un éventuel nettoyage de work_dir
+            for future in futures:
+                future.result()
+            
+            # Liste pour le démultiplexeur concat
+            list_path = work_dir / "segments.txt"
+            with open(list_path, "w", encoding="utf-8") as f:
+                for segment in segments:
+                    escaped = str(segment.resolve()).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            
+            cmd = [
+                ffmpeg, "-y", "-loglevel", "error", "-nostdin",
+                "-f", "concat", "-safe", "0", "-i", str(list_path),
+            ]
+            if all(has_audio):
+                for path in video_paths:
+                    cmd += ["-i", str(path)]
+                cmd += ["-filter_complex", self._audio_join_graph(durations, transition_duration, is_fade)]
+                cmd += ["-map", "0:v", "-map", "[aout]", "-c:a", "aac", "-b:a", "192k"]
+            else:
+                cmd += ["-map", "0:v"]
+            assembled_path = work_dir / "assembled.mp4"
+            cmd += ["-c:v", "copy", "-movflags", "+faststart", str(assembled_path)]
+            executor.run_sync(cmd)
+            os.replace(assembled_path, output_path)
+            
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
         
         return str(output_path)
     
+    @staticmethod
+    def _audio_join_graph(durations: List[float], transition_duration: float, is_fade: bool) -> str:
+        """Graphe ffmpeg joignant les pistes audio des clips (entrées 1..n).
+        
+        Fondu enchaîné (acrossfade) pour les transitions avec chevauchement,
+        fondu de sortie/entrée (afade) puis concaténation pour le fondu au noir.
+        """
+        count = len(durations)
+        d = transition_duration
+        if is_fade or d <= 0:
+            graph = []
+            for i, duration in enumerate(durations):
+                fades = []
+                if d > 0 and i > 0:
+                    fades.append(f"afade=t=in:st=0:d={d:.6f}")
+                if d > 0 and i < count - 1:
+                    fades.append(f"afade=t=out:st={duration - d:.6f}:d={d:.6f}")
+                graph.append(f"[{i + 1}:a]{','.join(fades) or 'anull'}[af{i}]")
+            inputs = "".join(f"[af{i}]" for i in range(count))
+            graph.append(f"{inputs}concat=n={count}:v=0:a=1[aout]")
+            return ";".join(graph)
+        
+        graph = []
+        previous = "[1:a]"
+        for i in range(1, count):
+            label = "[aout]" if i == count - 1 else f"[ax{i}]"
+            graph.append(f"{previous}[{i + 1}:a]acrossfade=d={d:.6f}:c1=qsin:c2=qsin{label}")
+            previous = label
+        return ";".join(graph)
+    
     def create_preview(
         self,
         video_path: str,
@@ -1048,8 +2118,19 @@ class VideoProcessor:
         output_name: Optional[str] = None,
         quality: str = "low",
         max_duration: float = 10.0,
+        format_type: str = "tiktok",
+        zoom_mode: str = "fit",
+        subtitles_list: Optional[List[dict]] = None,
+        subtitle_font: str = "Impact",
+        subtitle_position: str = "bottom_margin",
+        subtitle_size: int = 50,
+        subtitle_color: str = "white",
     ) -> str:
-        """Crée une prévisualisation basse qualité.
+        """Crée une prévisualisation basse qualité fidèle à l'export.
+        
+        Le rendu passe par le même pipeline que l'export (recadrage selon
+        `zoom_mode` puis gravure des sous-titres), avec un facteur d'échelle
+        appliqué à toutes les dimensions et un encodage ultrafast.
         
         Args:
             video_path: Chemin vers la vidéo
@@ -1058,55 +2139,191 @@ class VideoProcessor:
             output_name: Nom du fichier de sortie
             quality: Qualité (low, medium)
             max_duration: Durée max de la prévisualisation
+            format_type: Type de format
+            zoom_mode: Mode de zoom (fit, fill, center)
+            subtitles_list: Sous-titres (timestamps de la vidéo source)
+            subtitle_font: Police des sous-titres
+            subtitle_position: Position des sous-titres
+            subtitle_size: Taille des sous-titres (à l'échelle de l'export)
+            subtitle_color: Couleur des sous-titres
             
         Returns:
             Chemin du fichier de prévisualisation
         """
-        from moviepy.video.io.VideoFileClip import VideoFileClip
-        
-        if not output_name:
-            output_name = f"preview_{int(start_time)}-{int(end_time)}.mp4"
-        
-        output_path = self.output_dir / output_name
-        
-        clip = VideoFileClip(str(video_path))
-        
-        # Extraire le segment
-        duration = min(end_time - start_time, max_duration)
-        preview = clip.subclipped(start_time, start_time + duration)
+        from moviepy import CompositeVideoClip
+        from analysis_cache import cache_key, evict_lru
         
         # Paramètres selon la qualité
         if quality == "low":
             fps = 15
-            resolution = (360, 640)
+            preview_height = 640
             bitrate = "500k"
-            preset = "ultrafast"
         else:
             fps = 24
-            resolution = (540, 960)
+            preview_height = 960
             bitrate = "1000k"
-            preset = "superfast"
         
-        # Redimensionner
-        preview_resized = preview.resized(new_size=resolution)
+        duration = min(end_time - start_time, max_duration)
+        
+        # Sous-titres retenus par l'export du segment complet (ceux qui
+        # dépassent la prévisualisation sont coupés à sa durée)
+        segment_subs = self.segment_subtitles(subtitles_list, start_time, end_time)
+        
+        if output_name:
+            output_path = self.output_dir / output_name
+        else:
+            # Adressage par contenu : mêmes réglages -> même fichier
+            key = cache_key(
+                "preview",
+                self.cache.fingerprint(video_path),
+                round(start_time, 3),
+                round(duration, 3),
+                quality,
+                format_type,
+                zoom_mode,
+                segment_subs,
+                subtitle_font,
+                subtitle_position,
+                subtitle_size,
+                subtitle_color,
+            )
+            output_path = self.cache.shared_dir("previews") / f"{key}.mp4"
+            if output_path.exists():
+                os.utime(output_path)  # Marque l'accès pour l'éviction LRU
+                return str(output_path)
         
-        # Exporter
-        preview_resized.write_videofile(
-            str(output_path),
-            codec="libx264",
-            audio_codec="aac",
+        # Facteur d'échelle appliqué à toute la géométrie de l'export
+        format_info = self.FORMATS.get(format_type, self.FORMATS["tiktok"])
+        scale = preview_height / format_info["height"]
+        target_width = max(2, int(round(format_info["width"] * scale / 2)) * 2)
+        target_height = preview_height
+        
+        # Le proxy suffit pour une prévisualisation basse qualité
+        segment = self._open_reframed_segment(
+            video_path,
+            start_time,
+            start_time + duration,
+            target_width,
+            target_height,
+            zoom_mode,
             fps=fps,
-            bitrate=bitrate,
-            preset=preset,
-            threads=4,
+            scale=scale,
+            use_proxy=True,
         )
+        preview = segment.clip
+        tmp_path = self._temp_output_path(output_path)
+        try:
+            # Sous-titres gravés, mis à l'échelle
+            if segment_subs:
+                txt_clips = self._make_subtitle_clips(
+                    segment_subs,
+                    video_width=target_width,
+                    duration=preview.duration,
+                    font_size=max(8, int(round(subtitle_size * scale))),
+                    font=subtitle_font,
+                    position=subtitle_position,
+                    color=subtitle_color,
+                    stroke_width=max(1, int(round(3 * scale))),
+                )
+                if txt_clips:
+                    preview = CompositeVideoClip([preview] + txt_clips)
+            
+            # Exporter dans un fichier temporaire puis renommer (sessions concurrentes)
+            preview.write_videofile(
+                str(tmp_path),
+                codec="libx264",
+                audio_codec="aac",
+                fps=fps,
+                bitrate=bitrate,
+                preset="ultrafast",
+                threads=4,
+                logger=self._render_logger(),
+            )
+            os.replace(tmp_path, output_path)
+        finally:
+            segment.close()
+            preview.close()
+            tmp_path.unlink(missing_ok=True)
         
-        clip.close()
-        preview.close()
-        preview_resized.close()
+        if not output_name:
+            evict_lru(output_path.parent, self.PREVIEW_CACHE_BUDGET, "[!.]*.mp4")
         
         return str(output_path)
     
+    def _make_subtitle_clips(
+        self,
+        subtitles: List[Dict],
+        video_width: int,
+        duration: float,
+        font_size: int = 50,
+        font: str = "Impact",
+        position: str = "bottom_margin",
+        color: str = "white",
+        stroke_color: str = "black",
+        stroke_width: int = 3,
+        verbose: bool = False,
+    ) -> list:
+        """Crée les clips de texte des sous-titres gravés.
+        
+        Args:
+            subtitles: Liste de dicts avec 'start', 'end', 'text' (relatifs au clip)
+            video_width: Largeur de la vidéo
+            duration: Durée de la vidéo
+            font_size: Taille de police
+            font: Nom de la police
+            position: Position des sous-titres
+            color: Couleur du texte
+            stroke_color: Couleur du contour
+            stroke_width: Épaisseur du contour
+            verbose: Afficher le détail des premiers sous-titres
+            
+        Returns:
+            Liste de TextClip positionnés dans le temps
+        """
+        from moviepy import TextClip
+        from subtitle_config import get_position_coordinates
+        
+        # Obtenir les coordonnées de position
+        pos = get_position_coordinates(position)
+        
+        txt_clips = []
+        for i, sub in enumerate(subtitles):
+            try:
+                # Vérifier que les timestamps sont valides
+                start = max(0, sub["start"])
+                end = min(duration, sub["end"])
+                sub_duration = end - start
+                
+                if sub_duration <= 0:
+                    continue
+                
+                # Créer le texte avec la police choisie
+                txt = TextClip(
+                    text=sub["text"],
+                    font=font,
+                    font_size=font_size,
+                    color=color,
+                    stroke_color=stroke_color,
+                    stroke_width=stroke_width,
+                    text_align="center",
+                    size=(int(video_width * 0.95), None),
+                    method="caption",
+                )
+                
+                # Timer et positionner
+                txt = txt.with_start(start).with_duration(sub_duration)
+                txt = txt.with_position(pos)
+                
+                txt_clips.append(txt)
+                if verbose and i < 3:  # Log seulement les 3 premiers pour ne pas spammer
+                    print(f"  Sous-titre {i+1}: [{start:.1f}s - {end:.1f}s] {sub['text'][:40]}...")
+                
+            except Exception as e:
+                print(f"  Erreur sous-titre {i+1}: {e}")
+                continue
+        
+        return txt_clips
+    
     def burn_subtitles_to_clip(
         self,
         video_path: str,
@@ -1118,6 +2335,8 @@ class VideoProcessor:
         color: str = "white",
         stroke_color: str = "black",
         stroke_width: int = 3,
+        keyframe_times: Optional[List[float]] = None,
+        target_size_mb: Optional[float] = None,
     ) -> bool:
         """Ajoute les sous-titres à une vidéo existante (gravure permanente).
         
@@ -1133,13 +2352,14 @@ class VideoProcessor:
             color: Couleur du texte
             stroke_color: Couleur du contour
             stroke_width: Épaisseur du contour
+            keyframe_times: Temps où forcer une image clé (assemblage rapide)
+            target_size_mb: Taille maximale du fichier en Mo
             
         Returns:
             True si succès, False sinon
         """
         try:
-            from moviepy import VideoFileClip, TextClip, CompositeVideoClip
-            from subtitle_config import get_position_coordinates
+            from moviepy import VideoFileClip, CompositeVideoClip
             
             print(f"Ajout des sous-titres à {video_path}...")
             print(f"Nombre de sous-titres: {len(subtitles)}")
@@ -1148,45 +2368,19 @@ class VideoProcessor:
             # Charger la vidéo
             video = VideoFileClip(video_path)
             
-            # Obtenir les coordonnées de position
-            pos = get_position_coordinates(position)
-            
             # Créer les clips de texte
-            txt_clips = []
-            for i, sub in enumerate(subtitles):
-                try:
-                    # Vérifier que les timestamps sont valides
-                    start = max(0, sub["start"])
-                    end = min(video.duration, sub["end"])
-                    duration = end - start
-                    
-                    if duration <= 0:
-                        continue
-                    
-                    # Créer le texte avec la police choisie
-                    txt = TextClip(
-                        text=sub["text"],
-                        font=font,
-                        font_size=font_size,
-                        color=color,
-                        stroke_color=stroke_color,
-                        stroke_width=stroke_width,
-                        text_align="center",
-                        size=(int(video.w * 0.95), None),
-                        method="caption",
-                    )
-                    
-                    # Timer et positionner
-                    txt = txt.with_start(start).with_duration(duration)
-                    txt = txt.with_position(pos)
-                    
-                    txt_clips.append(txt)
-                    if i < 3:  # Log seulement les 3 premiers pour ne pas spammer
-                        print(f"  Sous-titre {i+1}: [{start:.1f}s - {end:.1f}s] {sub['text'][:40]}...")
-                    
-                except Exception as e:
-                    print(f"  Erreur sous-titre {i+1}: {e}")
-                    continue
+            txt_clips = self._make_subtitle_clips(
+                subtitles,
+                video_width=video.w,
+                duration=video.duration,
+                font_size=font_size,
+                font=font,
+                position=position,
+                color=color,
+                stroke_color=stroke_color,
+                stroke_width=stroke_width,
+                verbose=True,
+            )
             
             # Combiner avec la vidéo
             if txt_clips:
@@ -1196,14 +2390,13 @@ class VideoProcessor:
                 print("Aucun sous-titre à ajouter")
                 final = video
             
-            # Exporter
-            final.write_videofile(
-                str(output_path),
-                codec="libx264",
-                audio_codec="aac",
-                fps=30,
-                preset="medium",
-                threads=4,
+            # Exporter (fichier temporaire puis renommage), complexité
+            # mesurée sur le clip lui-même
+            size_profile, complexity = self._size_profile(
+                video_path, 0.0, video.duration, video.w, video.h, "fit", target_size_mb,
+            )
+            self._write_export(
+                final, output_path, keyframe_times, size_profile, complexity, threads=4,
             )
             
             # Nettoyer
@@ -0,0 +1,901 @@
+"""Lecture de frames via ffmpeg, redimensionnées et recadrées au décodage."""
+
+import bisect
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def get_ffmpeg_binary() -> str:
+    """Retourne l'exécutable ffmpeg à utiliser."""
+    binary = os.environ.get("FFMPEG_BINARY")
+    if binary and binary != "ffmpeg-imageio":
+        return binary
+    found = shutil.which("ffmpeg")
+    if found:
+        return found
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+
+
+def get_ffprobe_binary() -> Optional[str]:
+    """Retourne l'exécutable ffprobe à utiliser (à côté de ffmpeg si possible).
+    
+    Returns:
+        Chemin de ffprobe, ou None s'il est introuvable (le binaire
+        d'imageio-ffmpeg installé avec moviepy n'en fournit pas) : les sondes
+        passent alors par ffmpeg (`_ffmpeg_describe`, `_ffmpeg_keyframes`)
+    """
+    binary = os.environ.get("FFPROBE_BINARY")
+    if binary:
+        return binary
+    found = shutil.which("ffprobe")
+    if found:
+        return found
+    ffmpeg = get_ffmpeg_binary()
+    candidate = os.path.join(os.path.dirname(ffmpeg), os.path.basename(ffmpeg).replace("ffmpeg", "ffprobe"))
+    return candidate if candidate != ffmpeg and os.path.isfile(candidate) else None
+
+
+# Nombre de canaux des dispositions affichées par ffmpeg
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "6.1": 7, "7.1": 8}
+
+
+def _ffmpeg_rate(value: str) -> str:
+    """Cadence affichée par ffmpeg ("29.97", "30", "30k") au format ffprobe ("30000/1001")."""
+    from fractions import Fraction
+    
+    scale = 1000 if value.endswith("k") else 1
+    rate = Fraction(value.rstrip("k")) * scale
+    # Cadences NTSC affichées arrondies (29.97, 59.94, 23.98)
+    ntsc = round(rate * Fraction(1001, 1000))
+    if rate.denominator != 1 and abs(Fraction(ntsc * 1000, 1001) - rate) < Fraction(1, 100):
+        return f"{ntsc * 1000}/1001"
+    rate = rate.limit_denominator(1001)
+    return f"{rate.numerator}/{rate.denominator}"
+
+
+def _ffmpeg_describe(path: str) -> dict:
+    """Décrit les flux d'une vidéo à partir de l'en-tête affiché par `ffmpeg -i`.
+    
+    Repli quand ffprobe est absent : le résultat reprend la structure JSON
+    d'ffprobe (`streams`, `format`) pour les champs utilisés ici.
+    
+    Raises:
+        ValueError: ffmpeg ne reconnaît pas le fichier
+    """
+    import re
+    from ffmpeg_executor import LANE_PROBE, run_ffmpeg
+    
+    # Sans fichier de sortie, ffmpeg affiche l'entrée puis termine en erreur
+    cmd = [get_ffmpeg_binary(), "-hide_banner", "-nostdin", "-i", str(path)]
+    try:
+        header = run_ffmpeg(cmd, lane=LANE_PROBE).decode("utf-8", "replace")
+    except subprocess.CalledProcessError as e:
+        header = (e.stderr or b"").decode("utf-8", "replace")
+    if "Input #0" not in header:
+        raise ValueError(f"Fichier illisible par ffmpeg: {path}: {header.strip()[-200:]}")
+    
+    fmt = {}
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", header)
+    if match:
+        hours, minutes, seconds = match.groups()
+        fmt["duration"] = str(int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+    match = re.search(r"Duration: .*?bitrate: (\d+) kb/s", header)
+    if match:
+        fmt["bit_rate"] = str(int(match.group(1)) * 1000)
+    
+    streams = []
+    lines = header.splitlines()
+    for n, line in enumerate(lines):
+        match = re.match(r"\s*Stream #0:(\d+)\S*: (Video|Audio): (\w+)(.*)", line)
+        if not match:
+            continue
+        index, kind, codec, rest = match.groups()
+        stream = {"index": int(index), "codec_type": kind.lower(), "codec_name": codec}
+        
+        # Profil : première parenthèse après le codec ("(High)", pas "(avc1 / 0x...)")
+        head = rest.split(",")[0]
+        profiles = [p for p in re.findall(r"\(([^()]*)\)", head) if "/" not in p]
+        if profiles:
+            stream["profile"] = profiles[0]
+        
+        # Champs séparés par des virgules, hors parenthèses ("yuv420p(tv, bt709)")
+        flat = rest
+        while re.search(r"\([^()]*\)", flat):
+            flat = re.sub(r"\([^()]*\)", "", flat)
+        fields = [f.strip() for f in flat.split(",")[1:]]
+        
+        if kind == "Video":
+            if fields and re.fullmatch(r"[a-z0-9_]+", fields[0]):
+                stream["pix_fmt"] = fields[0]
+            for field in fields:
+                size = re.match(r"(\d+)x(\d+)", field)
+                if size and "width" not in stream:
+                    stream["width"], stream["height"] = int(size.group(1)), int(size.group(2))
+                elif field.endswith(" kb/s") and field[:-5].isdigit():
+                    stream["bit_rate"] = str(int(field[:-5]) * 1000)
+                elif field.endswith(" fps"):
+                    stream["avg_frame_rate"] = _ffmpeg_rate(field[:-4])
+                elif field.endswith(" tbr"):
+                    stream["r_frame_rate"] = _ffmpeg_rate(field[:-4])
+            
+            # Rotation : métadonnée "rotate" ou matrice d'affichage, sous la ligne du flux
+            for detail in lines[n + 1:]:
+                if re.match(r"\s*Stream #|\S", detail):
+                    break
+                rotate = re.match(r"\s*rotate\s*:\s*(-?\d+)", detail)
+                if rotate:
+                    stream["tags"] = {"rotate": rotate.group(1)}
+                matrix = re.search(r"rotation of (-?\d+(?:\.\d+)?) degrees", detail)
+                if matrix:
+                    stream["side_data_list"] = [{"rotation": float(matrix.group(1))}]
+        else:
+            for field in fields:
+                if field.endswith(" Hz"):
+                    stream["sample_rate"] = field[:-3]
+                elif field in _CHANNEL_LAYOUTS:
+                    stream["channels"] = _CHANNEL_LAYOUTS[field]
+                elif field.endswith(" channels") and field.split()[0].isdigit():
+                    stream["channels"] = int(field.split()[0])
+                elif field.endswith(" kb/s") and field[:-5].isdigit():
+                    stream["bit_rate"] = str(int(field[:-5]) * 1000)
+        streams.append(stream)
+    
+    return {"streams": streams, "format": fmt}
+
+
+def _ffmpeg_keyframes(path: str, window: Optional[float] = None) -> List[float]:
+    """Temps des images clés du premier flux vidéo, lus par ffmpeg sans décodage.
+    
+    Repli quand ffprobe est absent : les paquets sont copiés vers le format
+    `framecrc`, qui marque les paquets non clés par `F=0x...`.
+    
+    Args:
+        path: Chemin vers la vidéo
+        window: Ne lire que les `window` premières secondes
+    """
+    from fractions import Fraction
+    from ffmpeg_executor import LANE_PROBE, run_ffmpeg
+    
+    cmd = [get_ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if window is not None:
+        cmd += ["-t", f"{window:g}"]
+    cmd += ["-i", str(path), "-map", "0:v:0", "-c", "copy", "-copyts", "-f", "framecrc", "-"]
+    
+    time_base, keyframes = Fraction(1), []
+    for line in run_ffmpeg(cmd, lane=LANE_PROBE).decode("utf-8", "replace").splitlines():
+        if line.startswith("#tb 0:"):
+            time_base = Fraction(line.split(":", 1)[1].strip())
+            continue
+        parts = [p.strip() for p in line.split(",")]
+        if line.startswith("#") or len(parts) < 6 or not parts[2].lstrip("-").isdigit():
+            continue
+        # Drapeaux absents : paquet clé ; sinon bit 0 (AV_PKT_FLAG_KEY)
+        flags = next((int(p[2:], 16) for p in parts[6:] if p.startswith("F=")), 1)
+        if flags & 1 and int(parts[2]) > -(1 << 62):
+            keyframes.append(float(int(parts[2]) * time_base))
+    return sorted(keyframes)
+
+
+def probe_streams(path: str) -> dict:
+    """Lit les paramètres des flux d'une vidéo avec ffprobe.
+    
+    Args:
+        path: Chemin vers la vidéo
+        
+    Returns:
+        Dict avec 'video' (premier flux vidéo), 'has_audio' et 'duration'
+    """
+    from ffmpeg_executor import LANE_PROBE, run_ffmpeg
+    
+    ffprobe = get_ffprobe_binary()
+    if ffprobe is None:
+        data = _ffmpeg_describe(path)
+    else:
+        cmd = [
+            ffprobe, "-v", "error",
+            "-show_entries",
+            "stream=index,codec_type,codec_name,profile,level,width,height,pix_fmt,r_frame_rate:format=duration",
+            "-of", "json",
+            str(path),
+        ]
+        data = json.loads(run_ffmpeg(cmd, lane=LANE_PROBE))
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    return {
+        "video": video,
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+        "duration": float(data.get("format", {}).get("duration", 0.0)),
+    }
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """Convertit une cadence ffprobe ("30000/1001") en nombre (None si inconnue)."""
+    if not value:
+        return None
+    num, _, den = value.partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def _stream_rotation(stream: dict) -> int:
+    """Rotation d'affichage d'un flux vidéo, en degrés (0, 90, 180, 270)."""
+    rotation = stream.get("tags", {}).get("rotate")
+    for side_data in stream.get("side_data_list", []):
+        if "rotation" in side_data:
+            rotation = side_data["rotation"]
+    try:
+        return int(round(float(rotation or 0))) % 360
+    except ValueError:
+        return 0
+
+
+def probe_media(path: str, gop_window: float = 30.0) -> dict:
+    """Décrit une vidéo en un seul appel ffprobe (flux, format et premiers paquets).
+    
+    Sans ffprobe, la description vient de l'en-tête d'ffmpeg et des images
+    clés copiées sur la même fenêtre. L'intervalle entre images clés est estimé sur les paquets vidéo des
+    `gop_window` premières secondes, lus dans le même appel.
+    
+    Args:
+        path: Chemin vers la vidéo
+        gop_window: Durée lue pour estimer l'intervalle entre images clés
+    
+    Returns:
+        Dict avec duration, fps, width et height (tels qu'affichés, rotation
+        appliquée), aspect_ratio, rotation, video_codec, pix_fmt,
+        keyframe_interval, bit_rate, video_bit_rate, has_audio, audio_codec,
+        audio_sample_rate et audio_channels
+    """
+    from ffmpeg_executor import LANE_PROBE, run_ffmpeg
+    
+    ffprobe = get_ffprobe_binary()
+    if ffprobe is None:
+        data = _ffmpeg_describe(path)
+    else:
+        cmd = [
+            ffprobe, "-v", "error",
+            "-read_intervals", f"%+{gop_window:g}",
+            "-show_entries",
+            "stream=index,codec_type,codec_name,width,height,pix_fmt,avg_frame_rate,r_frame_rate,"
+            "bit_rate,sample_rate,channels:stream_tags=rotate:stream_side_data=rotation"
+            ":format=duration,bit_rate:packet=stream_index,pts_time,flags",
+            "-of", "json",
+            str(path),
+        ]
+        data = json.loads(run_ffmpeg(cmd, lane=LANE_PROBE))
+    streams = data.get("streams", [])
+    fmt = data.get("format", {})
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video is None:
+        raise ValueError(f"Aucun flux vidéo dans {path}")
+    
+    rotation = _stream_rotation(video)
+    width, height = int(video["width"]), int(video["height"])
+    if rotation in (90, 270):
+        width, height = height, width
+    
+    # Intervalle médian entre les images clés lues
+    if ffprobe is None:
+        keyframes = _ffmpeg_keyframes(path, gop_window)
+    else:
+        keyframes = sorted(
+            float(p["pts_time"])
+            for p in data.get("packets", [])
+            if p.get("stream_index") == video["index"] and "K" in p.get("flags", "")
+            and p.get("pts_time") not in (None, "N/A")
+        )
+    keyframe_interval = float(np.median(np.diff(keyframes))) if len(keyframes) > 1 else None
+    
+    def number(value, cast=float):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+    
+    return {
+        "duration": number(fmt.get("duration")) or 0.0,
+        "fps": _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")) or 30.0,
+        "width": width,
+        "height": height,
+        "aspect_ratio": width / height,
+        "rotation": rotation,
+        "video_codec": video.get("codec_name"),
+        "pix_fmt": video.get("pix_fmt"),
+        "keyframe_interval": keyframe_interval,
+        "bit_rate": number(fmt.get("bit_rate"), int),
+        "video_bit_rate": number(video.get("bit_rate"), int),
+        "has_audio": audio is not None,
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "audio_sample_rate": number(audio.get("sample_rate"), int) if audio else None,
+        "audio_channels": number(audio.get("channels"), int) if audio else None,
+    }
+
+
+def probe_keyframes(path: str) -> List[float]:
+    """Liste les temps des images clés du premier flux vidéo (lecture des paquets seuls)."""
+    from ffmpeg_executor import LANE_PROBE, run_ffmpeg
+    
+    ffprobe = get_ffprobe_binary()
+    if ffprobe is None:
+        return _ffmpeg_keyframes(path)
+    
+    cmd = [
+        ffprobe, "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        str(path),
+    ]
+    keyframes = []
+    for line in run_ffmpeg(cmd, lane=LANE_PROBE).decode("utf-8").splitlines():
+        parts = line.split(",")
+        if len(parts) >= 2 and "K" in parts[1] and parts[0] not in ("", "N/A"):
+            keyframes.append(float(parts[0]))
+    return sorted(keyframes)
+
+
+@dataclass
+class KeyframeIndex:
+    """Temps (triés) des images clés d'une vidéo.
+    
+    Sert à savoir d'où ffmpeg devra décoder pour atteindre un instant, et à
+    choisir des points de coupe compatibles avec une copie de flux.
+    """
+    times: List[float]
+    
+    # Tolérance sur les temps (arrondis des horodatages)
+    EPSILON = 1e-3
+    
+    def preceding(self, t: float) -> Optional[float]:
+        """Dernière image clé au plus tard à `t` (None s'il n'y en a pas)."""
+        i = bisect.bisect_right(self.times, t + self.EPSILON)
+        return self.times[i - 1] if i else None
+    
+    def following(self, t: float) -> Optional[float]:
+        """Première image clé au plus tôt à `t` (None s'il n'y en a pas)."""
+        i = bisect.bisect_left(self.times, t - self.EPSILON)
+        return self.times[i] if i < len(self.times) else None
+
+
+@dataclass
+class ReframeGeometry:
+    """Géométrie de recadrage d'une source vers le format cible.
+    
+    Les étapes s'appliquent dans l'ordre : redimensionnement, recadrage
+    (si la source déborde), puis bandes noires (si elle est plus petite).
+    """
+    target_width: int
+    target_height: int
+    scale: Optional[Tuple[int, int]] = None        # (largeur, hauteur)
+    crop: Optional[Tuple[int, int, int, int]] = None  # (x, y, largeur, hauteur)
+    pad: Optional[Tuple[int, int]] = None          # (x, y) dans le cadre cible
+    
+    def ffmpeg_filters(self) -> str:
+        """Chaîne de filtres ffmpeg équivalente (`-vf`)."""
+        filters = []
+        if self.scale:
+            filters.append(f"scale={self.scale[0]}:{self.scale[1]}:flags=bicubic")
+        if self.crop:
+            x, y, w, h = self.crop
+            filters.append(f"crop={w}:{h}:{x}:{y}")
+        if self.pad:
+            x, y = self.pad
+            filters.append(
+                f"pad={self.target_width}:{self.target_height}:{x}:{y}:black"
+            )
+        filters.append("setsar=1")
+        return ",".join(filters)
+
+
+def _even(value: float) -> int:
+    """Arrondit à l'entier pair le plus proche (requis par yuv420p)."""
+    return max(2, int(round(value / 2.0)) * 2)
+
+
+def compute_reframe_geometry(
+    src_width: int,
+    src_height: int,
+    target_width: int,
+    target_height: int,
+    zoom_mode: str = "fit",
+) -> ReframeGeometry:
+    """Calcule le redimensionnement et le recadrage pour un mode de zoom.
+    
+    Args:
+        src_width: Largeur de la source
+        src_height: Hauteur de la source
+        target_width: Largeur cible
+        target_height: Hauteur cible
+        zoom_mode: Mode de zoom (fit, fill, center)
+    
+    Returns:
+        Géométrie à appliquer au décodage
+    """
+    geometry = ReframeGeometry(target_width=target_width, target_height=target_height)
+    video_ratio = src_width / src_height
+    target_ratio = target_width / target_height
+    
+    if zoom_mode == "fit":
+        # Adapter à l'écran avec bandes noires si nécessaire
+        if video_ratio > target_ratio:
+            new_width = target_width
+            new_height = min(target_height, _even(target_width / video_ratio))
+        else:
+            new_height = target_height
+            new_width = min(target_width, _even(target_height * video_ratio))
+        geometry.scale = (new_width, new_height)
+        if (new_width, new_height) != (target_width, target_height):
+            geometry.pad = (
+                (target_width - new_width) // 2,
+                (target_height - new_height) // 2,
+            )
+    elif zoom_mode == "fill":
+        # Remplir l'écran en coupant si nécessaire
+        if video_ratio > target_ratio:
+            new_height = target_height
+            new_width = max(target_width, _even(target_height * video_ratio))
+        else:
+            new_width = target_width
+            new_height = max(target_height, _even(target_width / video_ratio))
+        geometry.scale = (new_width, new_height)
+        if (new_width, new_height) != (target_width, target_height):
+            geometry.crop = (
+                (new_width - target_width) // 2,
+                (new_height - target_height) // 2,
+                target_width,
+                target_height,
+            )
+    else:
+        # Mode center - pas de redimensionnement, on coupe ce qui déborde
+        crop_w = min(src_width, target_width)
+        crop_h = min(src_height, target_height)
+        if (crop_w, crop_h) != (src_width, src_height):
+            geometry.crop = (
+                (src_width - crop_w) // 2,
+                (src_height - crop_h) // 2,
+                crop_w,
+                crop_h,
+            )
+        if (crop_w, crop_h) != (target_width, target_height):
+            geometry.pad = (
+                (target_width - crop_w) // 2,
+                (target_height - crop_h) // 2,
+            )
+    
+    return geometry
+
+
+class FFmpegFrameReader:
+    """Lecteur de frames RGB via un processus ffmpeg.
+    
+    Les filtres (`-vf`) sont appliqués côté ffmpeg : seules les frames à la
+    taille finale transitent par le pipe. La lecture est séquentielle ; un
+    saut en arrière ou trop loin en avant relance ffmpeg avec un seek.
+    
+    Avec l'index des images clés de la source, un saut en avant ne relance
+    ffmpeg que si le décodage depuis l'image clé précédant la cible est plus
+    court que la lecture jusqu'à elle.
+    """
+    
+    # Au-delà de ce nombre de frames, on relance ffmpeg plutôt que de lire en avant
+    MAX_FORWARD_SKIP = 60
+    
+    def __init__(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        start_time: float = 0.0,
+        duration: Optional[float] = None,
+        filters: Optional[str] = None,
+        pix_fmt: str = "rgb24",
+        keyframes: Optional[KeyframeIndex] = None,
+    ):
+        """Initialise le lecteur.
+        
+        Args:
+            path: Chemin vers la vidéo source
+            size: Taille (largeur, hauteur) des frames après filtres
+            fps: Cadence de sortie
+            start_time: Début du segment dans la source
+            duration: Durée du segment (None = jusqu'à la fin)
+            filters: Filtres ffmpeg à appliquer au décodage
+            pix_fmt: Format de pixel (rgb24, gray)
+            keyframes: Index des images clés de la source (temps absolus)
+        """
+        self.path = str(path)
+        self.size = size
+        self.fps = fps
+        self.start_time = start_time
+        self.duration = duration
+        self.filters = filters
+        self.pix_fmt = pix_fmt
+        self.keyframes = keyframes
+        self.depth = 1 if pix_fmt == "gray" else 3
+        self.frame_bytes = size[0] * size[1] * self.depth
+        self.proc = None
+        self.pos = -1  # Index de la dernière frame lue
+        self.last_frame = None
+    
+    def _start(self, frame_index: int):
+        """Lance ffmpeg à partir d'une frame donnée."""
+        self.close()
+        offset = frame_index / self.fps
+        cmd = [get_ffmpeg_binary(), "-loglevel", "error", "-nostdin"]
+        if self.start_time + offset > 0:
+            cmd += ["-ss", f"{self.start_time + offset:.6f}"]
+        cmd += ["-i", self.path]
+        if self.duration is not None:
+            cmd += ["-t", f"{max(0.0, self.duration - offset):.6f}"]
+        if self.filters:
+            cmd += ["-vf", self.filters]
+        cmd += [
+            "-an", "-sn",
+            "-r", f"{self.fps}",
+            "-f", "rawvideo",
+            "-pix_fmt", self.pix_fmt,
+            "-",
+        ]
+        self.proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=self.frame_bytes * 2,
+        )
+        self.pos = frame_index - 1
+    
+    def _read_next(self) -> np.ndarray:
+        """Lit la frame suivante du pipe."""
+        data = self.proc.stdout.read(self.frame_bytes)
+        self.pos += 1
+        if len(data) < self.frame_bytes:
+            # Fin du flux : on répète la dernière frame disponible
+            if self.last_frame is None:
+                shape = (self.size[1], self.size[0], self.depth)
+                self.last_frame = np.zeros(shape, dtype=np.uint8)
+            return self.last_frame
+        frame = np.frombuffer(data, dtype=np.uint8)
+        self.last_frame = frame.reshape((self.size[1], self.size[0], self.depth))
+        return self.last_frame
+    
+    def _skip(self, count: int):
+        """Avance de plusieurs frames sans les convertir."""
+        for _ in range(count):
+            if len(self.proc.stdout.read(self.frame_bytes)) < self.frame_bytes:
+                break
+            self.pos += 1
+    
+    def get_frame(self, t: float) -> np.ndarray:
+        """Retourne la frame au temps t (relatif au début du segment)."""
+        index = int(t * self.fps + 1e-5)
+        
+        if self.proc is not None and index == self.pos and self.last_frame is not None:
+            return self.last_frame
+        if self.proc is None or index < self.pos:
+            self._start(index)
+        elif index > self.pos + self.MAX_FORWARD_SKIP and self._restart_is_shorter(index):
+            self._start(index)
+        if index > self.pos + 1:
+            self._skip(index - self.pos - 1)
+        return self._read_next()
+    
+    def _restart_is_shorter(self, index: int) -> bool:
+        """Relancer ffmpeg (seek) coûte-t-il moins que lire jusqu'à la frame `index` ?"""
+        if self.keyframes is None:
+            return True
+        target = self.start_time + index / self.fps
+        keyframe = self.keyframes.preceding(target)
+        if keyframe is None:
+            return True
+        # Frames décodées après le seek, plus le coût de lancement d'ffmpeg
+        restart_cost = (target - keyframe) * self.fps + self.MAX_FORWARD_SKIP
+        return restart_cost < index - self.pos
+    
+    def close(self):
+        """Arrête le processus ffmpeg."""
+        if self.proc is not None:
+            try:
+                self.proc.stdout.close()
+                self.proc.terminate()
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+
+
+class ReaderPool:
+    """Lecteurs réutilisables, prêtés par source et par format de sortie.
+    
+    Un lecteur vidéo est identifié par (source, taille, format de pixel,
+    filtres, cadence) et lit la timeline complète de la source : il garde sa
+    position d'un prêt à l'autre, si bien qu'un segment situé plus loin se lit
+    en avançant, sans relancer ffmpeg. Les pistes audio MoviePy sont prêtées
+    de la même façon, par source.
+    
+    Le nombre de lecteurs ouverts est plafonné : les lecteurs inactifs les
+    plus anciens sont fermés d'abord, puis un thread sans prêt en cours attend
+    qu'une place se libère (un thread qui détient déjà des lecteurs n'attend
+    pas, pour éviter l'interblocage), au plus `lease_timeout` secondes. Les
+    lecteurs inactifs depuis `idle_timeout` secondes sont fermés.
+    """
+    
+    def __init__(self, max_open: int = 8, idle_timeout: float = 30.0, lease_timeout: float = 300.0):
+        """Initialise le pool.
+        
+        Args:
+            max_open: Nombre maximal de lecteurs ouverts (prêtés ou inactifs)
+            idle_timeout: Délai de fermeture d'un lecteur inactif, en secondes
+            lease_timeout: Attente maximale d'une place, en secondes
+        """
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+        self._idle: List[Tuple[tuple, object, float]] = []   # (clé, lecteur, dernier usage)
+        self._leased: Dict[int, Tuple[tuple, object, int]] = {}  # id -> (clé, lecteur, thread)
+        self._creating = 0
+        self._condition = threading.Condition()
+        self._sweeper: Optional[threading.Thread] = None
+    
+    def lease_video(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        fps: float,
+        filters: Optional[str] = None,
+        pix_fmt: str = "rgb24",
+        keyframes: Optional[KeyframeIndex] = None,
+        position: float = 0.0,
+    ) -> "FFmpegFrameReader":
+        """Prête un lecteur de frames (temps absolus dans la source).
+        
+        Parmi les lecteurs inactifs de même clé, on préfère celui qui est le
+        plus près avant `position` : il l'atteindra en lisant en avant.
+        """
+        key = ("video", str(path), tuple(size), pix_fmt, filters, fps)
+        target = int(position * fps + 1e-5)
+        
+        def choose(readers):
+            ahead = [r for r in readers if r.proc is not None and r.pos <= target]
+            return max(ahead, key=lambda r: r.pos) if ahead else readers[-1]
+        
+        return self._lease(
+            key,
+            lambda: FFmpegFrameReader(path, size, fps, filters=filters, pix_fmt=pix_fmt, keyframes=keyframes),
+            choose,
+        )
+    
+    def lease_audio(self, path: str):
+        """Prête la piste audio MoviePy d'une source (exception si elle n'en a pas)."""
+        from moviepy import AudioFileClip
+        
+        return self._lease(("audio", str(path)), lambda: AudioFileClip(str(path)), lambda clips: clips[-1])
+    
+    def release(self, resource):
+        """Rend un lecteur au pool (il reste ouvert, à sa position)."""
+        with self._condition:
+            entry = self._leased.pop(id(resource), None)
+            if entry is not None:
+                self._idle.append((entry[0], resource, time.monotonic()))
+            self._condition.notify()
+        if entry is None:
+            resource.close()
+    
+    def close_idle(self, older_than: float = 0.0):
+        """Ferme les lecteurs inactifs depuis plus de `older_than` secondes."""
+        limit = time.monotonic() - older_than
+        with self._condition:
+            expired = [e for e in self._idle if e[2] <= limit]
+            self._idle = [e for e in self._idle if e[2] > limit]
+            self._condition.notify_all()
+        for _, resource, _ in expired:
+            resource.close()
+    
+    def _lease(self, key: tuple, factory: Callable, choose: Callable):
+        """Prête un lecteur inactif de clé `key`, ou en crée un.
+        
+        Raises:
+            TimeoutError: Aucune place libérée en `lease_timeout` secondes
+                (lecteurs prêtés et jamais rendus)
+        """
+        thread_id = threading.get_ident()
+        deadline = time.monotonic() + self.lease_timeout
+        to_close = []
+        try:
+            with self._condition:
+                # Une piste audio fermée entre-temps (par le clip composite
+                # qui l'utilisait) n'est plus réutilisable
+                stale = [e for e in self._idle if e[0] == key and not self._usable(e[1])]
+                self._idle = [e for e in self._idle if not any(e is x for x in stale)]
+                to_close.extend(e[1] for e in stale)
+                
+                candidates = [resource for k, resource, _ in self._idle if k == key]
+                if candidates:
+                    resource = choose(candidates)
+                    self._idle = [e for e in self._idle if e[1] is not resource]
+                    self._leased[id(resource)] = (key, resource, thread_id)
+                    return resource
+                
+                # Place pour un nouveau lecteur
+                while len(self._idle) + len(self._leased) + self._creating >= self.max_open:
+                    if self._idle:
+                        to_close.append(self._idle.pop(0)[1])
+                    elif any(t == thread_id for _, _, t in self._leased.values()):
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(
+                                f"Aucun lecteur libéré en {self.lease_timeout:g}s "
+                                f"({len(self._leased)} prêtés sur {self.max_open})"
+                            )
+                        self._condition.wait(remaining)
+                self._creating += 1
+        finally:
+            for resource in to_close:
+                resource.close()
+        
+        try:
+            resource = factory()
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._creating -= 1
+            self._leased[id(resource)] = (key, resource, thread_id)
+        self._start_sweeper()
+        return resource
+    
+    @staticmethod
+    def _usable(resource) -> bool:
+        """Un lecteur audio MoviePy dont le processus a été arrêté ne peut plus lire."""
+        if not hasattr(resource, "reader"):
+            return True
+        return resource.reader is not None and getattr(resource.reader, "proc", None) is not None
+    
+    def _start_sweeper(self):
+        """Lance (une fois) le thread qui ferme les lecteurs inactifs."""
+        with self._condition:
+            if self._sweeper is not None:
+                return
+            
+            def sweep():
+                while True:
+                    time.sleep(self.idle_timeout / 2)
+                    self.close_idle(self.idle_timeout)
+            
+            self._sweeper = threading.Thread(target=sweep, name="reader-pool", daemon=True)
+            self._sweeper.start()
+
+
+_reader_pool: Optional[ReaderPool] = None
+_reader_pool_lock = threading.Lock()
+
+
+def get_reader_pool() -> ReaderPool:
+    """Retourne le pool de lecteurs partagé par le processus."""
+    global _reader_pool
+    with _reader_pool_lock:
+        if _reader_pool is None:
+            _reader_pool = ReaderPool()
+        return _reader_pool
+
+
+class ReframedSegment:
+    """Segment de vidéo recadré au décodage, avec son audio."""
+    
+    def __init__(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        geometry: ReframeGeometry,
+        fps: float = 30,
+        keyframes: Optional[KeyframeIndex] = None,
+        pool: Optional[ReaderPool] = None,
+        audio: bool = True,
+    ):
+        """Ouvre le segment.
+        
+        Args:
+            video_path: Chemin vers la vidéo source
+            start_time: Temps de début
+            end_time: Temps de fin
+            geometry: Géométrie de recadrage
+            fps: Cadence des frames produites
+            keyframes: Index des images clés de la source
+            pool: Pool où emprunter les lecteurs (sinon lecteurs dédiés)
+            audio: Joindre la piste audio de la source au clip
+        """
+        from moviepy import VideoClip, AudioFileClip
+        
+        self.pool = pool
+        size = (geometry.target_width, geometry.target_height)
+        if pool is not None:
+            # Lecteur partagé sur la timeline de la source : le début est aligné
+            # sur sa grille de frames (audio compris, à moins d'une demi-frame)
+            start_time = round(start_time * fps) / fps
+            self.reader = pool.lease_video(
+                video_path, size, fps,
+                filters=geometry.ffmpeg_filters(),
+                keyframes=keyframes,
+                position=start_time,
+            )
+            offset = start_time
+            frame_function = lambda t: self.reader.get_frame(offset + t)
+        else:
+            self.reader = FFmpegFrameReader(
+                video_path,
+                size=size,
+                fps=fps,
+                start_time=start_time,
+                duration=end_time - start_time,
+                filters=geometry.ffmpeg_filters(),
+                keyframes=keyframes,
+            )
+            frame_function = self.reader.get_frame
+        duration = end_time - start_time
+        self.audio_source = None
+        
+        clip = VideoClip(frame_function=frame_function, duration=duration)
+        clip = clip.with_fps(fps)
+        if not audio:
+            self.clip = clip
+            return
+        
+        try:
+            if pool is not None:
+                self.audio_source = pool.lease_audio(video_path)
+            else:
+                self.audio_source = AudioFileClip(str(video_path))
+            clip = clip.with_audio(
+                self.audio_source.subclipped(start_time, min(end_time, self.audio_source.duration))
+            )
+        except TimeoutError:
+            # Pool saturé : le lecteur vidéo déjà prêté est rendu
+            self.clip = clip
+            self.close()
+            raise
+        except Exception:
+            # Source sans piste audio
+            self.audio_source = None
+        
+        self.clip = clip
+    
+    def close(self):
+        """Libère le lecteur vidéo et l'audio (rendus au pool s'ils en viennent).
+        
+        Sans effet au second appel : un lecteur rendu peut déjà servir ailleurs.
+        """
+        release = self.pool.release if self.pool is not None else (lambda resource: resource.close())
+        reader, audio_source = self.reader, self.audio_source
+        self.reader = self.audio_source = None
+        if reader is not None:
+            release(reader)
+        if audio_source is not None:
+            release(audio_source)
+        self.clip.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
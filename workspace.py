@@ -0,0 +1,187 @@
+"""Espaces de travail par session et nettoyage du disque."""
+
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from analysis_cache import evict_lru
+
+
+def session_output_dir(root: str, session_id: str) -> Path:
+    """Répertoire de sortie propre à une session (créé si nécessaire)."""
+    directory = Path(root) / session_id
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+class Janitor:
+    """Récupère l'espace disque des sessions.
+    
+    Les fichiers et répertoires cachés (`.nom...`) sont des écritures en
+    cours : ils ne sont supprimés qu'une fois abandonnés depuis
+    `stale_seconds`. Les sorties terminées sont supprimées de la moins
+    récemment utilisée à la plus récente au-delà du quota, ainsi que les
+    répertoires de sources du cache : source importée et fichiers dérivés
+    (proxy, mezzanine, analyses) comptent ensemble et partent ensemble.
+    
+    Les répertoires signalés par une session active (`keep`) ne sont jamais
+    supprimés : ni son répertoire de sortie, même vide, ni la source qu'elle
+    a ouverte.
+    """
+    
+    # Répertoires de sources du cache (nommés par empreinte sha256)
+    SOURCE_DIR_PATTERN = re.compile(r"[0-9a-f]{64}")
+    
+    def __init__(
+        self,
+        output_root: str = "output",
+        cache_root: str = "cache",
+        output_quota_bytes: int = 20 * 1024 ** 3,
+        source_quota_bytes: int = 50 * 1024 ** 3,
+        stale_seconds: float = 6 * 3600,
+    ):
+        """Initialise le nettoyage.
+        
+        Args:
+            output_root: Racine des sorties (un sous-répertoire par session)
+            cache_root: Racine du cache d'analyse
+            output_quota_bytes: Taille maximale des sorties
+            source_quota_bytes: Taille maximale des répertoires de sources
+                (sources importées et fichiers dérivés)
+            stale_seconds: Âge à partir duquel un fichier temporaire est abandonné
+        """
+        self.output_root = Path(output_root)
+        self.cache_root = Path(cache_root)
+        self.output_quota_bytes = output_quota_bytes
+        self.source_quota_bytes = source_quota_bytes
+        self.stale_seconds = stale_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._kept: Dict[Path, float] = {}
+        self._lock = threading.Lock()
+    
+    def keep(self, *paths):
+        """Protège des répertoires utilisés par une session active.
+        
+        La protection dure `stale_seconds` après le dernier signalement :
+        l'application les signale à chaque interaction de la session.
+        """
+        now = time.time()
+        with self._lock:
+            for path in paths:
+                self._kept[Path(path).resolve()] = now
+    
+    def _kept_paths(self, limit: float) -> frozenset:
+        """Répertoires protégés, signalés depuis `limit`."""
+        with self._lock:
+            self._kept = {path: seen for path, seen in self._kept.items() if seen >= limit}
+            return frozenset(self._kept)
+    
+    def sweep(self):
+        """Effectue un passage de nettoyage complet."""
+        limit = time.time() - self.stale_seconds
+        kept = self._kept_paths(limit)
+        for root in (self.output_root, self.cache_root):
+            if root.exists():
+                self._remove_stale_temporaries(root, limit)
+        
+        if self.output_root.exists():
+            evict_lru(self.output_root, self.output_quota_bytes, "**/*")
+            self._remove_empty_dirs(self.output_root, limit, kept)
+        if self.cache_root.exists():
+            self._evict_source_dirs(self.cache_root, self.source_quota_bytes, kept)
+            sessions = self.cache_root / "sessions"
+            if sessions.exists():
+                self._remove_empty_dirs(sessions, limit, kept)
+    
+    def start(self, interval: float = 600.0):
+        """Lance le nettoyage périodique dans un thread en arrière-plan."""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Erreur nettoyage: {e}")
+                time.sleep(interval)
+        
+        self._thread = threading.Thread(target=run, name="janitor", daemon=True)
+        self._thread.start()
+    
+    @classmethod
+    def _evict_source_dirs(cls, root: Path, budget_bytes: int, kept: Iterable[Path] = ()):
+        """Supprime les répertoires de sources les moins récemment utilisés au-delà du quota.
+        
+        Un répertoire est daté par son entrée la plus récente ; ceux qui
+        contiennent une écriture en cours (fichier caché) ou qui sont protégés
+        (`kept`) sont comptés mais jamais supprimés.
+        """
+        kept = frozenset(kept)
+        entries = []
+        total = 0
+        for directory in root.iterdir():
+            if not directory.is_dir() or not cls.SOURCE_DIR_PATTERN.fullmatch(directory.name):
+                continue
+            size, last_used, busy = 0, 0.0, False
+            try:
+                last_used = directory.stat().st_mtime
+                for path in directory.rglob("*"):
+                    busy = busy or any(part.startswith(".") for part in path.relative_to(directory).parts)
+                    stat = path.stat()
+                    last_used = max(last_used, stat.st_mtime)
+                    if path.is_file():
+                        size += stat.st_size
+            except OSError:
+                continue
+            total += size
+            if not busy and directory.resolve() not in kept:
+                entries.append((last_used, size, directory))
+        
+        for _, size, directory in sorted(entries):
+            if total <= budget_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            if not directory.exists():
+                total -= size
+    
+    @staticmethod
+    def _remove_stale_temporaries(root: Path, limit: float):
+        """Supprime les fichiers et répertoires cachés abandonnés."""
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in list(dirnames):
+                if not name.startswith("."):
+                    continue
+                path = Path(dirpath) / name
+                dirnames.remove(name)
+                try:
+                    if path.stat().st_mtime < limit:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    continue
+            for name in filenames:
+                if not name.startswith("."):
+                    continue
+                path = Path(dirpath) / name
+                try:
+                    if path.stat().st_mtime < limit:
+                        path.unlink()
+                except OSError:
+                    continue
+    
+    @staticmethod
+    def _remove_empty_dirs(root: Path, limit: float, kept: Iterable[Path] = ()):
+        """Supprime les répertoires de session vides et inactifs (hors `kept`)."""
+        kept = frozenset(kept)
+        for path in root.iterdir():
+            try:
+                if path.resolve() in kept:
+                    continue
+                if path.is_dir() and path.stat().st_mtime < limit and not any(path.iterdir()):
+                    path.rmdir()
+            except OSError:
+                continue